@@ -0,0 +1,191 @@
+# src/demo/backfill.py
+# 날짜 범위 백필 - Oracle 적재는 프로세스 풀로 병렬, guardian.db 이력은 단일 writer가 기록
+
+import os
+import argparse
+import random
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from utils.db import get_sqlite, get_oracle
+from utils.profiler import QUALITY_COLUMNS
+from utils.reconcile import ORDER_COLUMNS
+from utils.volume_stats import rebuild_daily
+from daily_data_loader import (plan_load, load_state, mark_load, count_orders, next_order_id,
+                               insert_orders)
+from seed_history import TASK_NAME, simulate_rows, insert_volume
+from seed_quality_history import insert_quality
+
+
+# 워커 시작 방식: fork는 부모의 guardian.db 핸들/Oracle 풀을 물려받으므로 spawn
+MP_CONTEXT = os.getenv('BACKFILL_MP_CONTEXT', 'spawn')
+
+
+def daterange(start, end):
+    d = start
+    while d <= end:
+        yield d
+        d += timedelta(days=1)
+
+
+def profile_day(day_iso, columns=None):
+    """워커: 적재된 하루치 Oracle ORDERS의 (건수, {컬럼: NULL/공백 건수}) — 품질 이력을 실제 데이터로"""
+    columns = columns or QUALITY_COLUMNS
+    kinds = dict(ORDER_COLUMNS)
+    # 문자열은 공백만 있는 값도 NULL로 (Oracle TRIM('  ') IS NULL)
+    exprs = [f"SUM(CASE WHEN {f'TRIM({col})' if kinds.get(col, 'text') == 'text' else col} IS NULL THEN 1 ELSE 0 END)"
+             for col in columns]
+    conn = get_oracle()
+    try:
+        cur = conn.cursor()
+        cur.execute(f"SELECT COUNT(*), {', '.join(exprs)} FROM ORDERS WHERE order_date = :d",
+                    {'d': date.fromisoformat(day_iso)})
+        total, *nulls = cur.fetchone()
+    finally:
+        conn.close()
+    return total, {col: int(n or 0) for col, n in zip(columns, nulls)}
+
+
+def load_day(day_iso, need, start_id, batch_size=None):
+    """워커: 하루치 Oracle 적재 + 적재된 데이터 프로파일 (guardian.db는 건드리지 않음)
+
+    order_id는 부모가 예약한 [start_id, start_id + need) 구간만 씁니다. 반환: (날짜, 넣은 건수, 그날 건수, NULL 건수)
+    """
+    inserted = insert_orders(date.fromisoformat(day_iso), need, start_id, batch_size) if need else 0
+    return (day_iso, inserted, *profile_day(day_iso))
+
+
+def plan_days(days, rows=None):
+    """부모: 날짜별 적재 계획(load_runs 기록)과 겹치지 않는 order_id 구간 예약
+
+    워커마다 MAX(order_id)를 따로 읽으면 동시에 도는 날짜끼리 같은 id를 쓰므로, 한 번만 읽고 나눠 줍니다.
+    반환: [(날짜, 목표 건수, 넣을 건수, 시작 order_id)]
+    """
+    conn = get_oracle()
+    try:
+        next_id = next_order_id(conn.cursor())
+    finally:
+        conn.close()
+
+    plans = []
+    for day_iso in days:
+        d = date.fromisoformat(day_iso)
+        existing = count_orders(d)
+        plan = plan_load(d, existing, load_state(d), rows)
+        if plan['mark']:
+            mark_load(d, plan['count'], plan['mark'], existing if plan['skip'] else None)
+        need = 0 if plan['skip'] else plan['count'] - existing
+        plans.append((day_iso, plan['count'], need, next_id))
+        next_id += need
+    return plans
+
+
+def write_history(cur, day_iso, rows, nulls=None):
+    """하루치 task_history / quality_history 교체 (메인 프로세스에서만 호출)
+
+    nulls({컬럼: NULL 건수})가 있으면 적재된 데이터 기준, 없으면(--history-only) 합성 이력입니다.
+    """
+    d = date.fromisoformat(day_iso)
+    cur.execute("DELETE FROM task_history WHERE task_name = ? AND run_date = ?", (TASK_NAME, day_iso))
+    insert_volume(cur, d, rows)
+    cur.execute("DELETE FROM quality_history WHERE run_date = ?", (day_iso,))
+    if nulls is None:
+        insert_quality(cur, d, rows)
+        return
+    cur.executemany(
+        'INSERT INTO quality_history (run_date, column_name, total_rows, null_count, null_pct) VALUES (?,?,?,?,?)',
+        [(day_iso, col, rows, n, round(n / rows * 100, 2) if rows else 0.0) for col, n in nulls.items()]
+    )
+
+
+def backfill(start, end, workers=4, rows=None, batch_size=None, history_only=False):
+    """start~end 날짜 백필. 끝난 날짜는 건너뛰므로 중단 후 재실행 가능.
+
+    적재 모드는 Oracle 적재 완료(load_runs)와 이력이 모두 있는 날짜만 끝난 것으로 봅니다.
+    --history-only는 Oracle 없이 합성 이력만 만들며 이력이 있는 날짜를 건너뜁니다.
+    """
+    with get_sqlite() as conn:
+        cur = conn.cursor()
+        if history_only:
+            cur.execute("SELECT DISTINCT run_date FROM task_history WHERE task_name = ?", (TASK_NAME,))
+        else:
+            cur.execute("""
+                SELECT DISTINCT h.run_date FROM task_history h
+                JOIN load_runs l ON l.run_date = h.run_date AND l.status = 'done'
+                WHERE h.task_name = ?
+            """, (TASK_NAME,))
+        done = {r[0] for r in cur.fetchall()}
+
+    all_days = [d.isoformat() for d in daterange(start, end)]
+    days = [d for d in all_days if d not in done]
+    print(f"🗓️ {start} ~ {end}: 대상 {len(days)}일 (완료된 {len(all_days) - len(days)}일 스킵)"
+          f"{' — 합성 이력' if history_only else ''}")
+
+    started = time.perf_counter()
+    total = 0
+    if history_only:
+        # Oracle 없이 합성 이력만 생성 (seed_history / seed_quality_history 대체)
+        with get_sqlite() as conn:
+            cur = conn.cursor()
+            for day_iso in days:
+                n = rows or simulate_rows(date.fromisoformat(day_iso))
+                write_history(cur, day_iso, n)
+                total += n
+            conn.commit()
+    else:
+        plans = plan_days(days, rows)
+        planned = {day_iso: count for day_iso, count, _, _ in plans}
+        # guardian.db는 이 프로세스만 씀 (워커는 Oracle만). spawn이라 부모의 SQLite/Oracle 연결을 물려받지 않음
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(MP_CONTEXT)) as pool:
+            futures = {pool.submit(load_day, day_iso, need, start_id, batch_size): day_iso
+                       for day_iso, _, need, start_id in plans}
+            for fut in as_completed(futures):
+                day_iso = futures[fut]
+                try:
+                    _, inserted, n, nulls = fut.result()
+                except Exception as e:
+                    print(f"🚨 {day_iso} 적재 실패: {e} (재실행 시 이어서 적재)")
+                    continue
+                # 날짜 단위로 커밋 → 중단되어도 완료된 날짜는 보존 (이력 뒤에 완료 표시: 사이에 끊기면 재실행 때 다시 씀)
+                with get_sqlite() as conn:
+                    write_history(conn.cursor(), day_iso, n, nulls)
+                    conn.commit()
+                mark_load(date.fromisoformat(day_iso), planned[day_iso], 'done', n)
+                total += inserted
+
+    # 과거 날짜가 순서 없이 들어왔으므로 볼륨 누적 통계는 이력으로 다시 구성
+    rebuild_daily(TASK_NAME)
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(f"\n✅ 백필 완료: {len(days)}일, {total:,}건 / {elapsed:.1f}초 → {total / elapsed:,.0f} rows/sec")
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='날짜 범위 백필 (Oracle 적재 + guardian.db 이력)')
+    parser.add_argument('--start', type=date.fromisoformat, required=True, help='시작일 YYYY-MM-DD')
+    parser.add_argument('--end', type=date.fromisoformat, default=date.today() - timedelta(days=1),
+                        help='종료일 YYYY-MM-DD (기본: 어제)')
+    parser.add_argument('--workers', type=int, default=4, help='워커 프로세스 수')
+    parser.add_argument('--rows', type=int, default=None, help='일별 건수 (기본: 요일별 평균)')
+    parser.add_argument('--batch-size', type=int, default=None, help='executemany 1회 행 수')
+    parser.add_argument('--history-only', action='store_true', help='Oracle 적재 없이 합성 이력만 생성')
+    parser.add_argument('--seed', type=int, default=None, help='난수 시드 (이력 재현용)')
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    backfill(args.start, args.end, workers=args.workers, rows=args.rows,
+             batch_size=args.batch_size, history_only=args.history_only)
+
+
+if __name__ == '__main__':
+    main()
+
+'''
+실행:
+```
+python src/demo/backfill.py --start 2025-01-01 --workers 8
+python src/demo/backfill.py --start 2025-01-01 --history-only
+```
+'''
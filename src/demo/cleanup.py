@@ -1,19 +1,21 @@
 # src/demo/cleanup.py
 # 데모 후 불량 데이터 제거
 
-import mysql.connector
 import os
+import argparse
 from dotenv import load_dotenv
+from utils.db import connect_mysql
+from utils.profiler import reset_profile_state
+from snapshot import refresh_snapshot
 
 load_dotenv()
 
-conn = mysql.connector.connect(
-    host=os.getenv('MYSQL_HOST', 'localhost'),
-    port=int(os.getenv('MYSQL_PORT', 3306)),
-    database=os.getenv('MYSQL_DB', 'pjy_bitek'),
-    user=os.getenv('MYSQL_USER'),
-    password=os.getenv('MYSQL_PASSWORD')
-)
+# 데모 데이터가 있는 DB (기본은 예전과 같은 pjy_bitek — 분석 풀의 MYSQL_DB 기본값 analytics와 다름)
+parser = argparse.ArgumentParser(description='데모 후 불량 데이터 제거')
+parser.add_argument('--database', default=os.getenv('MYSQL_DB', 'pjy_bitek'), help='대상 MySQL DB')
+args = parser.parse_args()
+
+conn = connect_mysql(args.database)
 cur = conn.cursor()
 
 cur.execute("SELECT COUNT(*) FROM orders_analytics WHERE phone_number IS NULL")
@@ -25,12 +27,18 @@ conn.commit()
 cur.execute("SELECT COUNT(*) FROM orders_analytics")
 remain = cur.fetchone()[0]
 
+# 과거 행이 삭제되었으므로 증분 프로파일 상태 초기화
+reset_profile_state()
+
 print(f"🧹 불량 데이터 {dirty:,}건 삭제 완료")
 print(f"   남은 정상 데이터: {remain:,}건")
 
 cur.close()
 conn.close()
 
+# 오늘 스냅샷이 있으면 원상복구 결과로 다시 계산
+refresh_snapshot()
+
 '''
 **발표 데모 흐름:**
 
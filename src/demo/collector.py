@@ -1,63 +1,104 @@
-import requests
-import sqlite3
 import os
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from utils.db import get_sqlite
+from utils.idmc import get_activity_log
+from utils.detector_cache import invalidate as invalidate_detector_cache
+from utils.agent_cache import invalidate_watermark
+from utils.run_monitor import monitor_runs
 
 load_dotenv()
 
-def get_idmc_session():
-    login_url = f"{os.getenv('IDMC_LOGIN_URL')}/ma/api/v2/user/login"
-    payload = {"@type": "login", "username": os.getenv('IDMC_USERNAME'), "password": os.getenv('IDMC_PASSWORD')}
-    response = requests.post(login_url, json=payload)
-    data = response.json()
-    return data['icSessionId'], data['serverUrl']
+# activityLog 페이지 크기 (IDMC rowLimit 최대 1000)
+PAGE_SIZE = int(os.getenv('IDMC_PAGE_SIZE', 200))
+# objectName 필터 (빈 값이면 전체 태스크 수집)
+OBJECT_FILTER = os.getenv('IDMC_OBJECT_FILTER', 'm_ORDERS_SYNC')
+# 마지막 endTime보다 이만큼 먼저 시작한 실행까지 다시 확인 (분, 가장 긴 실행 시간보다 길게)
+LOOKBACK_MINUTES = float(os.getenv('IDMC_LOOKBACK_MINUTES', 360))
+
+UPSERT_SQL = '''
+    INSERT INTO idmc_logs (run_id, object_name, status, source_rows, target_rows, start_time, end_time)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(run_id, start_time) DO UPDATE SET
+        object_name = excluded.object_name,
+        status = excluded.status,
+        source_rows = excluded.source_rows,
+        target_rows = excluded.target_rows,
+        end_time = excluded.end_time
+'''
+
+def get_last_end_time(cur):
+    """이미 저장된 가장 최근 endTime (idx_idmc_logs_end 인덱스 사용)"""
+    cur.execute("SELECT MAX(end_time) FROM idmc_logs")
+    return cur.fetchone()[0]
+
+def _minutes_before(ts, minutes):
+    """IDMC 시각 문자열(UTC ISO)에서 minutes분 전 (비교용 'YYYY-MM-DDTHH:MM:SS')"""
+    moment = datetime.fromisoformat(ts[:19]) - timedelta(minutes=minutes)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S')
+
+def iter_activity_pages(since=None, page_size=None, lookback_minutes=None):
+    """activityLog를 rowLimit/offset으로 페이지 단위 조회 (최신 시작순)
+
+    activityLog에는 완료된 실행만 나오므로 since(마지막 endTime) 이후에 끝난 실행만 돌려줍니다.
+    목록은 startTime 순이라 늦게 시작한 짧은 실행 뒤에 먼저 시작한 긴 실행이 나중에 완료될 수 있으므로,
+    startTime이 since - lookback_minutes보다 오래된 로그가 나올 때까지 읽습니다.
+    (그보다 오래 걸린 실행은 놓칠 수 있음, IDMC_LOOKBACK_MINUTES로 조정) since와 같은 시각은 다시 가져옵니다.
+    """
+    page_size = page_size or PAGE_SIZE
+    lookback_minutes = LOOKBACK_MINUTES if lookback_minutes is None else lookback_minutes
+    cutoff = _minutes_before(since, lookback_minutes) if since else None
+    offset = 0
+    while True:
+        page = get_activity_log(row_limit=page_size, offset=offset)
+        if not page:
+            return
+        fresh = [log for log in page if since is None or (log.get('endTime') or '') >= since]
+        if fresh:
+            yield fresh
+        if cutoff is not None and any((log.get('startTime') or '')[:19] < cutoff for log in page):
+            return
+        if len(page) < page_size:
+            return
+        offset += page_size
+
+def to_row(log):
+    # 진짜 이름표(successTargetRows) 사용 [cite: 471-480]
+    return (
+        log.get('runId'), log.get('objectName'), str(log.get('state')),
+        log.get('successSourceRows', 0), log.get('successTargetRows', 0),
+        log.get('startTime'), log.get('endTime')
+    )
 
 def fetch_and_save_logs():
-    try:
-        sid, server_url = get_idmc_session()
-        log_url = f"{server_url}/api/v2/activity/activityLog" 
-        headers = {"icSessionId": sid}
-        logs = requests.get(log_url, headers=headers).json()
+    """마지막 endTime 이후 완료된 로그만 페이지 단위로 받아 idmc_logs에 일괄 upsert
 
-        conn = sqlite3.connect('guardian.db')
+    실패(API/DB 오류)는 그대로 올려 보냅니다 — 파이프라인이 실패로 기록하고 재시도하도록.
+    """
+    with get_sqlite() as conn:
         cur = conn.cursor()
-        
-        # 1. 기존 테이블 삭제 (PK 구조를 바꾸기 위해 한 번 밀어줍니다)
-        cur.execute('DROP TABLE IF EXISTS idmc_logs')
-        
-        # 2. 새로운 테이블 생성 (run_id와 start_time을 합쳐서 중복 방지)
-        cur.execute('''
-            CREATE TABLE idmc_logs (
-                run_id TEXT,
-                object_name TEXT,
-                status TEXT,
-                source_rows INTEGER,
-                target_rows INTEGER,
-                start_time TEXT,
-                end_time TEXT,
-                PRIMARY KEY (run_id, start_time)
-            )
-        ''')
-
-        for log in logs:
-            if 'm_ORDERS_SYNC' in log.get('objectName', ''):
-                # 진짜 이름표(successTargetRows) 사용 [cite: 471-480]
-                t_rows = log.get('successTargetRows', 0)
-                
-                cur.execute('''
-                    INSERT OR IGNORE INTO idmc_logs VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    log.get('runId'), log.get('objectName'), str(log.get('state')),
-                    log.get('successSourceRows', 0), t_rows,
-                    log.get('startTime'), log.get('endTime')
-                ))
-        
+        # idmc_logs 스키마는 utils/migrations.py가 관리 (테이블을 지우지 않음)
+        since = get_last_end_time(cur)
+
+        saved = 0
+        for page in iter_activity_pages(since):
+            rows = [to_row(log) for log in page if OBJECT_FILTER in log.get('objectName', '')]
+            cur.executemany(UPSERT_SQL, rows)
+            saved += len(rows)
+
         conn.commit()
-        conn.close()
-        print("\n✅ SQLite 수첩 정리 완료!.")
+    if saved:
+        invalidate_detector_cache()  # 같은 프로세스의 페이지 캐시 즉시 갱신 (다른 프로세스는 데이터 버전으로 감지)
+        invalidate_watermark()       # Agent 답변 캐시 워터마크도 (다른 프로세스는 WATERMARK_TTL 후)
+    print(f"\n✅ SQLite 수첩 정리 완료! (신규/갱신 {saved:,}건, 기준 endTime: {since or '처음'})")
+    if saved:
+        monitor_runs()               # 방금 완료된 실행을 시간대 기준선과 바로 비교
+    return saved
 
-    except Exception as e:
-        print(f"🚨 오류: {e}")
 
 if __name__ == "__main__":
-    fetch_and_save_logs()
\ No newline at end of file
+    try:
+        fetch_and_save_logs()
+    except Exception as e:
+        print(f"🚨 오류: {e}")
+        raise SystemExit(1)
@@ -1,11 +1,13 @@
 # src/demo/daily_loader.py
 # 매일 Oracle에 더미 주문 데이터 INSERT (CAI 역할)
 
-import oracledb
-import random
 import os
-from datetime import date
+import time
+import random
+import argparse
+from datetime import date, timedelta
 from dotenv import load_dotenv
+from utils.db import get_oracle, get_sqlite
 
 load_dotenv()
 
@@ -66,62 +68,172 @@ DOW_VOLUME = {
 }
 
 
-def generate_daily_data(target_date=None):
-    """하루치 더미 데이터 생성 및 Oracle INSERT"""
-    if target_date is None:
-        target_date = date.today()
+# 대량 적재 설정 (executemany 배열 바인딩)
+BATCH_SIZE = int(os.getenv('LOADER_BATCH_SIZE', 5000))        # 1회 executemany 행 수
+COMMIT_EVERY = int(os.getenv('LOADER_COMMIT_EVERY', 50000))   # 이 행 수마다 COMMIT
 
-    dow = target_date.weekday()
-    base = DOW_VOLUME[dow]
-    count = int(base * random.uniform(0.90, 1.10))
-
-    conn = oracledb.connect(
-        user=os.getenv("ORACLE_USER"),
-        password=os.getenv("ORACLE_PASSWORD"),
-        dsn=os.getenv("ORACLE_DSN")
-    )
-    cur = conn.cursor()
-
-    # 오늘 이미 넣은 데이터 있으면 스킵
-    cur.execute("SELECT COUNT(*) FROM ORDERS WHERE order_date = :d", {'d': target_date})
-    existing = cur.fetchone()[0]
-    if existing > 0:
-        print(f"⏭️ {target_date} 데이터 이미 {existing:,}건 존재. 스킵합니다.")
-        conn.close()
-        return existing
+INSERT_SQL = """
+    INSERT INTO ORDERS
+    (order_id, customer_id, customer_name, phone_number, email,
+     order_date, total_amount, product_code, product_name,
+     category, order_status, payment_method)
+    VALUES (:1,:2,:3,:4,:5,:6,:7,:8,:9,:10,:11,:12)
+"""
 
-    # 현재 최대 order_id
-    cur.execute("SELECT NVL(MAX(order_id), 0) FROM ORDERS")
-    max_id = cur.fetchone()[0]
 
-    inserted = 0
+def build_rows(start_id, count, target_date):
+    """주문 행 count개 생성 (order_id는 start_id부터 순차)"""
+    rows = []
     for i in range(count):
         cust = random.choice(CUSTOMERS)
         prod = random.choice(PRODUCTS)
         amount = int(prod[3] * random.uniform(0.8, 1.2))
-
-        cur.execute("""
-            INSERT INTO ORDERS 
-            (order_id, customer_id, customer_name, phone_number, email,
-             order_date, total_amount, product_code, product_name,
-             category, order_status, payment_method)
-            VALUES (:1,:2,:3,:4,:5,:6,:7,:8,:9,:10,:11,:12)
-        """, (
-            max_id + i + 1,
+        rows.append((
+            start_id + i,
             cust[0], cust[1], cust[2], cust[3],
             target_date, amount,
             prod[0], prod[1], prod[2],
             random.choice(STATUSES),
             random.choice(PAYMENTS)
         ))
-        inserted += 1
+    return rows
+
+
+def load_state(target_date):
+    """guardian.db load_runs의 그날 적재 기록 {'planned', 'status', 'rows_loaded'} (없으면 None)"""
+    with get_sqlite() as conn:
+        row = conn.execute("SELECT planned, status, rows_loaded FROM load_runs WHERE run_date = ?",
+                           (str(target_date),)).fetchone()
+    return dict(zip(('planned', 'status', 'rows_loaded'), row)) if row else None
+
+
+def mark_load(target_date, planned, status, rows_loaded=None):
+    """적재 기록 갱신 (status: loading → done)"""
+    with get_sqlite() as conn:
+        conn.execute("""
+            INSERT INTO load_runs (run_date, planned, status, rows_loaded) VALUES (?, ?, ?, ?)
+            ON CONFLICT(run_date) DO UPDATE SET planned = excluded.planned, status = excluded.status,
+                rows_loaded = excluded.rows_loaded, updated_at = datetime('now','localtime')
+        """, (str(target_date), planned, status, rows_loaded))
+        conn.commit()
+
+
+def plan_load(target_date, existing, state, rows=None):
+    """적재 계획 (부수효과 없음). existing: Oracle에 이미 있는 건수, state: load_state() 결과
+
+    반환: {'count': 목표 건수, 'skip': 이미 끝난 날짜인지, 'mark': 새로 남길 load_runs 상태 또는 None}
+    COMMIT_EVERY마다 중간 커밋하므로 건수가 있다고 완료된 날짜는 아님 → load_runs 완료 표시로 판단
+    """
+    if state is not None and state['status'] == 'done' and existing == 0:
+        state = None                                # 완료 후 Oracle에서 지워진 날짜는 새로 적재
+    if state is None and existing > 0:
+        # 완료 표시를 남기기 전부터 있던 날짜는 완료로 간주
+        return {'count': existing, 'skip': True, 'mark': 'done'}
+    if state is not None and (state['status'] == 'done' or existing >= state['planned']):
+        return {'count': state['planned'], 'skip': True, 'mark': None if state['status'] == 'done' else 'done'}
+    if state is not None:
+        # 중간 커밋 후 중단된 날짜: 처음 계획한 건수까지 이어서 적재
+        return {'count': state['planned'], 'skip': False, 'mark': None}
+    count = int(DOW_VOLUME[target_date.weekday()] * random.uniform(0.90, 1.10)) if rows is None else rows
+    return {'count': count, 'skip': False, 'mark': 'loading'}
+
+
+def next_order_id(cur):
+    """다음 order_id (현재 최대 + 1)"""
+    cur.execute("SELECT NVL(MAX(order_id), 0) FROM ORDERS")
+    return cur.fetchone()[0] + 1
+
+
+def insert_orders(target_date, count, start_id=None, batch_size=None, commit_every=None):
+    """Oracle에 target_date 주문 count건 INSERT (guardian.db는 건드리지 않음). 넣은 건수 반환
+
+    start_id를 주면 order_id를 start_id부터 씁니다. 여러 프로세스가 동시에 적재할 때는
+    호출하는 쪽이 겹치지 않는 id 구간을 나눠 줘야 합니다 (backfill.py).
+    """
+    batch_size = batch_size or BATCH_SIZE
+    commit_every = commit_every or COMMIT_EVERY
+    conn = get_oracle()
+    try:
+        cur = conn.cursor()
+        if start_id is None:
+            start_id = next_order_id(cur)
+        inserted = 0
+        uncommitted = 0
+        while inserted < count:
+            chunk = build_rows(start_id + inserted, min(batch_size, count - inserted), target_date)
+            cur.executemany(INSERT_SQL, chunk)
+            inserted += len(chunk)
+            uncommitted += len(chunk)
+            if uncommitted >= commit_every:
+                conn.commit()
+                uncommitted = 0
+        conn.commit()
+    finally:
+        conn.close()
+    return inserted
 
-    conn.commit()
-    conn.close()
 
-    print(f"✅ {target_date} ({['월','화','수','목','금','토','일'][dow]}) → {inserted:,}건 INSERT 완료")
-    return inserted
+def count_orders(target_date):
+    """Oracle에 이미 있는 target_date 건수"""
+    conn = get_oracle()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM ORDERS WHERE order_date = :d", {'d': target_date})
+        return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def generate_daily_data(target_date=None, rows=None, batch_size=None, commit_every=None):
+    """하루치 더미 데이터 생성 및 Oracle INSERT (청크 단위 executemany)
+
+    rows를 주면 요일별 기본 건수 대신 해당 건수만큼 생성합니다.
+    중간 커밋 후 중단된 날짜(load_runs status='loading')는 처음 계획한 건수까지 이어서 넣습니다.
+    반환: {'rows': 그날 건수, 'inserted': 이번에 넣은 건수, 'skipped': 이미 적재돼 건너뛰었는지}
+    """
+    if target_date is None:
+        target_date = date.today()
+    dow = target_date.weekday()
+    existing = count_orders(target_date)
+    plan = plan_load(target_date, existing, load_state(target_date), rows)
+    if plan['skip']:
+        if plan['mark']:
+            mark_load(target_date, plan['count'], plan['mark'], existing)
+        print(f"⏭️ {target_date} 데이터 이미 {existing:,}건 존재. 스킵합니다.")
+        return {'rows': existing, 'inserted': 0, 'skipped': True}
+
+    count = plan['count']
+    if plan['mark']:
+        mark_load(target_date, count, plan['mark'])
+    else:
+        print(f"🔁 {target_date} 적재 중단 기록 발견 ({existing:,}/{count:,}건) → 이어서 적재")
+
+    started = time.perf_counter()
+    inserted = insert_orders(target_date, count - existing, batch_size=batch_size, commit_every=commit_every)
+    mark_load(target_date, count, 'done', existing + inserted)
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(f"✅ {target_date} ({['월','화','수','목','금','토','일'][dow]}) → {inserted:,}건 INSERT 완료 "
+          f"({elapsed:.1f}초, {inserted / elapsed:,.0f} rows/sec)")
+    return {'rows': existing + inserted, 'inserted': inserted, 'skipped': False}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Oracle ORDERS 더미 데이터 적재')
+    parser.add_argument('--days', type=int, default=1, help='오늘 포함 최근 N일 적재 (기본 1)')
+    parser.add_argument('--rows', type=int, default=None, help='일별 건수 (기본: 요일별 평균 ±10%%)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='executemany 1회 행 수')
+    parser.add_argument('--commit-every', type=int, default=COMMIT_EVERY, help='COMMIT 간격(행)')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    total = 0
+    for i in range(args.days - 1, -1, -1):
+        total += generate_daily_data(date.today() - timedelta(days=i), rows=args.rows,
+                                     batch_size=args.batch_size, commit_every=args.commit_every)['inserted']
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(f"\n📦 총 {total:,}건 / {elapsed:.1f}초 → {total / elapsed:,.0f} rows/sec")
 
 
 if __name__ == '__main__':
-    generate_daily_data()
\ No newline at end of file
+    main()
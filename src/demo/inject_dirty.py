@@ -1,19 +1,21 @@
 # src/demo/inject_dirty.py
 # 발표 데모용 - 불량 데이터 주입
 
-import mysql.connector
 import os
+import argparse
 from dotenv import load_dotenv
+from utils.db import connect_mysql
+from utils.profiler import reset_profile_state
+from snapshot import refresh_snapshot
 
 load_dotenv()
 
-conn = mysql.connector.connect(
-    host=os.getenv('MYSQL_HOST', 'localhost'),
-    port=int(os.getenv('MYSQL_PORT', 3306)),
-    database=os.getenv('MYSQL_DB', 'pjy_bitek'),
-    user=os.getenv('MYSQL_USER'),
-    password=os.getenv('MYSQL_PASSWORD')
-)
+# 데모 데이터가 있는 DB (기본은 예전과 같은 pjy_bitek — 분석 풀의 MYSQL_DB 기본값 analytics와 다름)
+parser = argparse.ArgumentParser(description='발표 데모용 불량 데이터 주입')
+parser.add_argument('--database', default=os.getenv('MYSQL_DB', 'pjy_bitek'), help='대상 MySQL DB')
+args = parser.parse_args()
+
+conn = connect_mysql(args.database)
 cur = conn.cursor()
 
 # 현재 상태 확인
@@ -53,6 +55,9 @@ cur.execute("""
 """)
 conn.commit()
 
+# 주입 행은 sync_timestamp가 없을 수 있으므로 증분 프로파일 상태 초기화
+reset_profile_state()
+
 # 주입 후 상태
 cur.execute("SELECT COUNT(*) FROM orders_analytics")
 after = cur.fetchone()[0]
@@ -65,4 +70,7 @@ print(f"  phone_number NULL: {null_after:,}건 ({null_after/after*100:.1f}%)")
 print(f"\n✅ 불량 데이터 주입 완료! 이제 analyzer.py를 실행하세요.")
 
 cur.close()
-conn.close()
\ No newline at end of file
+conn.close()
+
+# 오늘 스냅샷이 있으면 대시보드가 주입 결과를 보도록 다시 계산
+refresh_snapshot()
\ No newline at end of file
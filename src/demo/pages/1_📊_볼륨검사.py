@@ -2,14 +2,19 @@ import streamlit as st
 import plotly.graph_objects as go
 import sys, os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from utils.detector import load_volume_history, get_today_rows, check_volume
+from utils.detector_cache import load_volume_history, volume_result, get_snapshot
+from utils.run_monitor import recent_alerts
 from datetime import date
 
 st.header("📊 볼륨 검사")
 
 df = load_volume_history()
-today_rows = get_today_rows()
-vol = check_volume(today_rows, df)
+vol = volume_result()
+today_rows = None if vol.get('no_data') else vol['today_rows']
+
+snap = get_snapshot()
+if snap:
+    st.caption(f"📸 {snap['created_at']} 스냅샷 기준")
 
 # session에 저장 (AI분석 페이지에서 사용)
 st.session_state['vol'] = vol
@@ -39,4 +44,18 @@ elif today_rows and not df.empty:
     fig.update_layout(title="일별 처리 건수 추이", height=400, xaxis_title="날짜", yaxis_title="건수")
     st.plotly_chart(fig, use_container_width=True)
 else:
-    st.info("데이터 없음. collector를 먼저 실행하세요.")
\ No newline at end of file
+    st.info("데이터 없음. collector를 먼저 실행하세요.")
+
+# 실행 단위 모니터링 (15분 주기 동기화 등 하루 여러 번 도는 실행)
+st.subheader("⏱️ 실행별 이상 (최근 24시간)")
+alerts = recent_alerts()
+if alerts:
+    st.dataframe([{
+        '태스크': a['task_name'], '시작': a['start_time'], '슬롯': a['slot'],
+        '소스': a['source_rows'], '타깃': a['target_rows'],
+        '기대': None if a['expected'] is None else round(a['expected']),
+        '점수': None if a['score'] is None else round(a['score'], 2),
+        '심각도': a['severity'], '사유': a['reason'],
+    } for a in alerts], use_container_width=True)
+else:
+    st.success("🟢 최근 24시간 이상 실행 없음")
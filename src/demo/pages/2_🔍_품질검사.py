@@ -1,23 +1,22 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import sys, os
+import sys, os, copy
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from utils.detector import check_quality, load_quality_history
+from utils.detector_cache import volume_result, quality_result, load_quality_history
+from utils.coldiff import describe
+from utils.detector import diff_null_anomalies
 from datetime import date
 
 st.header("🔍 컬럼 품질 검사")
 
 # 오늘 IDMC 실행 기록 확인
-from utils.detector import get_today_rows
-today_rows = get_today_rows()
-
-if today_rows is None:
+if volume_result().get('no_data'):
     st.warning("⚠️ 오늘 IDMC 실행 기록이 없습니다. 품질 검사를 할 수 없습니다.")
     st.info("IDMC 스케줄을 확인하거나, 수동으로 태스크를 실행해주세요.")
     st.stop()
 
-qual = check_quality()
+qual = quality_result()
 qh = load_quality_history()
 
 # session에 저장
@@ -70,6 +69,24 @@ if not qh.empty:
                            xaxis_title="날짜", yaxis_title="NULL %")
         st.plotly_chart(fig3, use_container_width=True)
 
-if qual['anomalies']:
-    for a in qual['anomalies']:
-        st.error(f"🚨 {a['message']}")
\ No newline at end of file
+anomalies = qual['anomalies']
+diff = qual.get('transfer_diff')
+if diff is None and any('current_pct' in a for a in anomalies):
+    # 컬럼 대조는 하루치 Oracle/MySQL을 모두 읽으므로 요청할 때만 (GUARDIAN_DIFF_ON_ANOMALY=1이면 검사 때 실행)
+    if st.button("🔎 Oracle과 컬럼 대조해 원인 추정"):
+        anomalies = copy.deepcopy(anomalies)                  # 캐시된 결과는 건드리지 않음
+        with st.spinner("Oracle ↔ MySQL 대조 중..."):
+            diff = diff_null_anomalies([a for a in anomalies if 'current_pct' in a])
+
+if anomalies:
+    for a in anomalies:
+        st.error(f"🚨 {a['message']}")
+        if a.get('cause_detail'):
+            st.caption(f"🔎 Oracle 대조: {a['cause_detail']}")
+
+if diff and diff.get('error'):
+    st.caption(f"⚠️ Oracle 대조 실패: {diff['error']}")
+elif diff:
+    with st.expander(f"🔎 Oracle ↔ MySQL 컬럼 대조 ({diff['matched_rows']:,}건 일치 키, {diff['elapsed_sec']}초)"):
+        for line in describe(diff) or ['불일치 없음']:
+            st.write(f"• {line}")
\ No newline at end of file
@@ -1,18 +1,16 @@
 import streamlit as st
 import sys, os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from utils.detector import load_volume_history, get_today_rows, check_volume, check_quality
-from utils.ai import run_ai, send_slack
+from utils.detector_cache import volume_result, quality_result
+from utils.ai import stream_ai, parse_ai, send_slack
 
 st.header("🤖 AI 종합 분석")
 
 # 이전 페이지에서 데이터 가져오거나 새로 계산
 if 'vol' not in st.session_state:
-    df = load_volume_history()
-    today_rows = get_today_rows()
-    st.session_state['vol'] = check_volume(today_rows, df)
+    st.session_state['vol'] = volume_result()
 if 'qual' not in st.session_state:
-    st.session_state['qual'] = check_quality()
+    st.session_state['qual'] = quality_result()
 
 vol = st.session_state['vol']
 qual = st.session_state['qual']
@@ -50,14 +48,21 @@ if vol.get('no_data'):
     st.stop()
 
 if st.button("🤖 AI 분석 실행", type="primary"):
-    with st.spinner("Claude AI 분석 중..."):
-        try:
-            ai = run_ai(vol, qual)
-            st.session_state.ai_done = True
-            st.session_state.ai_result = ai
-            st.rerun()
-        except Exception as e:
-            st.error(f"AI 분석 실패: {e}")
+    # 응답을 받는 즉시 화면에 흘려보내고, 완료되면 파싱해서 결과 화면으로 전환
+    text = ""
+    try:
+        with st.status("Claude AI 분석 중...", expanded=True) as status:
+            placeholder = st.empty()
+            for chunk in stream_ai(vol, qual):
+                text += chunk
+                placeholder.code(text + "▌", language="json")
+            status.update(label="분석 완료", state="complete", expanded=False)
+        ai = parse_ai(text)
+        st.session_state.ai_done = True
+        st.session_state.ai_result = ai
+        st.rerun()
+    except Exception as e:
+        st.error(f"AI 분석 실패: {e}")
 
 if st.session_state.ai_done and st.session_state.ai_result:
     ai = st.session_state.ai_result
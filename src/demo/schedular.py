@@ -1,30 +1,219 @@
 # src/demo/scheduler.py
-# 매일 08:00 Oracle에 더미데이터 적재
+# 태스크별 파이프라인을 의존 작업(DAG)으로 실행
+#
+#   load → wait_idmc → collect ─┬─ volume ─┬─ alert
+#                               └─ profile ┘
+#
+#   load     : Oracle 더미데이터 적재 (적재 대상 태스크만)
+#   wait_idmc: 로그를 수집하며 idmc_logs에 적재 이후 성공 실행이 생길 때까지 폴링
+#   collect  : 최종 로그 수집 + 오늘 처리 건수
+#   volume / profile: 볼륨 판정과 품질 프로파일을 동시에
+#   alert    : 스냅샷 저장 + 이상 시 Slack
+#
+# 매일 PIPELINE_HOUR:PIPELINE_MINUTE에 모든 태스크 체인을 병렬로 시작하고,
+# 시작 시 오늘 실행이 빠졌거나 중간에 실패했으면 성공한 작업은 건너뛰고 이어서 보충합니다.
+#
+# 별도로 RUN_MONITOR_INTERVAL분마다 로그를 수집해 완료된 실행을 하나씩 판정합니다 (utils/run_monitor.py).
 
-from apscheduler.schedulers.blocking import BlockingScheduler
+import os
+import asyncio
+import time
+import requests
+from datetime import date, datetime, timezone
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from dotenv import load_dotenv
 from daily_data_loader import generate_daily_data
+from collector import fetch_and_save_logs
+from snapshot import take_snapshot
+from utils.db import get_sqlite
+from utils.detector import TASK_NAME, get_today_rows, check_volume, check_quality
+from utils.pipeline import Job, run_chains, is_complete
+from utils.run_monitor import monitor_runs
 
-scheduler = BlockingScheduler()
+load_dotenv()
 
+PIPELINE_TASKS = [t.strip() for t in os.getenv('PIPELINE_TASKS', TASK_NAME).split(',') if t.strip()]
+LOAD_TASKS = {TASK_NAME}          # Oracle 더미데이터 적재 + MySQL 품질 검사 대상
+PIPELINE_HOUR = int(os.getenv('PIPELINE_HOUR', 8))
+PIPELINE_MINUTE = int(os.getenv('PIPELINE_MINUTE', 0))
+IDMC_POLL_INTERVAL = float(os.getenv('PIPELINE_IDMC_POLL', 60))           # 초
+IDMC_WAIT_TIMEOUT = float(os.getenv('PIPELINE_IDMC_WAIT', 3 * 3600))      # 초
+RUN_MONITOR_INTERVAL = float(os.getenv('RUN_MONITOR_INTERVAL', 5))        # 분
 
-@scheduler.scheduled_job('cron', hour=8, minute=0)
-def job_load_data():
-    print("\n⏰ [08:00] Oracle 데이터 적재 시작...")
-    generate_daily_data()
+# 여러 태스크가 동시에 폴링해도 IDMC API 수집은 한 번씩만
+_collect_lock = None
+_last_collect = {'at': 0.0}
+_running = set()                  # 실행 중인 태스크 (정시 실행과 보충 실행이 겹치지 않게)
 
 
-if __name__ == '__main__':
-    print("🛡️ 데이터 적재 스케줄러 시작!")
-    print("  📦 매일 08:00 - Oracle에 더미데이터 INSERT")
-    print("  그 다음은 IDMC 스케줄이 09:00에 동기화")
-    print("  Ctrl+C로 종료\n")
+def _utc(dt=None):
+    return (dt or datetime.now(timezone.utc)).astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+async def collect_logs(max_age=None):
+    global _collect_lock
+    if _collect_lock is None:
+        _collect_lock = asyncio.Lock()
+    max_age = IDMC_POLL_INTERVAL / 2 if max_age is None else max_age
+    async with _collect_lock:
+        if time.monotonic() - _last_collect['at'] < max_age:
+            return
+        saved = await asyncio.to_thread(fetch_and_save_logs)
+        _last_collect['at'] = time.monotonic()
+        return saved
+
+
+def latest_run(task_name, since):
+    """since(UTC) 이후 가장 최근 IDMC 실행"""
+    with get_sqlite() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT run_id, status, source_rows, target_rows, start_time, end_time FROM idmc_logs
+            WHERE object_name = ? AND start_time >= ? ORDER BY start_time DESC LIMIT 1
+        """, (task_name, since))
+        row = cur.fetchone()
+    if row is None:
+        return None
+    keys = ('run_id', 'status', 'source_rows', 'target_rows', 'start_time', 'end_time')
+    return dict(zip(keys, row))
+
+
+# ============================================================
+# 작업 함수 (ctx: {'task_name', 'run_date', 선행 작업 결과...})
+# ============================================================
+def job_load(ctx):
+    loaded = generate_daily_data(ctx['run_date'])
+    return {'rows': loaded['rows'], 'skipped': loaded['skipped'], 'finished_at': _utc()}
+
+
+async def job_wait_idmc(ctx):
+    # 이번에 새로 적재했으면 적재 이후 실행을, 이미 적재돼 있었으면(보충 실행) 그날 실행을 기다림
+    if ctx.get('load') and not ctx['load'].get('skipped'):
+        since = ctx['load']['finished_at']
+    else:
+        midnight = datetime.combine(ctx['run_date'], datetime.min.time()).astimezone()
+        since = _utc(midnight)
+    while True:
+        try:
+            await collect_logs()
+        except Exception as e:
+            # 일시적인 API 오류는 대기 시간 안에서 다음 폴링으로 (최종 수집 실패는 collect 작업이 기록)
+            print(f"  ⚠️ [{ctx['task_name']}] 로그 수집 실패, 계속 대기: {e}")
+        run = latest_run(ctx['task_name'], since)
+        if run and str(run['status']) == '1':
+            return run
+        await asyncio.sleep(IDMC_POLL_INTERVAL)
+
+
+async def job_collect(ctx):
+    saved = await collect_logs(max_age=0)
+    if ctx['task_name'] in LOAD_TASKS:
+        today_rows = await asyncio.to_thread(get_today_rows)
+    else:
+        today_rows = ctx['wait_idmc']['target_rows'] or None
+    return {'saved': saved or 0, 'today_rows': today_rows}
+
+
+def job_volume(ctx):
+    return check_volume(ctx['collect']['today_rows'], task_name=ctx['task_name'], run_date=ctx['run_date'])
+
+
+def job_profile(ctx):
+    if ctx['task_name'] not in LOAD_TASKS or ctx['collect']['today_rows'] is None:
+        return None
+    return check_quality()
+
 
-    # 시작할 때 오늘치 1회 실행
-    print("🔧 오늘치 즉시 실행...")
-    generate_daily_data()
+def job_alert(ctx):
+    task_name = ctx['task_name']
+    vol, qual = take_snapshot(task_name, ctx['volume'], ctx['profile'], with_quality=task_name in LOAD_TASKS)
+    issues = []
+    if vol['severity'] in ('warning', 'critical', 'no_data'):
+        issues.append(f"볼륨 {vol['severity']} ({vol['today_rows']:,}건, Z={vol['z_score']})")
+    for a in (qual or {}).get('anomalies', []):
+        issues.append(a['message'] + (f" — {a['cause_detail']}" if a.get('cause_detail') else ''))
+    webhook = os.getenv('SLACK_WEBHOOK_URL')
+    if issues and webhook:
+        text = f"🛡️ *[Guardian Pipeline]* {task_name} {ctx['run_date']}\n" + "\n".join(f"  • {i}" for i in issues)
+        requests.post(webhook, json={"text": text}, timeout=10)
+    return {'issues': issues}
 
+
+def build_chain(task_name):
+    jobs = []
+    if task_name in LOAD_TASKS:
+        jobs.append(Job('load', job_load, timeout=1800))
+    jobs += [
+        Job('wait_idmc', job_wait_idmc, deps=['load'] if task_name in LOAD_TASKS else [],
+            timeout=IDMC_WAIT_TIMEOUT, retries=0),
+        Job('collect', job_collect, deps=['wait_idmc'], timeout=300),
+        Job('volume', job_volume, deps=['collect'], timeout=120),
+        Job('profile', job_profile, deps=['collect'], timeout=1800),
+        Job('alert', job_alert, deps=['volume', 'profile'], timeout=120),
+    ]
+    return jobs
+
+
+async def run_pipeline(run_date=None, tasks=None):
+    run_date = run_date or date.today()
+    chains = {task: build_chain(task) for task in (tasks or PIPELINE_TASKS) if task not in _running}
+    if not chains:
+        return {}
+    print(f"\n⏰ [{datetime.now():%H:%M}] 파이프라인 시작: {run_date} — {', '.join(chains)}")
+    _running.update(chains)
+    try:
+        results = await run_chains(chains, run_date)
+    finally:
+        _running.difference_update(chains)
+    for task, statuses in results.items():
+        print(f"  📋 {task}: {statuses}")
+    return results
+
+
+async def watch_runs():
+    """주기 작업: 로그 수집(새 로그가 있으면 collector가 판정) + 다른 프로세스가 수집한 실행도 판정"""
+    try:
+        await collect_logs(max_age=0)
+        await asyncio.to_thread(monitor_runs)
+    except Exception as e:
+        print(f"🚨 실행 모니터링 오류: {e}")
+
+
+async def catch_up():
+    """예정 시각이 지났는데 오늘 체인이 끝나지 않은 태스크를 이어서 실행"""
+    now = datetime.now()
+    if (now.hour, now.minute) < (PIPELINE_HOUR, PIPELINE_MINUTE):
+        return
+    today = date.today()
+    missed = [task for task in PIPELINE_TASKS if not is_complete(task, today, build_chain(task))]
+    if missed:
+        print(f"🔧 누락/미완료 실행 보충: {', '.join(missed)}")
+        await run_pipeline(today, missed)
+
+
+async def main():
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(run_pipeline, 'cron', hour=PIPELINE_HOUR, minute=PIPELINE_MINUTE,
+                      misfire_grace_time=3600, coalesce=True, max_instances=1)
+    scheduler.add_job(watch_runs, 'interval', minutes=RUN_MONITOR_INTERVAL, coalesce=True, max_instances=1)
     scheduler.start()
+
+    print("🛡️ Guardian 파이프라인 스케줄러 시작!")
+    print(f"  📦 매일 {PIPELINE_HOUR:02d}:{PIPELINE_MINUTE:02d} - load → wait_idmc → collect → volume/profile → alert")
+    print(f"  ⏱️ {RUN_MONITOR_INTERVAL:g}분마다 - 실행 단위 모니터링")
+    print(f"  태스크: {', '.join(PIPELINE_TASKS)}")
+    print("  Ctrl+C로 종료\n")
+
+    await catch_up()
+    await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, SystemExit):
+        pass
 '''
 cd D:\JaeYoonP
 python src/demo/scheduler.py
-'''
\ No newline at end of file
+'''
@@ -1,45 +1,48 @@
 # src/demo/seed_history.py
-import sqlite3
 import random
 from datetime import date, timedelta
+from utils.db import get_sqlite
+from utils.volume_stats import rebuild_daily
 
 DOW_VOLUME = {
     0: 4800, 1: 5100, 2: 5300,
     3: 4900, 4: 6100, 5: 7200, 6: 6800
 }
 
-conn = sqlite3.connect('guardian.db')
-cur = conn.cursor()
-
-cur.execute('''
-    CREATE TABLE IF NOT EXISTS task_history (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        task_name TEXT NOT NULL,
-        run_date TEXT NOT NULL,
-        day_of_week INTEGER NOT NULL,
-        rows_processed INTEGER NOT NULL,
-        created_at TEXT DEFAULT (datetime('now','localtime'))
-    )
-''')
-
-cur.execute("DELETE FROM task_history WHERE task_name = 'm_ORDERS_SYNC'")
- 
-for i in range(30, 0, -1):
-    d = date.today() - timedelta(days=i)
-    dow = d.weekday()
-    base = DOW_VOLUME[dow]
-    rows = int(base * random.uniform(0.90, 1.18))
-    
+TASK_NAME = 'm_ORDERS_SYNC'
+
+
+def simulate_rows(d):
+    """요일별 평균 기준 가상 처리 건수"""
+    return int(DOW_VOLUME[d.weekday()] * random.uniform(0.90, 1.18))
+
+
+def insert_volume(cur, d, rows, task_name=TASK_NAME):
     cur.execute(
         'INSERT INTO task_history (task_name, run_date, day_of_week, rows_processed) VALUES (?,?,?,?)',
-        ('m_ORDERS_SYNC', d.strftime('%Y-%m-%d'), dow, rows)
+        (task_name, d.strftime('%Y-%m-%d'), d.weekday(), rows)
     )
-    dow_name = ['월','화','수','목','금','토','일'][dow]
-    print(f'  {d} ({dow_name}) → {rows:,}건')
 
-conn.commit()
-conn.close()
-print('\n✅ 30일치 이력 생성 완료!')
+
+def main(days=30):
+    with get_sqlite() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM task_history WHERE task_name = ?", (TASK_NAME,))
+
+        for i in range(days, 0, -1):
+            d = date.today() - timedelta(days=i)
+            rows = simulate_rows(d)
+            insert_volume(cur, d, rows)
+            dow_name = ['월','화','수','목','금','토','일'][d.weekday()]
+            print(f'  {d} ({dow_name}) → {rows:,}건')
+
+        conn.commit()
+    rebuild_daily(TASK_NAME)
+    print(f'\n✅ {days}일치 이력 생성 완료!')
+
+
+if __name__ == '__main__':
+    main()
 
 '''
 
@@ -0,0 +1,94 @@
+# src/demo/snapshot.py
+# IDMC 동기화(09:00) 이후 볼륨/품질 검사를 1회 계산해 guardian.db에 저장
+#   - daily_snapshot: 페이지가 읽는 당일 결과 (task_name, run_date 1행)
+#   - task_history / quality_history: 당일 행 자동 누적 (재실행 시 삭제 후 재삽입)
+
+import json
+from datetime import date
+from dotenv import load_dotenv
+from utils.db import get_sqlite
+from utils.detector import TASK_NAME, DecimalEncoder, get_today_rows, check_volume, check_quality
+from utils.volume_stats import record_daily
+from utils.baseline import invalidate_baselines
+from utils.detector_cache import invalidate as invalidate_detector_cache
+
+load_dotenv()
+
+UPSERT_SNAPSHOT = '''
+    INSERT INTO daily_snapshot (task_name, run_date, today_rows, severity, quality_anomalies, volume, quality, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now','localtime'))
+    ON CONFLICT(task_name, run_date) DO UPDATE SET
+        today_rows = excluded.today_rows,
+        severity = excluded.severity,
+        quality_anomalies = excluded.quality_anomalies,
+        volume = excluded.volume,
+        quality = excluded.quality,
+        created_at = excluded.created_at
+'''
+
+
+def write_history(cur, run_date, vol, qual, task_name=TASK_NAME, with_quality=True):
+    """당일 task_history / quality_history 행 교체 + 볼륨 누적 통계 반영 (품질 이력은 품질 검사 대상 태스크만)"""
+    day = str(run_date)
+    cur.execute("DELETE FROM task_history WHERE task_name = ? AND run_date = ?", (task_name, day))
+    if not vol.get('no_data'):
+        cur.execute(
+            'INSERT INTO task_history (task_name, run_date, day_of_week, rows_processed) VALUES (?,?,?,?)',
+            (task_name, day, run_date.weekday(), vol['today_rows'])
+        )
+    record_daily(cur, task_name, run_date, None if vol.get('no_data') else vol['today_rows'])
+
+    if not with_quality:
+        return
+    cur.execute("DELETE FROM quality_history WHERE run_date = ?", (day,))
+    if qual is not None:
+        cur.executemany(
+            'INSERT INTO quality_history (run_date, column_name, total_rows, null_count, null_pct) VALUES (?,?,?,?,?)',
+            [(day, col, qual['total_rows'], info['null_count'], info['null_pct'])
+             for col, info in qual['null_checks'].items()]
+        )
+
+
+def take_snapshot(task_name=TASK_NAME, vol=None, qual=None, with_quality=True):
+    """오늘 볼륨/품질 검사 → daily_snapshot 저장 + 이력 누적. (vol, qual) 반환
+
+    파이프라인(schedular.py)처럼 이미 계산한 vol/qual이 있으면 넘겨서 저장만 합니다.
+    """
+    run_date = date.today()
+    if vol is None:
+        vol = check_volume(get_today_rows(), task_name=task_name, run_date=run_date)   # 오늘 이전 누적 통계 기준
+    # 오늘 데이터가 없으면 품질 검사는 의미 없음 (페이지와 같은 기준)
+    if qual is None and with_quality and not vol.get('no_data'):
+        qual = check_quality()
+
+    with get_sqlite() as conn:
+        cur = conn.cursor()
+        write_history(cur, run_date, vol, qual, task_name, with_quality)
+        cur.execute(UPSERT_SNAPSHOT, (
+            task_name, str(run_date), vol['today_rows'], vol['severity'],
+            len(qual['anomalies']) if qual else 0,
+            json.dumps(vol, ensure_ascii=False, cls=DecimalEncoder),
+            json.dumps(qual, ensure_ascii=False, cls=DecimalEncoder),
+        ))
+        conn.commit()
+
+    invalidate_baselines()
+    invalidate_detector_cache()
+    print(f"📸 스냅샷 저장: {run_date} {task_name} — 볼륨 {vol['severity']} ({vol['today_rows']:,}건), "
+          f"품질 이상 {len(qual['anomalies']) if qual else 0}건")
+    return vol, qual
+
+
+def refresh_snapshot(task_name=TASK_NAME):
+    """오늘 스냅샷이 이미 있으면 다시 계산 (데모 주입/정리 후 페이지가 옛 결과를 보지 않게)"""
+    with get_sqlite() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT 1 FROM daily_snapshot WHERE task_name = ? AND run_date = ?", (task_name, str(date.today())))
+        exists = cur.fetchone() is not None
+    if exists:
+        return take_snapshot(task_name)
+    return None
+
+
+if __name__ == '__main__':
+    take_snapshot()
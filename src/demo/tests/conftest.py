@@ -0,0 +1,25 @@
+# tests/conftest.py - src/demo 기준 import 경로 + 임시 guardian.db
+#
+#   cd src/demo && python -m pytest -q tests
+
+import os
+import sys
+import threading
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+def guardian_db(tmp_path, monkeypatch):
+    """임시 guardian.db로 바꾼 utils.db 모듈 (마이그레이션은 첫 연결 때 적용)"""
+    pytest.importorskip('mysql.connector')
+    pytest.importorskip('oracledb')
+    from utils import db
+    monkeypatch.setattr(db, 'GUARDIAN_DB', str(tmp_path / 'guardian.db'))
+    monkeypatch.setattr(db, '_local', threading.local())
+    monkeypatch.setattr(db, '_migrated', False)
+    yield db
+    conn = getattr(db._local, 'sqlite', None)
+    if conn is not None:
+        conn.dispose()
@@ -0,0 +1,65 @@
+# tests/test_agent.py - 복수 SQL 실행: 계획 전체 자동 수정 한도 / 제출 시점 마감 시각 (DB·API 대신 가짜 함수)
+
+import time
+from types import SimpleNamespace
+import pytest
+
+
+class _Client:
+    """messages.create만 흉내 (수정 SQL을 돌려주고 호출 수를 셈)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(content=[SimpleNamespace(text='SELECT 1')], usage={'input_tokens': 10})
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    pytest.importorskip('mysql.connector')
+    pytest.importorskip('oracledb')
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test')
+    from utils import agent
+    client = _Client()
+    monkeypatch.setattr(agent, 'client', client)
+    return agent, client
+
+
+def _state(agent):
+    return {'plan': '{}', 'steps': [], 'error_count': 0, 'usage': agent.empty_usage()}
+
+
+def test_corrections_are_capped_per_plan(agent, monkeypatch):
+    agent, client = agent
+    fail = (lambda sql: 'MYSQL_ERROR: syntax', 'MYSQL_ERROR', '')
+    monkeypatch.setitem(agent.SQL_DIALECTS, 'mysql', fail)
+    monkeypatch.setitem(agent.SQL_DIALECTS, 'oracle', (lambda sql: 'ORACLE_ERROR: x', 'ORACLE_ERROR', ''))
+
+    state = _state(agent)
+    agent.run_sql_plan(state, 'mysql', [f'SELECT {i}' for i in range(5)])
+    assert client.calls == agent.MAX_CORRECTIONS == state['error_count']
+    assert len([s for s in state['steps'] if s['type'] == 'self_correction']) == agent.MAX_CORRECTIONS
+
+    # 같은 계획의 다른 도구는 남은 한도만 사용
+    client.calls = 0
+    budget = agent.CorrectionBudget(used=2)
+    state = {**_state(agent), 'corrections': budget}
+    agent.run_sql_plan(state, 'oracle', ['SELECT 1 FROM DUAL', 'SELECT 2 FROM DUAL'])
+    assert client.calls == 1 and budget.used == state['error_count'] == agent.MAX_CORRECTIONS
+
+
+def test_timeout_is_one_deadline_from_submit(agent, monkeypatch):
+    agent, _ = agent
+    monkeypatch.setattr(agent, 'SQL_TIMEOUT', 0.2)
+    monkeypatch.setattr(agent, 'SQL_CONCURRENCY', 2)
+    monkeypatch.setitem(agent.SQL_DIALECTS, 'mysql', (lambda sql: time.sleep(0.5) or '[]', 'MYSQL_ERROR', ''))
+
+    started = time.monotonic()
+    result = agent.run_sql_plan(_state(agent), 'mysql', [f'SELECT {i}' for i in range(4)])
+    elapsed = time.monotonic() - started
+    # 2 wave × 0.2초 = 0.4초 마감 (문장별로 다시 재면 0.2 + 0.2 + 0.4 + 0.4 = 1.2초까지 기다림)
+    assert elapsed < 0.5
+    assert result.count('TIMEOUT') == 4
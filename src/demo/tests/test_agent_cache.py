@@ -0,0 +1,79 @@
+# tests/test_agent_cache.py - 데이터 워터마크 재사용 / 원천별 버전 반영
+
+import pytest
+
+
+class _Conn:
+    def __init__(self, source):
+        self.source = source
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        self.source.calls += 1
+        if self.source.down:
+            raise RuntimeError('connection refused')
+
+    def fetchone(self):
+        return self.source.row
+
+    def close(self):
+        pass
+
+
+class _Source:
+    def __init__(self, row):
+        self.row, self.calls, self.down = row, 0, False
+
+    def connect(self):
+        return _Conn(self)
+
+
+@pytest.fixture
+def wm(guardian_db, monkeypatch):
+    from utils import agent_cache
+    mysql, oracle = _Source(('2026-10-18 09:00:00', 500)), _Source((500,))
+    monkeypatch.setattr(agent_cache, 'get_mysql', mysql.connect)
+    monkeypatch.setattr(agent_cache, 'get_oracle', oracle.connect)
+    monkeypatch.setattr(agent_cache, 'WATERMARK_TTL', 60)
+    agent_cache.invalidate_watermark()
+    yield agent_cache, mysql, oracle
+    agent_cache.invalidate_watermark()
+
+
+def test_watermark_is_reused_within_ttl(wm, monkeypatch):
+    agent_cache, mysql, oracle = wm
+    first = agent_cache.data_watermark()
+    oracle.row = (501,)
+    assert agent_cache.data_watermark() == first
+    assert (mysql.calls, oracle.calls) == (1, 1)
+
+    monkeypatch.setattr(agent_cache, 'WATERMARK_TTL', 0)
+    assert agent_cache.data_watermark() != first               # 만료 후 Oracle 소스 변경 반영
+    assert (mysql.calls, oracle.calls) == (2, 2)
+
+
+def test_unreachable_source_is_never_reused(wm):
+    agent_cache, mysql, oracle = wm
+    oracle.down = True
+    first = agent_cache.data_watermark()
+    assert 'nooracle-' in first
+    assert agent_cache.data_watermark() != first
+    assert oracle.calls == 2
+
+
+def test_idmc_log_upsert_changes_watermark(wm):
+    agent_cache, _, _ = wm
+    from utils.db import get_sqlite
+    sql = "INSERT OR REPLACE INTO idmc_logs (run_id, status, start_time, end_time) VALUES (?, ?, ?, ?)"
+    with get_sqlite() as conn:
+        conn.execute(sql, ('r1', '1', '2026-10-18T00:00:00', '2026-10-18T00:10:00'))
+        conn.commit()
+    before = agent_cache.data_watermark()
+    with get_sqlite() as conn:
+        # 먼저 시작한 긴 실행이 나중에 끝남: MAX(start_time)은 그대로
+        conn.execute(sql, ('r0', '1', '2026-10-17T23:00:00', '2026-10-18T00:20:00'))
+        conn.commit()
+    agent_cache.invalidate_watermark()
+    assert agent_cache.data_watermark() != before
@@ -0,0 +1,96 @@
+# tests/test_backfill.py - 적재된 날짜의 품질 이력은 실제 데이터 기준, 재실행 시 완료된 날짜 스킵,
+# 병렬 워커끼리 order_id가 겹치지 않음 (Oracle 대신 SQLite)
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import pytest
+
+START, END = date(2026, 10, 5), date(2026, 10, 7)
+
+
+@pytest.fixture
+def backfill(guardian_db, tmp_path, monkeypatch):
+    import backfill
+    import daily_data_loader
+    path = str(tmp_path / 'oracle.db')
+    setup = sqlite3.connect(path)
+    setup.execute("""CREATE TABLE ORDERS (order_id, customer_id, customer_name, phone_number, email, order_date,
+                     total_amount, product_code, product_name, category, order_status, payment_method)""")
+    setup.close()
+
+    def connect():
+        conn = sqlite3.connect(path)
+        conn.create_function('NVL', 2, lambda v, d: d if v is None else v)
+        return conn
+
+    monkeypatch.setattr(daily_data_loader, 'get_oracle', connect)
+    monkeypatch.setattr(backfill, 'get_oracle', connect)
+    # monkeypatch가 워커에도 보이도록 (실제 프로세스 풀 테스트는 fork로 따로)
+    monkeypatch.setattr(backfill, 'ProcessPoolExecutor',
+                        lambda max_workers, mp_context=None: ThreadPoolExecutor(max_workers))
+    monkeypatch.setattr(backfill, 'rebuild_daily', lambda task_name: None)
+    return backfill, connect
+
+
+def _quality(day_iso):
+    from utils.db import get_sqlite
+    with get_sqlite() as conn:
+        return {col: (total, n, pct) for col, total, n, pct in conn.execute(
+            "SELECT column_name, total_rows, null_count, null_pct FROM quality_history WHERE run_date = ?",
+            (day_iso,))}
+
+
+def test_quality_history_comes_from_loaded_rows(backfill):
+    backfill, connect = backfill
+    backfill.backfill(START, START, workers=1, rows=200)
+    conn = connect()
+    conn.execute("UPDATE ORDERS SET phone_number = NULL WHERE order_id <= 30")
+    conn.commit()
+    conn.close()
+
+    total, nulls = backfill.profile_day(START.isoformat(), ['phone_number', 'email'])
+    assert (total, nulls) == (200, {'phone_number': 30, 'email': 0})
+
+    from utils.db import get_sqlite
+    with get_sqlite() as conn:
+        backfill.write_history(conn.cursor(), START.isoformat(), total, nulls)
+        conn.commit()
+        n = conn.execute("SELECT COUNT(*) FROM task_history WHERE run_date = ?", (START.isoformat(),)).fetchone()[0]
+    assert n == 1                                              # 같은 날짜를 다시 써도 한 행
+    assert _quality(START.isoformat()) == {'phone_number': (200, 30, 15.0), 'email': (200, 0, 0.0)}
+
+
+def test_rerun_skips_only_fully_loaded_days(backfill, monkeypatch):
+    backfill, connect = backfill
+    real = backfill.load_day
+
+    def fail_second_day(day_iso, *args):
+        if day_iso == '2026-10-06':
+            raise RuntimeError('boom')
+        return real(day_iso, *args)
+
+    monkeypatch.setattr(backfill, 'load_day', fail_second_day)
+    assert backfill.backfill(START, END, workers=1, rows=100) == 200
+
+    monkeypatch.setattr(backfill, 'load_day', real)
+    assert backfill.backfill(START, END, workers=1, rows=100) == 100           # 실패한 날짜만 다시
+    conn = connect()
+    assert conn.execute("SELECT COUNT(*) FROM ORDERS").fetchone()[0] == 300
+    conn.close()
+
+
+def test_parallel_workers_get_disjoint_order_ids(backfill, monkeypatch):
+    backfill, connect = backfill
+    from concurrent.futures import ProcessPoolExecutor
+    monkeypatch.setattr(backfill, 'ProcessPoolExecutor', ProcessPoolExecutor)
+    monkeypatch.setattr(backfill, 'MP_CONTEXT', 'fork')                       # 자식이 SQLite 대체 연결을 물려받도록
+    backfill.backfill(date(2026, 10, 5), date(2026, 10, 8), workers=4, rows=300)
+
+    conn = connect()
+    total, distinct = conn.execute("SELECT COUNT(*), COUNT(DISTINCT order_id) FROM ORDERS").fetchone()
+    conn.close()
+    assert (total, distinct) == (1200, 1200)
+    from utils.db import get_sqlite
+    with get_sqlite() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM load_runs WHERE status = 'done'").fetchone()[0] == 4
@@ -0,0 +1,88 @@
+# tests/test_coldiff.py - 컬럼 단위 비교와 NULL 원인 추정 (SQLite 대역)
+
+import pytest
+from utils.coldiff import column_diff
+from utils.reconcile import standin_side
+
+DAY = '2026-10-02'
+
+
+def _orders(n=300):
+    return [(i, i % 7, f"고객{i}", f"010-{i:04d}", f"c{i}@example.com", DAY, 1000 + i,
+             'P1', '상품', 'cat', 'DONE', 'CARD') for i in range(1, n + 1)]
+
+
+def _with_phone(row, phone):
+    return row[:3] + (phone,) + row[4:]
+
+
+def test_column_diff_categories():
+    rows = _orders()
+    src = list(rows)
+    src[4] = _with_phone(src[4], None)                          # 5: 소스부터 NULL
+    tgt = list(rows)
+    tgt[0] = _with_phone(tgt[0], None)                          # 1: 소스 값 → 타깃 NULL
+    tgt[1] = _with_phone(tgt[1], '')                            # 2: '' 도 NULL로 취급
+    tgt[2] = _with_phone(tgt[2], '010-9999')                    # 3: 값 변경
+    tgt.append(_with_phone((999,) + rows[0][1:], None))         # 999: 추가 행의 NULL
+    del tgt[9]                                                  # 10: 누락
+
+    summary = column_diff(standin_side('src', src), standin_side('tgt', tgt), {'day': DAY})
+    phone = summary['columns']['phone_number']
+    assert phone['null_in_target'] == 2 and phone['sample_keys'][:2] == [1, 2]
+    assert phone['null_in_source'] == 1
+    assert phone['value_changed'] == 1
+    assert phone['null_in_extra'] == 1
+    assert summary['missing'] == {'count': 1, 'sample': [10]}
+    assert summary['extra'] == {'count': 1, 'sample': [999]}
+    assert summary['matched_rows'] == 299
+    assert list(summary['columns']) == ['phone_number']
+
+
+def _anomaly():
+    return {'column': 'phone_number', 'current_pct': 12.0, 'prev_avg': 1.0, 'diff': 11.0}
+
+
+def _summary(matched, missing=0, extra=0, columns=None):
+    return {'matched_rows': matched, 'missing': {'count': missing, 'sample': []},
+            'extra': {'count': extra, 'sample': []}, 'columns': columns or {}}
+
+
+@pytest.fixture
+def explain():
+    pytest.importorskip('mysql.connector')
+    pytest.importorskip('oracledb')
+    from utils.detector import explain_null_anomalies
+    return explain_null_anomalies
+
+
+def test_explain_keeps_pct_diff(explain):
+    info = {'null_in_target': 3, 'null_in_extra': 0, 'sample_keys': [1, 2, 3]}
+    a = explain([_anomaly()], _summary(100, columns={'phone_number': info}))[0]
+    assert a['cause'] == 'etl_transform'
+    assert a['diff'] == 11.0
+    assert a['transfer_counts'] == {'null_in_target': 3, 'null_in_extra': 0}
+
+
+def test_explain_row_mismatch_is_not_source(explain):
+    # 타깃 행이 전혀 맞지 않으면(날짜 필터 불일치 등) 소스 문제로 단정하지 않음
+    a = explain([_anomaly()], _summary(0, missing=500))[0]
+    assert a['cause'] == 'row_mismatch'
+    a = explain([_anomaly()], _summary(100))[0]
+    assert a['cause'] == 'source'
+
+
+def test_day_scope_is_half_open_range():
+    # 다음 날 행은 제외, 컬럼을 함수로 감싸지 않아 order_date 인덱스를 씀
+    rows = _orders(5) + [(i, 0, '고객', '010', 'e', '2026-10-03', 1, 'P1', '상품', 'cat', 'DONE', 'CARD')
+                         for i in range(6, 9)]
+    side = standin_side('src', rows)
+    where, params = side._where({'day': DAY})
+    assert where == "order_date >= ? AND order_date < ?" and params == [DAY, '2026-10-03']
+    summary = column_diff(side, standin_side('tgt', rows), {'day': DAY})
+    assert summary['source_rows'] == summary['matched_rows'] == 5
+
+    from utils.reconcile import Side
+    oracle = Side('oracle', 'oracle', None, 'ORDERS')
+    assert oracle._where({'day': DAY})[0] == \
+        "order_date >= TO_DATE(?, 'YYYY-MM-DD') AND order_date < TO_DATE(?, 'YYYY-MM-DD')"
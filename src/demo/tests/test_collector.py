@@ -0,0 +1,88 @@
+# tests/test_collector.py - IDMC activityLog 수집 (utils/idmc_stub.py 스텁 서버)
+
+from datetime import datetime, timedelta, timezone
+import pytest
+from utils.idmc_stub import IDMCStub, make_logs
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+ACTIVITY = '/api/v2/activity/activityLog'
+
+
+def _iso(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def _run(run_id, start, minutes, rows=5000):
+    return {'runId': run_id, 'objectName': 'm_ORDERS_SYNC', 'state': 1,
+            'successSourceRows': rows, 'successTargetRows': rows,
+            'startTime': _iso(start), 'endTime': _iso(start + timedelta(minutes=minutes))}
+
+
+@pytest.fixture
+def collector(guardian_db, monkeypatch):
+    import collector
+    from utils import idmc
+    stub = IDMCStub(make_logs(450, start=START)).start()       # 15분 간격, 30초짜리 실행
+    monkeypatch.setenv('IDMC_LOGIN_URL', stub.url)
+    monkeypatch.setattr(collector, 'PAGE_SIZE', 100)
+    monkeypatch.setattr(collector, 'LOOKBACK_MINUTES', 120)
+    monkeypatch.setattr(collector, 'monitor_runs', lambda: [])
+    idmc.invalidate_session()
+    yield collector, stub
+    stub.stop()
+    idmc.invalidate_session()
+
+
+def _pages(stub):
+    return [p for method, path, p in stub.requests if path == ACTIVITY]
+
+
+def _stored(db):
+    conn = db.get_sqlite()
+    rows = dict(conn.execute("SELECT run_id, end_time FROM idmc_logs").fetchall())
+    conn.close()
+    return rows
+
+
+def test_first_collect_reads_every_page(collector, guardian_db):
+    collector, stub = collector
+    assert collector.fetch_and_save_logs() == 450
+    assert [p['offset'] for p in _pages(stub)] == ['0', '100', '200', '300', '400']
+    assert all(p['rowLimit'] == '100' for p in _pages(stub))
+    assert len(_stored(guardian_db)) == 450
+
+
+def test_incremental_collect_stops_early(collector, guardian_db):
+    collector, stub = collector
+    collector.fetch_and_save_logs()
+    stub.requests.clear()
+    last = START + timedelta(minutes=15 * 449)
+    stub.add_logs([_run(str(1000 + i), last + timedelta(minutes=15 * (i + 1)), 1) for i in range(3)])
+
+    saved = collector.fetch_and_save_logs()
+    assert [p['offset'] for p in _pages(stub)] == ['0']         # 첫 페이지에서 lookback 밖 로그 발견
+    assert saved == 4                                          # 신규 3건 + 마지막 endTime과 같은 실행 1건
+    assert len(_stored(guardian_db)) == 453
+
+
+def test_long_run_finishing_after_collection_is_kept(collector, guardian_db):
+    collector, stub = collector
+    last = START + timedelta(minutes=15 * 449)
+    # 마지막 저장 실행보다 먼저 시작했지만 수집 이후에 끝난 긴 실행 + 그 사이 짧은 실행
+    long_run = _run('long', last - timedelta(minutes=30), 90)
+    collector.fetch_and_save_logs()
+    stub.add_logs([long_run, _run('short', last + timedelta(minutes=15), 1)])
+
+    collector.fetch_and_save_logs()
+    stored = _stored(guardian_db)
+    assert stored['long'] == long_run['endTime']
+    assert 'short' in stored
+
+
+def test_collect_failure_is_raised(collector, guardian_db):
+    # 파이프라인이 성공으로 기록하지 않도록 오류를 삼키지 않음
+    collector, stub = collector
+    stub.stop()
+    with pytest.raises(Exception):
+        collector.fetch_and_save_logs()
+    assert _stored(guardian_db) == {}
@@ -0,0 +1,73 @@
+# tests/test_daily_data_loader.py - 중간 커밋 후 중단된 날짜 이어서 적재 (Oracle 대신 SQLite)
+
+import sqlite3
+from datetime import date
+import pytest
+
+DAY = date(2026, 10, 5)
+
+
+class _Crash(Exception):
+    pass
+
+
+@pytest.fixture
+def loader(guardian_db, tmp_path, monkeypatch):
+    import daily_data_loader
+    path = str(tmp_path / 'oracle.db')
+    setup = sqlite3.connect(path)
+    setup.execute("""CREATE TABLE ORDERS (order_id, customer_id, customer_name, phone_number, email, order_date,
+                     total_amount, product_code, product_name, category, order_status, payment_method)""")
+    setup.close()
+
+    def connect():
+        conn = sqlite3.connect(path)
+        conn.create_function('NVL', 2, lambda v, d: d if v is None else v)
+        return conn
+
+    monkeypatch.setattr(daily_data_loader, 'get_oracle', connect)
+    return daily_data_loader, connect
+
+
+def _count(connect):
+    conn = connect()
+    n = conn.execute("SELECT COUNT(*), COUNT(DISTINCT order_id) FROM ORDERS WHERE order_date = ?", (DAY,)).fetchone()
+    conn.close()
+    return n
+
+
+def test_partial_day_is_resumed(loader, monkeypatch):
+    loader, connect = loader
+    real = loader.build_rows
+    calls = []
+
+    def crash_after_two(*args):
+        calls.append(args)
+        if len(calls) > 2:
+            raise _Crash()
+        return real(*args)
+
+    monkeypatch.setattr(loader, 'build_rows', crash_after_two)
+    with pytest.raises(_Crash):
+        loader.generate_daily_data(DAY, rows=1000, batch_size=100, commit_every=200)
+    assert _count(connect) == (200, 200)                        # 중간 커밋까지만 남음
+    assert loader.load_state(DAY)['status'] == 'loading'
+
+    monkeypatch.setattr(loader, 'build_rows', real)
+    result = loader.generate_daily_data(DAY, batch_size=100, commit_every=200)
+    assert result == {'rows': 1000, 'inserted': 800, 'skipped': False}
+    assert _count(connect) == (1000, 1000)
+    assert loader.load_state(DAY) == {'planned': 1000, 'status': 'done', 'rows_loaded': 1000}
+
+    again = loader.generate_daily_data(DAY, rows=1000)
+    assert again == {'rows': 1000, 'inserted': 0, 'skipped': True}
+
+
+def test_day_loaded_before_markers_is_complete(loader):
+    loader, connect = loader
+    conn = connect()
+    conn.executemany("INSERT INTO ORDERS VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", loader.build_rows(1, 50, DAY))
+    conn.commit()
+    conn.close()
+    assert loader.generate_daily_data(DAY, rows=1000)['skipped']
+    assert loader.load_state(DAY)['status'] == 'done'
@@ -0,0 +1,31 @@
+# tests/test_db.py - 스레드 로컬 SQLite 핸들 반납/롤백
+
+import sqlite3
+import pytest
+
+
+def test_handle_is_reused_and_nested(guardian_db):
+    with guardian_db.get_sqlite() as outer:
+        with guardian_db.get_sqlite() as inner:
+            assert inner is outer
+            assert outer._depth == 2
+        assert outer._depth == 1
+    assert outer._depth == 0
+
+
+def test_error_releases_write_lock(guardian_db):
+    with pytest.raises(RuntimeError):
+        with guardian_db.get_sqlite() as conn:
+            conn.execute("INSERT INTO agent_cache (cache_key, question_norm, watermark, result, created_at, last_hit) "
+                         "VALUES ('k', 'q', 'w', '{}', 0, 0)")
+            assert conn.in_transaction
+            raise RuntimeError('boom')
+
+    assert conn._depth == 0 and not conn.in_transaction
+    # 다른 연결이 곧바로 쓸 수 있어야 함 (RESERVED 잠금이 남아 있으면 timeout 후 실패)
+    other = sqlite3.connect(guardian_db.GUARDIAN_DB, timeout=0.1)
+    other.execute("INSERT INTO agent_cache (cache_key, question_norm, watermark, result, created_at, last_hit) "
+                  "VALUES ('k2', 'q', 'w', '{}', 0, 0)")
+    other.commit()
+    assert other.execute("SELECT cache_key FROM agent_cache").fetchall() == [('k2',)]
+    other.close()
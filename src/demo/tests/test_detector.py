@@ -0,0 +1,33 @@
+# tests/test_detector.py - 볼륨 판정은 탐지기 레지스트리(GUARDIAN_DETECTORS 지정)를 그대로 따름
+
+from datetime import date, timedelta
+import pandas as pd
+import pytest
+
+RUN_DATE = date(2026, 10, 18)
+
+
+@pytest.fixture
+def registry(guardian_db, monkeypatch):
+    from utils import detectors
+    monkeypatch.setattr(detectors, '_assignments', dict(detectors._assignments))
+    return detectors
+
+
+def _history(days=42):
+    dates = [RUN_DATE - timedelta(days=days - i) for i in range(days)]
+    return pd.DataFrame({'run_date': [str(d) for d in dates], 'day_of_week': [d.weekday() for d in dates],
+                         'rows_processed': [10000 + (i % 7) * 300 + (i * 37) % 200 for i in range(days)]})
+
+
+def test_check_volume_uses_task_assignment(registry):
+    from utils.detector import check_volume
+    registry.assign('volume', 'mad', task='T_MAD')
+    df = _history()
+
+    r = check_volume(14000, df=df, task_name='T_MAD', run_date=RUN_DATE)
+    expected = registry.score_latest(registry.detector_for('T_MAD', 'volume'), df['rows_processed'].values,
+                                     df['day_of_week'].values, 14000, RUN_DATE.weekday())
+    assert r['detector'] == 'mad'
+    assert (r['severity'], r['z_score']) == (expected['severity'], round(expected['score'], 2))
+    assert check_volume(14000, df=df, task_name='OTHER', run_date=RUN_DATE)['detector'] == 'zscore'
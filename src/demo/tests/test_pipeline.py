@@ -0,0 +1,46 @@
+# tests/test_pipeline.py - 타임아웃 후에도 도는 동기 작업은 끝날 때까지 재시도하지 않음
+
+import asyncio
+import threading
+from datetime import date
+
+RUN_DATE = date(2026, 10, 18)
+
+
+def test_timed_out_thread_blocks_retry_until_it_finishes(guardian_db):
+    from utils import pipeline
+    calls, release = [], threading.Event()
+
+    def slow(ctx):
+        calls.append(ctx['run_date'])
+        release.wait(5)
+        return {'rows': 1}
+
+    job = pipeline.Job('load', slow, timeout=0.05, retries=2, retry_delay=0)
+
+    async def scenario():
+        first = await pipeline.run_chain('T', RUN_DATE, [job])
+        error = pipeline.load_job_runs('T', RUN_DATE)['load']['error']
+        release.set()
+        while pipeline._alive:                       # 버려진 스레드가 끝날 때까지
+            await asyncio.sleep(0.01)
+        second = await pipeline.run_chain('T', RUN_DATE, [job])
+        return first, error, second
+
+    first, error, second = asyncio.run(scenario())
+    assert first == {'load': 'failed'}
+    assert len(calls) == 2                            # 첫 실행은 1번만 (재시도 2회 생략)
+    assert error.startswith('TIMEOUT') and '실행 중' in error
+    assert second == {'load': 'success'}
+
+
+def test_failed_job_is_recorded_as_failed(guardian_db):
+    from utils import pipeline
+
+    def broken(ctx):
+        raise RuntimeError('IDMC 401')
+
+    job = pipeline.Job('collect', broken, retries=1, retry_delay=0)
+    assert asyncio.run(pipeline.run_chain('T', RUN_DATE, [job])) == {'collect': 'failed'}
+    runs = pipeline.load_job_runs('T', RUN_DATE)['collect']
+    assert runs['attempts'] == 2 and runs['error'].startswith('IDMC 401')
@@ -0,0 +1,103 @@
+# tests/test_profiler.py - 증분 프로파일 워터마크: 같은 시각 늦은 커밋 / 재동기화(UPDATE) (MySQL 대신 SQLite)
+
+import sqlite3
+import pytest
+
+T0, T1 = '2026-10-18 09:00:00', '2026-10-18 10:00:00'
+
+
+class _MySQL:
+    """mysql.connector 흉내: %s 바인딩, cursor(dictionary=True)"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+
+    def cursor(self, dictionary=False):
+        cur = self.conn.cursor()
+        outer = self
+
+        class Cursor:
+            def execute(self, sql, params=()):
+                cur.execute(sql.replace('%s', '?'), params)
+
+            def fetchone(self):
+                return cur.fetchone()
+
+            def fetchall(self):
+                rows = cur.fetchall()
+                if dictionary:
+                    names = [c[0] for c in cur.description]
+                    rows = [dict(zip(names, r)) for r in rows]
+                return rows
+
+            def close(self):
+                cur.close()
+        return Cursor()
+
+    def close(self):
+        self.conn.close()
+
+
+@pytest.fixture
+def mysql(guardian_db, tmp_path, monkeypatch):
+    from utils import profiler
+    path = str(tmp_path / 'mysql.db')
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE orders_analytics (order_id INTEGER PRIMARY KEY, order_date TEXT, phone_number TEXT,
+                    email TEXT, total_amount REAL, category TEXT, sync_timestamp TEXT)""")
+    conn.commit()
+    monkeypatch.setattr(profiler, 'get_mysql', lambda: _MySQL(path))
+    return profiler, conn
+
+
+def _insert(conn, rows):
+    conn.executemany("INSERT OR REPLACE INTO orders_analytics VALUES (?,?,?,?,?,?,?)", rows)
+    conn.commit()
+
+
+def _row(i, day='2026-10-18', phone='010', sync=T0):
+    return (i, day, phone, 'a@b.c', 1000.0, '식품', sync)
+
+
+COLUMNS = ['phone_number', 'email']
+
+
+def test_late_commit_with_boundary_timestamp_is_counted(mysql):
+    profiler, conn = mysql
+    _insert(conn, [_row(i) for i in range(1, 6)])
+    assert profiler.incremental_profile(COLUMNS)['total_rows'] == 5
+
+    # 직전 실행 뒤에 같은 sync_timestamp로 커밋된 행 (sync > 워터마크였다면 건너뜀)
+    _insert(conn, [_row(6, phone=None), _row(7)])
+    profile = profiler.incremental_profile(COLUMNS)
+    assert profile['total_rows'] == 7
+    assert profile['nulls']['phone_number'] == 1
+    assert profiler.incremental_profile(COLUMNS)['total_rows'] == 7       # 새 행 없으면 그대로
+
+
+def test_resynced_rows_are_not_double_counted(mysql):
+    profiler, conn = mysql
+    _insert(conn, [_row(i) for i in range(1, 6)] + [_row(i, day='2026-10-17') for i in range(6, 9)])
+    assert profiler.incremental_profile(COLUMNS)['total_rows'] == 8
+
+    # 2건 재동기화(값 변경 + 새 sync_timestamp) + 신규 1건
+    _insert(conn, [_row(1, phone=None, sync=T1), _row(2, sync=T1), _row(9, sync=T1)])
+    profile = profiler.incremental_profile(COLUMNS)
+    assert profile['total_rows'] == 9
+    assert profile['nulls']['phone_number'] == 1
+    assert profile['categories'] == {'식품': 9}
+    assert profile['recounted'] == ['2026-10-18']
+
+    # 전체 재계산과 같은 결과
+    assert profiler.incremental_profile(COLUMNS, rebuild=True) == {**profile, 'recounted': []}
+
+
+def test_state_without_key_is_rebuilt(mysql):
+    profiler, conn = mysql
+    _insert(conn, [_row(i) for i in range(1, 4)])
+    profiler.incremental_profile(COLUMNS)
+    from utils.db import get_sqlite
+    with get_sqlite() as sq:
+        sq.execute("UPDATE profile_watermark SET last_key = NULL")       # 키 워터마크 이전 상태
+        sq.commit()
+    assert profiler.incremental_profile(COLUMNS)['total_rows'] == 3
@@ -0,0 +1,77 @@
+# tests/test_prompts.py - 캐시 블록 구성(실제 테이블 정의) / 브레이크포인트 수 / 캐시 사용량 확인
+
+import pytest
+from utils import prompts as P
+
+DDL = {'mysql': "CREATE TABLE orders_analytics (\n  order_id int NOT NULL,\n  sync_timestamp datetime\n);",
+       'oracle': "CREATE TABLE ORDERS (\n  ORDER_ID NUMBER(10,0) NOT NULL\n);"}
+
+
+@pytest.fixture(autouse=True)
+def schema(monkeypatch):
+    calls = []
+
+    def table_ddl(dialect, table):
+        calls.append((dialect, table))
+        return DDL[dialect]
+
+    monkeypatch.setattr(P, '_schema', {})
+    monkeypatch.setattr(P, 'table_ddl', table_ddl)
+    return calls
+
+
+def _breakpoints(system, messages=()):
+    blocks = list(system)
+    for msg in messages:
+        if isinstance(msg['content'], list):
+            blocks += msg['content']
+    return [b for b in blocks if 'cache_control' in b]
+
+
+@pytest.mark.parametrize('build', [P.plan_system, P.analyze_system])
+def test_single_cached_block_over_minimum(build):
+    system = build('2026-10-18')
+    cached = _breakpoints(system)
+    assert len(cached) == 1
+    assert system[0] is cached[0]                            # 고정 블록이 맨 앞, 날짜는 그 뒤
+    assert P.estimate_tokens(cached[0]['text']) >= P.MIN_CACHE_TOKENS
+    assert '2026-10-18' not in cached[0]['text']
+    assert DDL['mysql'] in cached[0]['text'] and DDL['oracle'] in cached[0]['text']
+
+
+def test_short_prefix_is_sent_without_cache_control(monkeypatch):
+    monkeypatch.setattr(P, 'MIN_CACHE_TOKENS', 100000)
+    system = P.plan_system('2026-10-18')
+    assert _breakpoints(system) == []
+    assert P.check_cache({'input_tokens': 1580}, system)             # 캐시를 요청하지 않았으므로 미적용 아님
+
+
+def test_schema_is_read_once_and_falls_back(schema, monkeypatch):
+    P.plan_system('2026-10-18')
+    P.analyze_system('2026-10-18')
+    assert schema == P.SCHEMA_TABLES                                 # 프로세스당 1회
+
+    def down(dialect, table):
+        raise ConnectionError('down')
+
+    monkeypatch.setattr(P, '_schema', {})
+    monkeypatch.setattr(P, 'table_ddl', down)
+    assert P.schema_ddl() == P.FALLBACK_SCHEMA
+
+
+def test_history_has_no_extra_breakpoint():
+    history = [{'role': 'user', 'content': '오늘 건수?'}, {'role': 'assistant', 'content': '5,000건'}]
+    messages = P.plan_messages(history, '어제는?')
+    assert _breakpoints(P.plan_system('2026-10-18'), messages) == P.plan_system('2026-10-18')[:1]
+    assert messages[-1] == {'role': 'user', 'content': '어제는?'}
+
+
+def test_check_cache():
+    system = P.plan_system('2026-10-18')
+    assert P.check_cache({'input_tokens': 80, 'cache_read_input_tokens': 1500}, system)
+    assert P.check_cache({'input_tokens': 80, 'cache_creation_input_tokens': 1500}, system)
+    assert not P.check_cache({'input_tokens': 1580, 'cache_read_input_tokens': 0}, system)
+
+    total = P.add_usage(P.empty_usage(), {'input_tokens': 1580})
+    P.note_cache(total, {'input_tokens': 1580}, system, 'plan')
+    assert total['cache_miss'] == ['plan'] and total['input_tokens'] == 1580
@@ -0,0 +1,102 @@
+# tests/test_reconcile.py - 파티션 해시 대사 (SQLite 대역 + 방언별 SQL 문자열)
+
+import random
+import pytest
+from utils import reconcile as R
+
+
+def _orders(n=5000, seed=1):
+    rng = random.Random(seed)
+    return [(i, i % 97, f"고객{i}", f"010-{i:04d}", f"c{i}@example.com", f"2026-10-{1 + i % 18:02d}",
+             round(rng.random() * 1e5, 2), 'P1', '상품', 'cat', 'DONE', 'CARD') for i in range(1, n + 1)]
+
+
+@pytest.fixture(scope='module')
+def sides():
+    rows = _orders()
+    tgt = list(rows)
+    tgt[100] = tgt[100][:3] + (None,) + tgt[100][4:]        # 101: 값 → NULL
+    tgt[3000] = tgt[3000][:6] + (1.5,) + tgt[3000][7:]      # 3001: 금액 변경
+    del tgt[2000]                                           # 2001: 누락
+    tgt.append((9000,) + rows[0][1:])                       # 9000: 추가
+    return R.standin_side('src', rows), R.standin_side('tgt', tgt), R.standin_side('same', rows)
+
+
+@pytest.mark.parametrize('by', ['order_id', 'order_date'])
+def test_reconcile_finds_planted_differences(sides, by):
+    src, tgt, _ = sides
+    result = R.reconcile(src, tgt, by=by, partitions=8, fanout=4, leaf_rows=100)
+    assert result['counts'] == {'missing': 1, 'extra': 1, 'changed': 2}
+    assert result['missing'] == [2001]
+    assert result['extra'] == [9000]
+    assert result['changed'] == [101, 3001]
+    assert not result['match']
+    assert result['levels'] > 1                              # 실제로 드릴다운했는지
+
+
+def test_reconcile_identical(sides):
+    src, _, same = sides
+    result = R.reconcile(src, same, partitions=8, fanout=4, leaf_rows=100)
+    assert result['match']
+    assert result['source_rows'] == result['target_rows'] == 5000
+
+
+def test_day_filter(sides):
+    src, _, _ = sides
+    stats = src.day_stats()
+    assert len(stats) == 18
+    where, params = src._where({'day': '2026-10-02'})
+    rows = src.query(f"SELECT COUNT(*) FROM {src.table} WHERE {where}", params)
+    assert rows[0][0] == stats['2026-10-02'][0]
+
+
+class _Recorder:
+    """실행된 (SQL, 파라미터)만 기록하는 가짜 커넥션"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def __call__(self):
+        return self
+
+    def cursor(self, **kwargs):
+        return self
+
+    def execute(self, sql, params=()):
+        self.executed.append((sql, params))
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+def test_mysql_sql_keeps_date_format_literal():
+    conn = _Recorder([('2026-10-02', 3, 123, 1, 3)])
+    side = R.Side('mysql', 'mysql', conn, 'orders_analytics')
+    side.day_stats()
+    where, params = side._where({'lo': 1, 'hi': 9, 'day': '2026-10-02'})
+    side.query(f"SELECT COUNT(*) FROM orders_analytics WHERE {where}", params)
+
+    day_sql, _ = conn.executed[0]
+    assert "DATE_FORMAT(order_date, '%Y-%m-%d')" in day_sql
+    assert '%%' not in day_sql
+    assert "CAST(CONV(SUBSTRING(MD5(CONCAT_WS('|', " in day_sql
+    filter_sql, filter_params = conn.executed[1]
+    assert "order_id BETWEEN %s AND %s AND order_date >= %s AND order_date < %s" in filter_sql
+    assert '?' not in filter_sql
+    assert filter_params == (1, 9, '2026-10-02', '2026-10-03')
+
+
+def test_oracle_sql_numbered_binds():
+    conn = _Recorder([])
+    side = R.Side('oracle', 'oracle', conn, 'ORDERS')
+    side.bucket_stats({'lo': 1, 'hi': 100, 'day': '2026-10-02'}, 10)
+    sql, params = conn.executed[0]
+    assert 'FLOOR((order_id - :1) / :2)' in sql
+    assert ("order_id BETWEEN :3 AND :4 AND order_date >= TO_DATE(:5, 'YYYY-MM-DD') "
+            "AND order_date < TO_DATE(:6, 'YYYY-MM-DD')") in sql
+    assert "STANDARD_HASH(" in sql and "NVL(TO_CHAR(order_date, 'YYYY-MM-DD'), '<null>')" in sql
+    assert params == (1, 10, 1, 100, '2026-10-02', '2026-10-03')
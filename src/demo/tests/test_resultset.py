@@ -0,0 +1,64 @@
+# tests/test_resultset.py - 행 수 상한 주입 (SELECT/WITH만, 끝 주석·세미콜론 제거) + fetchmany 요약
+
+import pytest
+from utils.resultset import bound_sql, strip_comments, run_bounded
+
+
+@pytest.mark.parametrize('sql, dialect, expected', [
+    ("SELECT * FROM t", 'mysql', "SELECT * FROM t LIMIT 11"),
+    ("SELECT * FROM t; -- 전체 조회\n", 'mysql', "SELECT * FROM t LIMIT 11"),
+    ("SELECT * FROM t -- 전체 조회", 'oracle', "SELECT * FROM t FETCH FIRST 11 ROWS ONLY"),
+    ("SELECT * FROM t /* 메모 */ ;", 'oracle', "SELECT * FROM t FETCH FIRST 11 ROWS ONLY"),
+    ("select * from t LIMIT 500;", 'mysql', "select * from t LIMIT 11"),
+    ("SELECT * FROM t LIMIT 3 -- 세 건", 'mysql', "SELECT * FROM t LIMIT 3"),
+    ("WITH x AS (SELECT 1 a FROM dual) SELECT * FROM x", 'oracle',
+     "WITH x AS (SELECT 1 a FROM dual) SELECT * FROM x FETCH FIRST 11 ROWS ONLY"),
+    ("(SELECT 1) UNION (SELECT 2)", 'mysql', "(SELECT 1) UNION (SELECT 2) LIMIT 11"),
+    ("SHOW TABLES;", 'mysql', "SHOW TABLES"),
+    ("-- 컬럼 확인\nDESCRIBE orders_analytics", 'mysql', "DESCRIBE orders_analytics"),
+    ("EXPLAIN SELECT * FROM t", 'mysql', "EXPLAIN SELECT * FROM t"),
+])
+def test_bound_sql(sql, dialect, expected):
+    assert bound_sql(sql, dialect, max_rows=10) == expected
+
+
+def test_strip_comments_keeps_strings_and_hints():
+    assert strip_comments("SELECT '--x', \"a#b\" FROM t -- c", 'mysql') == "SELECT '--x', \"a#b\" FROM t"
+    assert strip_comments("SELECT 'it''s -- ok' FROM t", 'oracle') == "SELECT 'it''s -- ok' FROM t"
+    assert strip_comments("SELECT /*+ INDEX(o) */ * FROM ORDERS o", 'oracle') == \
+        "SELECT /*+ INDEX(o) */ * FROM ORDERS o"
+    assert strip_comments("SELECT 5--1", 'mysql') == "SELECT 5--1"            # MySQL은 공백 없는 --는 연산자
+    assert strip_comments("SELECT COL# FROM T", 'oracle') == "SELECT COL# FROM T"
+    assert strip_comments("SELECT 'C:\\' FROM dual -- x", 'oracle') == "SELECT 'C:\\' FROM dual"
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self.rows, self.description, self.fetched, self.executed = rows, [('n',)], 0, None
+
+    def execute(self, sql):
+        self.executed = sql
+
+    def fetchmany(self, size):
+        batch = self.rows[self.fetched:self.fetched + size]
+        self.fetched += len(batch)
+        return batch
+
+    def close(self):
+        pass
+
+
+class _Conn:
+    def __init__(self, rows):
+        self.cur = _Cursor(rows)
+
+    def cursor(self):
+        return self.cur
+
+
+def test_unbounded_statement_is_capped_by_fetchmany():
+    conn = _Conn([(i,) for i in range(1000)])
+    result = run_bounded(conn, "SHOW PROCESSLIST", 'oracle', max_rows=50, batch_size=20)
+    assert conn.cur.executed == "SHOW PROCESSLIST"
+    assert '"row_count": 50' in result and '"truncated": true' in result
+    assert conn.cur.fetched <= 60                                  # 상한 근처에서 읽기를 멈춤
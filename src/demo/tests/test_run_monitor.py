@@ -0,0 +1,12 @@
+# tests/test_run_monitor.py - 누적 통계를 지원하지 않는 run_rows 탐지기는 태스크당 한 번만 경고
+
+def test_unsupported_detector_warns_once(guardian_db, monkeypatch, capsys):
+    from utils import detectors, run_monitor
+    monkeypatch.setattr(detectors, '_assignments', dict(detectors._assignments))
+    monkeypatch.setattr(run_monitor, '_warned', set())
+    detectors.assign('run_rows', 'mad', task='T')
+
+    assert [run_monitor._detector('T').name for _ in range(3)] == ['zscore'] * 3
+    assert capsys.readouterr().out.count('run_rows 탐지기 mad') == 1
+    assert run_monitor._detector('OTHER').name == 'zscore'
+    assert capsys.readouterr().out == ''
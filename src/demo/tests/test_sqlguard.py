@@ -0,0 +1,104 @@
+# tests/test_sqlguard.py - 실행 계획 기반 비용 검사 (EXPLAIN / PLAN_TABLE 결과를 흉내 내는 가짜 커넥션)
+
+from utils import sqlguard as G
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn, self.description, self._rows = conn, None, []
+
+    def execute(self, sql, *args, **binds):
+        self.conn.sql.append(sql)
+        for prefix, (names, rows) in self.conn.results.items():
+            if prefix in sql:
+                self.description = [(n,) for n in names]
+                self._rows = [r(binds) if callable(r) else r for r in rows]
+                return
+        self.description, self._rows = None, []
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def close(self):
+        pass
+
+
+class _Conn:
+    def __init__(self, results):
+        self.results, self.sql = results, []
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def commit(self):
+        pass
+
+
+def _mysql(*steps):
+    names = ('id', 'table', 'type', 'key', 'rows', 'Extra')
+    return _Conn({'EXPLAIN': (names, [dict(zip(names, s)) for s in steps])})
+
+
+def _oracle(plan, num_rows):
+    names = ('ID', 'OPERATION', 'OPTIONS', 'OBJECT_OWNER', 'OBJECT_NAME', 'CARDINALITY')
+    return _Conn({
+        'FROM plan_table': (names, plan),
+        'SELECT num_rows': (('NUM_ROWS',), [lambda b: (num_rows.get(b['n']),)]),
+    })
+
+
+def test_mysql_full_scan_over_budget_is_rejected():
+    conn = _mysql((1, 'orders_analytics', 'ALL', None, 8_000_000, 'Using where'))
+    reason = G.check_cost(conn, "SELECT * FROM orders_analytics WHERE email LIKE '%x'", 'mysql')
+    assert reason.startswith('COST_GUARD')
+    assert 'orders_analytics(8,000,000건)' in reason
+
+
+def test_mysql_count_star_uses_index_budget():
+    # InnoDB COUNT(*): 가장 작은 보조 인덱스만 훑음 → 테이블 행 예산이 아니라 인덱스 예산
+    conn = _mysql((1, 'orders_analytics', 'index', 'idx_sync', 8_000_000, 'Using index'))
+    estimate = G.explain_mysql(conn, 'SELECT COUNT(*) FROM orders_analytics')
+    assert (estimate['rows'], estimate['index_rows']) == (0, 8_000_000)
+    assert G.check_cost(conn, 'SELECT COUNT(*) FROM orders_analytics', 'mysql') is None
+    assert G.check_cost(conn, 'SELECT COUNT(*) FROM orders_analytics', 'mysql', index_budget=1_000_000)
+
+    optimized = _mysql((1, None, None, None, None, 'Select tables optimized away'))
+    assert G.check_cost(optimized, 'SELECT MAX(order_id) FROM orders_analytics', 'mysql') is None
+
+
+def test_mysql_index_condition_still_reads_table():
+    conn = _mysql((1, 'orders_analytics', 'range', 'idx_date', 6_000_000, 'Using index condition'))
+    assert G.explain_mysql(conn, 'SELECT * FROM orders_analytics')['rows'] == 6_000_000
+
+
+def test_oracle_full_scan_uses_num_rows_not_cardinality():
+    # 선택도 높은 조건의 FULL 스캔: 출력은 10건이지만 읽는 행은 테이블 전체
+    plan = [(0, 'SELECT STATEMENT', None, None, None, 10),
+            (1, 'TABLE ACCESS', 'FULL', 'APP', 'ORDERS', 10)]
+    conn = _oracle(plan, {'ORDERS': 9_000_000})
+    estimate = G.explain_oracle(conn, "SELECT * FROM ORDERS WHERE email = 'x'")
+    assert estimate['rows'] == 9_000_000
+    assert estimate['full_scans'] == ['ORDERS(9,000,000건)']
+    assert G.check_cost(conn, "SELECT * FROM ORDERS WHERE email = 'x'", 'oracle').startswith('COST_GUARD')
+    assert any('DELETE FROM plan_table' in sql for sql in conn.sql)
+
+
+def test_oracle_count_star_fast_full_scan_uses_index_budget():
+    plan = [(0, 'SELECT STATEMENT', None, None, None, 1),
+            (1, 'SORT', 'AGGREGATE', None, None, 1),
+            (2, 'INDEX', 'FAST FULL SCAN', 'APP', 'PK_ORDERS', 9_000_000)]
+    conn = _oracle(plan, {'PK_ORDERS': 9_000_000})
+    estimate = G.explain_oracle(conn, 'SELECT COUNT(*) FROM ORDERS')
+    assert (estimate['rows'], estimate['index_rows']) == (0, 9_000_000)
+    assert G.check_cost(conn, 'SELECT COUNT(*) FROM ORDERS', 'oracle') is None
+
+
+def test_oracle_range_scan_counts_cardinality():
+    plan = [(0, 'SELECT STATEMENT', None, None, None, 5000),
+            (1, 'TABLE ACCESS', 'BY INDEX ROWID BATCHED', 'APP', 'ORDERS', 5000),
+            (2, 'INDEX', 'RANGE SCAN', 'APP', 'IDX_ORDERS_DATE', 5000)]
+    estimate = G.explain_oracle(_oracle(plan, {}), "SELECT * FROM ORDERS WHERE order_date = DATE '2026-10-01'")
+    assert (estimate['rows'], estimate['index_rows'], estimate['full_scans']) == (5000, 5000, [])
@@ -3,15 +3,26 @@
 import os
 import json
 import re
-import oracledb
+import time
+import threading
 import requests
-import mysql.connector
-import sqlite3
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, wait, FIRST_COMPLETED
 from datetime import date, timedelta
 from typing import TypedDict, Annotated, Literal
 from dotenv import load_dotenv
 from anthropic import Anthropic
 from langgraph.graph import StateGraph, END
+from langgraph.config import get_stream_writer
+from utils.db import get_sqlite, get_mysql, get_oracle
+from utils.idmc import get_activity_log
+from utils.resultset import run_bounded
+from utils.sqlguard import check_cost, server_timeout
+from utils.coldiff import orders_diff
+from utils.reconcile import ORDER_COLUMNS
+from utils.agent_cache import CACHE_ENABLED, data_watermark, cache_key, get_cached, put_cached
+from utils.streaming import JsonFieldStreamer
+from utils.prompts import (plan_system, plan_messages, analyze_system, analyze_context,
+                           empty_usage, add_usage, note_cache)
 
 load_dotenv()
 
@@ -28,86 +39,71 @@ class AgentState(TypedDict):
     idmc_result: str
     oracle_result: str
     quality_history_result: str
+    diff_result: str
     analysis: str
     need_slack: bool
     slack_result: str
     final_answer: str
     steps: list
     error_count: int
+    usage: dict
 
 
 # ============================================================
 # 도구 함수들
 # ============================================================
 def query_mysql(sql: str) -> str:
+    """EXPLAIN 비용 검사 → 서버 타임아웃 안에서 행 수 상한 + fetchmany 요약"""
+    conn = None
     try:
-        conn = mysql.connector.connect(
-            host=os.getenv('MYSQL_HOST', 'localhost'),
-            port=int(os.getenv('MYSQL_PORT', 3306)),
-            database=os.getenv('MYSQL_DB', 'analytics'),
-            user=os.getenv('MYSQL_USER'),
-            password=os.getenv('MYSQL_PASSWORD')
-        )
-        cur = conn.cursor(dictionary=True)
-        cur.execute(sql)
-        rows = cur.fetchall()
-        conn.close()
-        return json.dumps(rows[:20], ensure_ascii=False, default=str)
+        conn = get_mysql()
+        rejected = check_cost(conn, sql, 'mysql')
+        if rejected:
+            return f"MYSQL_ERROR: {rejected}"
+        with server_timeout(conn, 'mysql'):
+            return run_bounded(conn, sql, 'mysql')
     except Exception as e:
         return f"MYSQL_ERROR: {e}"
+    finally:
+        if conn is not None:
+            conn.close()  # 풀 반납
 
 
 def query_oracle(sql: str) -> str:
+    """EXPLAIN PLAN 비용 검사 → call_timeout 안에서 행 수 상한 + fetchmany 요약"""
+    conn = None
     try:
-        conn = oracledb.connect(
-            user=os.getenv("ORACLE_USER"),
-            password=os.getenv("ORACLE_PASSWORD"),
-            dsn=os.getenv("ORACLE_DSN")
-        )
-        cur = conn.cursor()
-        cur.execute(sql)
-        cols = [c[0] for c in cur.description]
-        rows = [dict(zip(cols, row)) for row in cur.fetchall()[:20]]
-        conn.close()
-        return json.dumps(rows, ensure_ascii=False, default=str)
+        conn = get_oracle()
+        rejected = check_cost(conn, sql, 'oracle')
+        if rejected:
+            return f"ORACLE_ERROR: {rejected}"
+        with server_timeout(conn, 'oracle'):
+            return run_bounded(conn, sql, 'oracle')
     except Exception as e:
         return f"ORACLE_ERROR: {e}"
+    finally:
+        if conn is not None:
+            conn.close()  # 풀 반납
 
 
 def fetch_idmc_logs() -> str:
     """IDMC 로그 조회 (guardian.db에 저장된 것 + API 최신)"""
     try:
         # 1. guardian.db에서 먼저 조회
-        db_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'guardian.db')
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT run_id, object_name, status, source_rows, target_rows, start_time, end_time
-            FROM idmc_logs ORDER BY start_time DESC LIMIT 10
-        """)
-        rows = [{'runId': r[0], 'objectName': r[1], 'status': r[2], 'sourceRows': r[3],
-                 'targetRows': r[4], 'startTime': r[5], 'endTime': r[6]} for r in cur.fetchall()]
-        conn.close()
+        with get_sqlite() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT run_id, object_name, status, source_rows, target_rows, start_time, end_time
+                FROM idmc_logs ORDER BY start_time DESC LIMIT 10
+            """)
+            rows = [{'runId': r[0], 'objectName': r[1], 'status': r[2], 'sourceRows': r[3],
+                     'targetRows': r[4], 'startTime': r[5], 'endTime': r[6]} for r in cur.fetchall()]
 
         if rows:
             return json.dumps(rows, ensure_ascii=False, default=str)
 
-        # 2. 없으면 API 시도
-        login_url = f"{os.getenv('IDMC_LOGIN_URL')}/ma/api/v2/user/login"
-        payload = {
-            "@type": "login",
-            "username": os.getenv('IDMC_USERNAME'),
-            "password": os.getenv('IDMC_PASSWORD')
-        }
-        resp = requests.post(login_url, json=payload)
-        data = resp.json()
-        sid = data['icSessionId']
-        server_url = data['serverUrl']
-
-        logs = requests.get(
-            f"{server_url}/api/v2/activity/activityLog",
-            headers={"icSessionId": sid}
-        ).json()
+        # 2. 없으면 API 시도 (캐시된 세션 재사용)
+        logs = get_activity_log()
 
         filtered = []
         for log in logs:
@@ -126,17 +122,25 @@ def fetch_idmc_logs() -> str:
         return f"IDMC_ERROR: {e}"
 
 
+def fetch_transfer_diff(day: str = None, columns: list = None) -> str:
+    """Oracle ↔ MySQL 하루치 컬럼 단위 대조 요약"""
+    try:
+        known = {col for col, _ in ORDER_COLUMNS}
+        columns = [c.lower() for c in columns or [] if c and c.lower() in known] or None
+        return json.dumps(orders_diff(day, columns), ensure_ascii=False, default=str)
+    except Exception as e:
+        return f"DIFF_ERROR: {e}"
+
+
 def fetch_quality_history() -> str:
     try:
-        db_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'guardian.db')
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT run_date, column_name, null_pct FROM quality_history
-            ORDER BY run_date DESC LIMIT 42
-        """)
-        rows = [{'date': r[0], 'column': r[1], 'null_pct': r[2]} for r in cur.fetchall()]
-        conn.close()
+        with get_sqlite() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT run_date, column_name, null_pct FROM quality_history
+                ORDER BY run_date DESC LIMIT 42
+            """)
+            rows = [{'date': r[0], 'column': r[1], 'null_pct': r[2]} for r in cur.fetchall()]
         return json.dumps(rows, ensure_ascii=False)
     except Exception as e:
         return f"QUALITY_ERROR: {e}"
@@ -153,62 +157,33 @@ def send_slack(message: str) -> str:
         return f"SLACK_ERROR: {e}"
 
 
+# ============================================================
+# 스트리밍 이벤트 (stream_agent 구독자에게 실시간 전달)
+# ============================================================
+def emit(event: dict):
+    """그래프 실행 중 custom 스트림으로 이벤트 전송 (invoke 등 구독자가 없으면 무시됨)"""
+    get_stream_writer()(event)
+
+
+def add_step(state: AgentState, step: dict):
+    state['steps'].append(step)
+    emit({'event': 'step', 'step': step})
+
+
 # ============================================================
 # 노드(Node) 정의
 # ============================================================
 def plan_node(state: AgentState) -> AgentState:
     """사용자 질문을 분석하고 계획 수립"""
-    messages = []
-    if state.get('chat_history'):
-        for msg in state['chat_history'][-6:]:
-            messages.append({'role': msg['role'], 'content': msg['content']})
-    messages.append({'role': 'user', 'content': state['user_message']})
-
+    # 스키마/규칙 블록과 이전 대화는 프롬프트 캐시로 재사용
+    system = plan_system(date.today())
     resp = client.messages.create(
         model='claude-sonnet-4-20250514',
         max_tokens=1024,
-       system=f"""사용자의 질문을 분석하고 어떤 도구를 사용할지 계획하세요.
-오늘: {date.today()}
-
-사용 가능한 도구:
-- mysql: MySQL 분석 DB 조회 (orders_analytics 테이블)
-- oracle: Oracle 소스 DB 조회 (ORDERS 테이블)
-- idmc: IDMC ETL 로그 조회
-- quality_history: 품질 이력 조회 (최근 7일 NULL 비율)
-- slack: 알림 발송
-
-## SQL 작성 원칙
-- 반드시 완결된 SQL을 작성할 것. "추가 분석 필요" 같은 미완성 답변 금지.
-- 비교가 필요하면 서브쿼리, JOIN, NOT IN 등 활용하여 하나의 SQL로 해결할 것
-
-## 대화 맥락
-- 이전 대화 내용을 반드시 참고할 것
-- "그거", "아까", "위에서 말한" 같은 표현은 이전 대화를 참조하는 것
-- 이전 답변에서 나온 수치나 결과를 기반으로 더 깊이 파고드는 SQL을 작성할 것
-
-
-## MySQL 테이블: orders_analytics
-컬럼: order_id(INT), customer_id(INT), customer_name, phone_number, email, order_date(DATE), total_amount(DECIMAL), product_code, product_name, category, order_status, payment_method, sync_timestamp
-
-## Oracle 테이블: ORDERS
-컬럼: ORDER_ID(NUMBER), CUSTOMER_ID(NUMBER), CUSTOMER_NAME, PHONE_NUMBER, EMAIL, ORDER_DATE(DATE), TOTAL_AMOUNT(NUMBER), PRODUCT_CODE, PRODUCT_NAME, CATEGORY, ORDER_STATUS, PAYMENT_METHOD
-주의: Oracle은 컬럼명 대문자. 날짜 비교는 TRUNC(ORDER_DATE) = DATE '{date.today()}' 형식.
-주의: Oracle에서 CURDATE() 사용 금지. SYSDATE 또는 DATE 리터럴 사용.
-
-## 중요: 비교 규칙
-- MySQL과 Oracle 건수를 비교할 때는 반드시 같은 조건으로 조회할 것
-- MySQL에서 WHERE 없이 전체 조회하면 Oracle도 WHERE 없이 전체 조회
-- MySQL에서 오늘만 조회하면 Oracle도 오늘만 조회
-- 날짜 조건이 다르면 건수 비교가 무의미함
-
-반드시 아래 JSON 형식으로만 응답:
-{{"plan": "계획 설명", "tools": ["사용할 도구들"], "mysql_sqls": ["SQL1", "SQL2"], "oracle_sqls": ["SQL1", "SQL2"]}}
-
-- mysql_sqls, oracle_sqls는 배열로 여러 개 가능
-- 복합 분석이 필요하면 SQL을 여러 개 나눠서 작성
-- 단순 질문이면 SQL 1개만 넣어도 됨""",
-        messages=messages
+        system=system,
+        messages=plan_messages(state.get('chat_history'), state['user_message'])
     )
+    state['usage'] = note_cache(add_usage(state.get('usage') or empty_usage(), resp.usage), resp.usage, system, 'plan')
 
     text = resp.content[0].text
     try:
@@ -222,45 +197,111 @@ def plan_node(state: AgentState) -> AgentState:
 
     state['plan'] = json.dumps(plan_data, ensure_ascii=False)
     state['steps'] = state.get('steps', [])
-    state['steps'].append({'type': 'plan', 'content': plan_data.get('plan', '')})
+    add_step(state, {'type': 'plan', 'content': plan_data.get('plan', '')})
     state['error_count'] = 0
     return state
 
 
+# 복수 SQL 실행 설정
+SQL_CONCURRENCY = int(os.getenv('AGENT_SQL_CONCURRENCY', 4))   # DB별 동시 실행 SQL 수 (풀 크기 이하)
+SQL_TIMEOUT = float(os.getenv('AGENT_SQL_TIMEOUT', 30))       # 동시 실행 묶음당 타임아웃(초)
+MAX_CORRECTIONS = int(os.getenv('AGENT_MAX_CORRECTIONS', 3))   # 계획 전체 SQL 자동 수정 상한 (도구 합산)
+FORBIDDEN_WORDS = ['DROP', 'DELETE', 'UPDATE', 'INSERT', 'ALTER', 'TRUNCATE']
+
+SQL_DIALECTS = {
+    'mysql': (lambda sql: query_mysql(sql), 'MYSQL_ERROR',
+              "MySQL 쿼리에서 에러가 발생했습니다 (COST_GUARD면 비용 한도 초과, 시간 초과면 범위를 줄일 것). "
+              "수정된 SQL만 출력하세요. 다른 텍스트 없이 SQL만."),
+    'oracle': (lambda sql: query_oracle(sql), 'ORACLE_ERROR',
+               "Oracle 쿼리에서 에러가 발생했습니다 (COST_GUARD면 비용 한도 초과, 시간 초과면 범위를 줄일 것). "
+               "수정된 SQL만 출력하세요."),
+}
+
+
+def plan_sqls(plan_data: dict, db: str, default: str) -> list:
+    """계획에서 SQL 목록 추출 (xxx_sqls 배열 우선, 단일 xxx_sql도 호환)"""
+    sqls = [sql for sql in plan_data.get(f'{db}_sqls') or [] if sql and sql.strip()]
+    if not sqls and plan_data.get(f'{db}_sql'):
+        sqls = [plan_data[f'{db}_sql']]
+    return sqls or [default]
+
+
+class CorrectionBudget:
+    """계획 하나에서 쓸 수 있는 SQL 자동 수정 횟수 (동시에 도는 도구/SQL이 함께 씀)"""
+
+    def __init__(self, limit: int = MAX_CORRECTIONS, used: int = 0):
+        self.limit = limit
+        self.used = used
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+
+def execute_sql(db: str, index: int, sql: str, budget: CorrectionBudget = None) -> tuple:
+    """SQL 1개 실행 + 실패 시 (계획 전체 수정 한도 안에서) 1회 자동 수정. (결과 문자열, steps, 토큰 사용량) 반환"""
+    query, error_tag, fix_prompt = SQL_DIALECTS[db]
+    sql = sql.strip().rstrip(';')
+    if any(word in sql.upper() for word in FORBIDDEN_WORDS):
+        return f"[SQL {index+1}] 보안: SELECT만 허용됩니다", [], empty_usage()
+
+    steps = []
+    usage = empty_usage()
+    result = query(sql)
+    if error_tag in result and (budget or CorrectionBudget()).take():
+        fix_resp = client.messages.create(
+            model='claude-sonnet-4-20250514',
+            max_tokens=512,
+            system=fix_prompt,
+            messages=[{'role': 'user', 'content': f"원래 SQL: {sql}\n에러: {result}\n수정된 SQL:"}]
+        )
+        add_usage(usage, fix_resp.usage)
+        fixed_sql = fix_resp.content[0].text.strip()
+        steps.append({'type': 'self_correction', 'original': sql, 'fixed': fixed_sql, 'error': result})
+        result = query(fixed_sql.rstrip(';'))
+
+    return f"[SQL {index+1}] {sql}\n결과: {result}", steps, usage
+
+
+def run_sql_plan(state: AgentState, db: str, sqls: list) -> str:
+    """SQL 목록을 풀 커넥션으로 동시 실행 (동시성 제한 + 계획 전체 마감 시각), 순서대로 결과 합침"""
+    budget = state.get('corrections') or CorrectionBudget(used=state.get('error_count', 0))
+    workers = max(1, min(SQL_CONCURRENCY, len(sqls)))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'agent-{db}')
+    futures = [pool.submit(execute_sql, db, i, sql, budget) for i, sql in enumerate(sqls)]
+    # 마감 시각은 제출 시점에 한 번만: 동시 실행 묶음(wave) 수 × SQL_TIMEOUT
+    # (문장마다 대기 시작 시점부터 재면 앞 문장 대기 시간만큼 뒤 문장 타임아웃이 계속 늘어남)
+    waves = -(-len(sqls) // workers)
+    deadline = time.monotonic() + SQL_TIMEOUT * waves
+
+    all_results = []
+    for i, fut in enumerate(futures):
+        try:
+            result, steps, usage = fut.result(timeout=max(deadline - time.monotonic(), 0))
+            state['steps'].extend(steps)
+            add_usage(state['usage'], usage)
+        except FuturesTimeout:
+            result = (f"[SQL {i+1}] {sqls[i]}\n결과: {SQL_DIALECTS[db][1]}: TIMEOUT "
+                      f"(SQL {len(sqls)}개 제한 {SQL_TIMEOUT * waves:.0f}초 초과)")
+        except Exception as e:
+            result = f"[SQL {i+1}] {sqls[i]}\n결과: {SQL_DIALECTS[db][1]}: {e}"
+        all_results.append(result)
+
+    state['error_count'] = budget.used
+    pool.shutdown(wait=False, cancel_futures=True)
+    return "\n\n".join(all_results)
+
+
 def mysql_node(state: AgentState) -> AgentState:
-    """MySQL 조회 (복수 SQL 지원)"""
+    """MySQL 조회 (복수 SQL 동시 실행)"""
     plan_data = json.loads(state['plan'])
-    
-    # 단일 sql도 호환
-    sqls = plan_data.get('mysql_sqls', [])
-    if not sqls and plan_data.get('mysql_sql'):
-        sqls = [plan_data['mysql_sql']]
-    if not sqls:
-        sqls = ['SELECT COUNT(*) as cnt FROM orders_analytics']
+    sqls = plan_sqls(plan_data, 'mysql', 'SELECT COUNT(*) as cnt FROM orders_analytics')
 
-    all_results = []
-    for i, sql in enumerate(sqls):
-        if any(word in sql.upper() for word in ['DROP', 'DELETE', 'UPDATE', 'INSERT', 'ALTER', 'TRUNCATE']):
-            all_results.append(f"[SQL {i+1}] 보안: SELECT만 허용됩니다")
-            continue
-
-        result = query_mysql(sql)
-
-        if 'MYSQL_ERROR' in result and state['error_count'] < 3:
-            state['error_count'] += 1
-            fix_resp = client.messages.create(
-                model='claude-sonnet-4-20250514',
-                max_tokens=512,
-                system="MySQL 쿼리에서 에러가 발생했습니다. 수정된 SQL만 출력하세요. 다른 텍스트 없이 SQL만.",
-                messages=[{'role': 'user', 'content': f"원래 SQL: {sql}\n에러: {result}\n수정된 SQL:"}]
-            )
-            fixed_sql = fix_resp.content[0].text.strip()
-            state['steps'].append({'type': 'self_correction', 'original': sql, 'fixed': fixed_sql, 'error': result})
-            result = query_mysql(fixed_sql)
-
-        all_results.append(f"[SQL {i+1}] {sql}\n결과: {result}")
-
-    state['mysql_result'] = "\n\n".join(all_results)
+    state['mysql_result'] = run_sql_plan(state, 'mysql', sqls)
     state['steps'].append({'type': 'mysql', 'result': state['mysql_result'][:1000]})
     return state
 
@@ -273,29 +314,11 @@ def idmc_node(state: AgentState) -> AgentState:
 
 
 def oracle_node(state: AgentState) -> AgentState:
-    """Oracle 소스 조회"""
+    """Oracle 소스 조회 (복수 SQL 동시 실행)"""
     plan_data = json.loads(state['plan'])
-    sql = plan_data.get('oracle_sql', 'SELECT COUNT(*) as cnt FROM ORDERS')
-
-    if any(word in sql.upper() for word in ['DROP', 'DELETE', 'UPDATE', 'INSERT', 'ALTER', 'TRUNCATE']):
-        state['oracle_result'] = "보안: SELECT만 허용됩니다"
-    else:
-        result = query_oracle(sql)
-
-        if 'ORACLE_ERROR' in result and state['error_count'] < 3:
-            state['error_count'] += 1
-            fix_resp = client.messages.create(
-                model='claude-sonnet-4-20250514',
-                max_tokens=512,
-                system="Oracle 쿼리에서 에러가 발생했습니다. 수정된 SQL만 출력하세요.",
-                messages=[{'role': 'user', 'content': f"원래 SQL: {sql}\n에러: {result}\n수정된 SQL:"}]
-            )
-            fixed_sql = fix_resp.content[0].text.strip()
-            state['steps'].append({'type': 'self_correction', 'original': sql, 'fixed': fixed_sql, 'error': result})
-            result = query_oracle(fixed_sql)
-
-        state['oracle_result'] = result
+    sqls = plan_sqls(plan_data, 'oracle', 'SELECT COUNT(*) as cnt FROM ORDERS')
 
+    state['oracle_result'] = run_sql_plan(state, 'oracle', sqls)
     state['steps'].append({'type': 'oracle', 'result': state['oracle_result'][:500]})
     return state
 
@@ -308,36 +331,99 @@ def quality_node(state: AgentState) -> AgentState:
     return state
 
 
+def diff_node(state: AgentState) -> AgentState:
+    """Oracle ↔ MySQL 컬럼 대조 (order_id 병합 비교)"""
+    plan_data = json.loads(state['plan'])
+    result = fetch_transfer_diff(plan_data.get('diff_date'), plan_data.get('diff_columns'))
+    state['diff_result'] = result
+    state['steps'].append({'type': 'diff', 'result': result[:500]})
+    return state
+
+
+# 도구 이름 → (노드 함수, 결과 키, 타임아웃 초)
+TOOL_NODES = {
+    'quality_history': (quality_node, 'quality_history_result', float(os.getenv('AGENT_TIMEOUT_QUALITY', 10))),
+    'mysql': (mysql_node, 'mysql_result', float(os.getenv('AGENT_TIMEOUT_MYSQL', 60))),
+    'idmc': (idmc_node, 'idmc_result', float(os.getenv('AGENT_TIMEOUT_IDMC', 30))),
+    'oracle': (oracle_node, 'oracle_result', float(os.getenv('AGENT_TIMEOUT_ORACLE', 60))),
+    'diff': (diff_node, 'diff_result', float(os.getenv('AGENT_TIMEOUT_DIFF', 120))),
+}
+
+
+def tools_node(state: AgentState) -> AgentState:
+    """계획된 도구들을 동시에 실행하고 모두 끝나면(또는 타임아웃되면) 결과를 합침"""
+    plan_data = json.loads(state['plan'])
+    planned = plan_data.get('tools', ['mysql'])
+    tools = [name for name in TOOL_NODES if name in planned] or ['mysql']
+
+    pool = ThreadPoolExecutor(max_workers=len(tools), thread_name_prefix='agent-tool')
+    started = time.monotonic()
+    futures = {}
+    # 자동 수정 한도는 도구 사이에서 공유 (MySQL/Oracle이 각자 3회씩 쓰지 않도록)
+    budget = CorrectionBudget(used=state.get('error_count', 0))
+    for name in tools:
+        # 도구마다 독립된 상태 조각을 넘겨 동시 실행 중 충돌을 막음
+        sub_state = {'plan': state['plan'], 'steps': [], 'error_count': budget.used, 'corrections': budget,
+                     'usage': empty_usage()}
+        futures[name] = pool.submit(TOOL_NODES[name][0], sub_state)
+
+    # 끝나는 순서대로 바로 스트리밍 (구독자가 먼저 끝난 도구 결과를 볼 수 있게)
+    names = {fut: name for name, fut in futures.items()}
+    pending = set(futures.values())
+    deadline = started + max(TOOL_NODES[name][2] for name in tools)
+    while pending:
+        done, pending = wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for fut in done:
+            if fut.exception() is None:
+                for step in fut.result()['steps']:
+                    emit({'event': 'step', 'step': step})
+
+    # 계획 순서대로 합쳐서 steps 순서를 일정하게 유지
+    for name in tools:
+        _, key, timeout = TOOL_NODES[name]
+        try:
+            result = futures[name].result(timeout=max(started + timeout - time.monotonic(), 0))
+            state[key] = result[key]
+            state['steps'].extend(result['steps'])
+            state['usage'] = add_usage(state.get('usage') or empty_usage(), result['usage'])
+        except FuturesTimeout:
+            state[key] = f"TIMEOUT: {name} 도구가 {timeout:.0f}초 안에 응답하지 않아 부분 결과로 분석합니다"
+            add_step(state, {'type': name, 'result': state[key]})
+        except Exception as e:
+            state[key] = f"{name.upper()}_ERROR: {e}"
+            add_step(state, {'type': name, 'result': state[key]})
+
+    state['error_count'] = budget.used
+    # 타임아웃된 도구는 기다리지 않음 (백그라운드에서 끝나면 버려짐)
+    pool.shutdown(wait=False, cancel_futures=True)
+    return state
+
+
 def analyze_node(state: AgentState) -> AgentState:
     """수집한 데이터를 종합 분석"""
-    context = f"""사용자 질문: {state['user_message']}
-계획: {state['plan']}
-MySQL 결과: {state.get('mysql_result', '조회 안 함')}
-IDMC 로그: {state.get('idmc_result', '조회 안 함')}
-Oracle 결과: {state.get('oracle_result', '조회 안 함')}
-품질 이력: {state.get('quality_history_result', '조회 안 함')}"""
+    # 도구 결과는 토큰 예산 안으로 잘라서 전달
+    context = analyze_context(state)
 
-    resp = client.messages.create(
+    # answer 필드만 골라 토큰 단위로 흘려보냄 (첫 글자까지의 대기 시간 단축)
+    streamer = JsonFieldStreamer('answer')
+    system = analyze_system(date.today())
+    with client.messages.stream(
         model='claude-sonnet-4-20250514',
         max_tokens=2048,
-        system=f"""수집된 데이터를 바탕으로 종합 분석하세요. 오늘: {date.today()}
-
-## 원인 추론 규칙
-- IDMC 로그에서 최종 실행이 성공(status:1)이고 sourceRows == targetRows면 → ETL 전송 자체는 정상
-- Oracle에도 NULL이 있고 MySQL에도 NULL이 있으면 → 소스 데이터 문제 (ETL은 정상적으로 전달한 것)
-- Oracle에는 NULL이 없는데 MySQL에만 NULL이 있으면 → 두 가지 가능성 모두 언급:
-  1) ETL 변환 과정에서 매핑/변환 오류로 NULL 발생
-  2) ETL 외부에서 직접 INSERT된 데이터 (MySQL 건수가 Oracle보다 많으면 이 가능성이 높음)
-- MySQL 건수 > Oracle 건수면 → 차이만큼 외부 주입 가능성 높음
-- MySQL 건수 == Oracle 건수인데 NULL 차이가 있으면 → ETL 변환 오류 가능성 높음
-- status:2(실패)는 최종 성공 전의 재시도이므로, 마지막 실행이 성공이면 ETL 전송은 정상으로 판단
-
-반드시 아래 JSON으로 응답:
-{{"answer": "사용자에게 보여줄 답변 (한국어, 간결하게)", "severity": "normal/warning/critical", "need_slack": true/false, "slack_message": "Slack에 보낼 메시지 (need_slack이 true일 때만)"}}""",
+        system=system,
         messages=[{'role': 'user', 'content': context}]
-    )
+    ) as stream:
+        for chunk in stream.text_stream:
+            piece = streamer.feed(chunk)
+            if piece:
+                emit({'event': 'token', 'text': piece})
+        text = stream.get_final_text()
+        final_usage = stream.get_final_message().usage
+        state['usage'] = note_cache(add_usage(state.get('usage') or empty_usage(), final_usage),
+                                    final_usage, system, 'analyze')
 
-    text = resp.content[0].text
     try:
         json_match = re.search(r'\{.*\}', text, re.DOTALL)
         analysis = json.loads(json_match.group())
@@ -347,7 +433,7 @@ Oracle 결과: {state.get('oracle_result', '조회 안 함')}
     state['analysis'] = json.dumps(analysis, ensure_ascii=False)
     state['final_answer'] = analysis.get('answer', text)
     state['need_slack'] = analysis.get('need_slack', False)
-    state['steps'].append({'type': 'analysis', 'severity': analysis.get('severity', 'normal')})
+    add_step(state, {'type': 'analysis', 'severity': analysis.get('severity', 'normal')})
     return state
 
 
@@ -357,59 +443,13 @@ def slack_node(state: AgentState) -> AgentState:
     msg = analysis.get('slack_message', state['final_answer'])
     result = send_slack(f"🛡️ *[Guardian Agent]*\n\n{msg}")
     state['slack_result'] = result
-    state['steps'].append({'type': 'slack', 'result': result})
+    add_step(state, {'type': 'slack', 'result': result})
     return state
 
 
 # ============================================================
 # 라우터 (분기 결정)
 # ============================================================
-def route_tools(state: AgentState) -> str:
-    """계획에 따라 첫 번째 도구 노드 결정"""
-    plan_data = json.loads(state['plan'])
-    tools = plan_data.get('tools', ['mysql'])
-    
-    if 'quality_history' in tools:
-        return 'quality_history'
-    if 'mysql' in tools:
-        return 'mysql'
-    if 'idmc' in tools:
-        return 'idmc'
-    if 'oracle' in tools:
-        return 'oracle'
-    return 'mysql'
-
-
-def route_after_quality(state: AgentState) -> str:
-    plan_data = json.loads(state['plan'])
-    tools = plan_data.get('tools', [])
-    if 'mysql' in tools:
-        return 'mysql'
-    if 'idmc' in tools:
-        return 'idmc'
-    if 'oracle' in tools:
-        return 'oracle'
-    return 'analyze'
-
-
-def route_after_mysql(state: AgentState) -> str:
-    plan_data = json.loads(state['plan'])
-    tools = plan_data.get('tools', [])
-    if 'idmc' in tools:
-        return 'idmc'
-    if 'oracle' in tools:
-        return 'oracle'
-    return 'analyze'
-
-
-def route_after_idmc(state: AgentState) -> str:
-    plan_data = json.loads(state['plan'])
-    tools = plan_data.get('tools', [])
-    if 'oracle' in tools:
-        return 'oracle'
-    return 'analyze'
-
-
 def route_slack(state: AgentState) -> str:
     if state.get('need_slack'):
         return 'slack'
@@ -424,35 +464,14 @@ def build_graph():
 
     # 노드 추가
     graph.add_node("plan", plan_node)
-    graph.add_node("mysql", mysql_node)
-    graph.add_node("idmc", idmc_node)
-    graph.add_node("oracle", oracle_node)
-    graph.add_node("quality_history", quality_node)
+    graph.add_node("tools", tools_node)
     graph.add_node("analyze", analyze_node)
     graph.add_node("slack", slack_node)
 
-    # 시작 → 계획
+    # 시작 → 계획 → 도구 병렬 실행 → 분석
     graph.set_entry_point("plan")
-
-    # 계획 → 첫 번째 도구
-    graph.add_conditional_edges("plan", route_tools, {
-        "quality_history": "quality_history",
-        "mysql": "mysql",
-        "idmc": "idmc",
-        "oracle": "oracle",
-    })
-
-    # 도구 → 다음 도구 또는 분석 (순차 실행)
-    graph.add_conditional_edges("quality_history", route_after_quality, {
-        "mysql": "mysql", "idmc": "idmc", "oracle": "oracle", "analyze": "analyze"
-    })
-    graph.add_conditional_edges("mysql", route_after_mysql, {
-        "idmc": "idmc", "oracle": "oracle", "analyze": "analyze"
-    })
-    graph.add_conditional_edges("idmc", route_after_idmc, {
-        "oracle": "oracle", "analyze": "analyze"
-    })
-    graph.add_edge("oracle", "analyze")
+    graph.add_edge("plan", "tools")
+    graph.add_edge("tools", "analyze")
 
     # 분석 → Slack 또는 종료
     graph.add_conditional_edges("analyze", route_slack, {"slack": "slack", "end": END})
@@ -467,8 +486,26 @@ agent_graph = build_graph()
 # ============================================================
 # 실행 함수
 # ============================================================
-def run_agent(user_message: str, chat_history: list = None):
-    """LangGraph Agent 실행"""
+def stream_agent(user_message: str, chat_history: list = None, use_cache: bool = True):
+    """LangGraph Agent 스트리밍 실행. 진행 상황을 이벤트로 yield 합니다.
+
+    {'event': 'step', 'step': {...}}    계획/도구 결과/SQL 자동 수정/판단이 생길 때마다
+    {'event': 'token', 'text': '...'}   최종 답변 토큰
+    {'event': 'done', 'result': {...}}  run_agent()와 같은 결과 (마지막 1회)
+    """
+    use_cache = use_cache and CACHE_ENABLED
+    if use_cache:
+        watermark = data_watermark()
+        key = cache_key(user_message, chat_history, watermark)
+        cached = get_cached(key)
+        if cached is not None:
+            cached['cached'] = True
+            for step in cached['steps']:
+                yield {'event': 'step', 'step': step}
+            yield {'event': 'token', 'text': cached['answer']}
+            yield {'event': 'done', 'result': cached}
+            return
+
     initial_state = {
         'user_message': user_message,
         'chat_history': chat_history or [],
@@ -477,18 +514,42 @@ def run_agent(user_message: str, chat_history: list = None):
         'idmc_result': '',
         'oracle_result': '',
         'quality_history_result': '',
+        'diff_result': '',
         'analysis': '{}',
         'need_slack': False,
         'slack_result': '',
         'final_answer': '',
         'steps': [],
         'error_count': 0,
+        'usage': empty_usage(),
     }
 
-    result = agent_graph.invoke(initial_state)
+    result = initial_state
+    for mode, chunk in agent_graph.stream(initial_state, stream_mode=['custom', 'values']):
+        if mode == 'custom':
+            yield chunk
+        else:
+            result = chunk
 
-    return {
+    output = {
         'answer': result['final_answer'],
         'steps': result['steps'],
         'iterations': len(result['steps']),
-    }
\ No newline at end of file
+        'usage': result.get('usage') or empty_usage(),
+    }
+
+    tool_results = {key: result.get(key, '') for _, key, _ in TOOL_NODES.values()}
+    failed = any(tag in str(v) for v in tool_results.values() for tag in ('_ERROR', 'TIMEOUT'))
+    if use_cache and not failed:
+        put_cached(key, user_message, watermark, result['plan'], tool_results, output)
+    output['cached'] = False
+    yield {'event': 'done', 'result': output}
+
+
+def run_agent(user_message: str, chat_history: list = None, use_cache: bool = True):
+    """LangGraph Agent 실행 (같은 질문 + 같은 데이터면 캐시된 답변 반환)"""
+    result = None
+    for event in stream_agent(user_message, chat_history, use_cache):
+        if event['event'] == 'done':
+            result = event['result']
+    return result
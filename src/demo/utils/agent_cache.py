@@ -0,0 +1,138 @@
+# utils/agent_cache.py - 데이터 질의 Agent 답변 캐시 (질문 정규화 + 데이터 워터마크)
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+from datetime import date
+from utils.db import get_sqlite, get_mysql, get_oracle
+
+CACHE_TTL = int(os.getenv('AGENT_CACHE_TTL', 6 * 3600))        # 초
+CACHE_MAX_ENTRIES = int(os.getenv('AGENT_CACHE_MAX', 500))     # LRU 상한
+CACHE_ENABLED = os.getenv('AGENT_CACHE', 'on') != 'off'
+WATERMARK_TTL = float(os.getenv('AGENT_CACHE_WATERMARK_TTL', 30))   # 워터마크 재사용 시간(초)
+
+_watermark_lock = threading.Lock()
+_watermark = {'value': None, 'at': 0.0}
+
+_PUNCT = re.compile(r'[^\w]+', re.UNICODE)
+
+
+def normalize_question(question: str) -> str:
+    """대소문자/공백/문장부호 차이를 없앤 질문 키 ("오늘 데이터 정상인지 확인해줘?" == "오늘  데이터 정상인지 확인해줘")"""
+    text = unicodedata.normalize('NFKC', question or '').lower()
+    return ' '.join(_PUNCT.sub(' ', text).split())
+
+
+def _source_versions(get_conn, sql, name):
+    """DB에서 버전 값 조회. 못 보면 캐시를 쓰지 않도록 매번 다른 값 (두 번째 값 False)"""
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor()
+        cur.execute(sql)
+        return [str(v) for v in cur.fetchone()], True
+    except Exception:
+        return [f"no{name}-{time.time()}"], False
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def _compute_watermark():
+    """(워터마크, 재사용 가능 여부)"""
+    parts = [str(date.today())]
+    # MySQL 타깃: idx_orders_analytics_sync(sync_timestamp) / PK로 끝나는 MAX 조회 (utils/migrations.py --mysql)
+    mysql_parts, mysql_ok = _source_versions(
+        get_mysql, "SELECT MAX(sync_timestamp), MAX(order_id) FROM orders_analytics", 'mysql')
+    # Oracle 소스: PK MAX만 (적재 후 동기화 전이라도 소스가 바뀌면 다른 키)
+    oracle_parts, oracle_ok = _source_versions(get_oracle, "SELECT MAX(ORDER_ID) FROM ORDERS", 'oracle')
+    parts += mysql_parts + oracle_parts
+
+    with get_sqlite() as conn_sq:
+        cur_sq = conn_sq.cursor()
+        # idmc_logs는 같은 키로 upsert되므로 건수와 완료 시각 둘 다 (idx_idmc_logs_end 인덱스만 훑음)
+        for sql in ("SELECT MAX(id) FROM task_history",
+                    "SELECT MAX(id) FROM quality_history",
+                    "SELECT COUNT(*), MAX(end_time) FROM idmc_logs"):
+            cur_sq.execute(sql)
+            parts += [str(v) for v in cur_sq.fetchone()]
+    return '|'.join(parts), mysql_ok and oracle_ok
+
+
+def data_watermark() -> str:
+    """새 데이터가 들어오면 바뀌는 값 (MySQL/Oracle 최신 키 + guardian.db 이력/로그 버전 + 오늘 날짜)
+
+    질문마다 세 DB를 조회하지 않도록 WATERMARK_TTL초 동안 프로세스 안에서 재사용합니다.
+    """
+    now = time.monotonic()
+    with _watermark_lock:
+        if _watermark['value'] is not None and now - _watermark['at'] < WATERMARK_TTL:
+            return _watermark['value']
+    value, reusable = _compute_watermark()
+    with _watermark_lock:
+        _watermark.update(value=value if reusable else None, at=now)
+    return value
+
+
+def invalidate_watermark():
+    """같은 프로세스에서 데이터를 쓴 직후 워터마크 다시 계산"""
+    with _watermark_lock:
+        _watermark.update(value=None, at=0.0)
+
+
+def cache_key(question: str, chat_history: list, watermark: str) -> str:
+    """정규화 질문 + 이전 대화 + 워터마크 해시 (같은 질문이라도 맥락/데이터가 다르면 다른 키)"""
+    prior = list(chat_history or [])
+    if prior and prior[-1].get('role') == 'user' and prior[-1].get('content') == question:
+        prior = prior[:-1]
+    context = [(m.get('role'), normalize_question(m.get('content', ''))) for m in prior[-6:]]
+    raw = json.dumps([normalize_question(question), context, watermark], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def get_cached(key: str):
+    """TTL 안의 캐시 결과 반환 (없으면 None). 조회 시 LRU 시각 갱신."""
+    with get_sqlite() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT result, created_at FROM agent_cache WHERE cache_key = ?", (key,))
+        row = cur.fetchone()
+        if row is None or time.time() - row[1] > CACHE_TTL:
+            return None
+        cur.execute("UPDATE agent_cache SET last_hit = ?, hits = hits + 1 WHERE cache_key = ?", (time.time(), key))
+        conn.commit()
+    return json.loads(row[0])
+
+
+def put_cached(key: str, question: str, watermark: str, plan: str, tool_results: dict, result: dict):
+    """결과 저장 + 같은 질문의 이전 워터마크 항목 삭제 + 만료/LRU 정리"""
+    now = time.time()
+    norm = normalize_question(question)
+    with get_sqlite() as conn:
+        cur = conn.cursor()
+        # 새 데이터가 들어와 워터마크가 바뀐 옛 답변은 무효
+        cur.execute("DELETE FROM agent_cache WHERE question_norm = ? AND watermark != ?", (norm, watermark))
+        cur.execute('''
+            INSERT INTO agent_cache (cache_key, question_norm, watermark, plan, tool_results, result, created_at, last_hit, hits)
+            VALUES (?,?,?,?,?,?,?,?,0)
+            ON CONFLICT(cache_key) DO UPDATE SET
+                plan = excluded.plan, tool_results = excluded.tool_results, result = excluded.result,
+                created_at = excluded.created_at, last_hit = excluded.last_hit
+        ''', (key, norm, watermark, plan, json.dumps(tool_results, ensure_ascii=False, default=str),
+              json.dumps(result, ensure_ascii=False, default=str), now, now))
+        cur.execute("DELETE FROM agent_cache WHERE created_at < ?", (now - CACHE_TTL,))
+        cur.execute('''
+            DELETE FROM agent_cache WHERE cache_key IN (
+                SELECT cache_key FROM agent_cache ORDER BY last_hit DESC LIMIT -1 OFFSET ?
+            )
+        ''', (CACHE_MAX_ENTRIES,))
+        conn.commit()
+
+
+def clear_cache():
+    with get_sqlite() as conn:
+        conn.execute("DELETE FROM agent_cache")
+        conn.commit()
@@ -11,9 +11,11 @@ from utils.detector import DecimalEncoder, TASK_NAME
 load_dotenv()
 
 
-def run_ai(vol, qual):
-    """Claude AI 종합 분석"""
-    client = Anthropic()
+MODEL = 'claude-sonnet-4-20250514'
+
+
+def build_prompt(vol, qual):
+    """(system, user_msg) 프롬프트 생성"""
     system = """데이터 파이프라인 품질 전문가. 볼륨+품질 종합 분석.
 
 ## 판단 기준 (반드시 따르세요)
@@ -32,13 +34,33 @@ NULL변화: {json.dumps(qual['changes'], ensure_ascii=False, cls=DecimalEncoder)
 품질이상: {json.dumps(qual['anomalies'], ensure_ascii=False, cls=DecimalEncoder)}
 금액: {json.dumps(qual['amount_stats'], ensure_ascii=False, cls=DecimalEncoder)}
 오늘: {date.today()} ({vol['day_name']}요일). JSON만."""
+    return system, user_msg
 
-    resp = client.messages.create(model='claude-sonnet-4-20250514', max_tokens=1024,
-                                   system=system, messages=[{'role': 'user', 'content': user_msg}])
-    text = resp.content[0].text
+
+def parse_ai(text):
+    """응답 텍스트(JSON, 코드블록 허용) → dict"""
     return json.loads(text.replace('```json', '').replace('```', '').strip())
 
 
+def run_ai(vol, qual):
+    """Claude AI 종합 분석"""
+    client = Anthropic()
+    system, user_msg = build_prompt(vol, qual)
+    resp = client.messages.create(model=MODEL, max_tokens=1024,
+                                   system=system, messages=[{'role': 'user', 'content': user_msg}])
+    return parse_ai(resp.content[0].text)
+
+
+def stream_ai(vol, qual):
+    """Claude AI 종합 분석 (스트리밍). 응답 텍스트 조각을 yield, 끝나면 parse_ai()로 해석"""
+    client = Anthropic()
+    system, user_msg = build_prompt(vol, qual)
+    with client.messages.stream(model=MODEL, max_tokens=1024,
+                                system=system, messages=[{'role': 'user', 'content': user_msg}]) as stream:
+        for text in stream.text_stream:
+            yield text
+
+
 def send_slack(vol, qual, ai):
     """Slack 알림 발송"""
     webhook = os.getenv('SLACK_WEBHOOK_URL')
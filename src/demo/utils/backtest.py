@@ -0,0 +1,129 @@
+# utils/backtest.py - 탐지기 백테스트 (task_history / quality_history 재생 + 합성 이상 주입)
+#
+# 실제 이력에는 정답 라벨이 없으므로 이력 사본에 이상 구간을 무작위로 심고
+# 탐지기별로 evaluate() 한 번(전체 날짜 워크포워드)으로 판정을 재현해 비교합니다.
+#
+#   precision      : 경보 중 심은 이상 구간에 해당하는 비율
+#   recall         : 심은 이상 구간 중 한 번이라도 경보가 난 비율
+#   latency_days   : 이상 구간 시작부터 첫 경보까지 평균 일수
+#   false_per_100d : 정상 날짜 100일당 오경보 수
+#   ms             : 탐지기 평가 시간 합계
+#
+#   cd src/demo && python -m utils.backtest [trials]
+
+import os
+import time
+import numpy as np
+import pandas as pd
+from utils.db import get_sqlite
+from utils.detectors import DETECTORS
+
+TRIALS = int(os.getenv('BACKTEST_TRIALS', 20))
+INCIDENT_RATE = float(os.getenv('BACKTEST_INCIDENT_RATE', 0.05))   # 날짜당 이상 구간 시작 확률
+WARMUP = int(os.getenv('BACKTEST_WARMUP', 14))                     # 판정하지 않는 앞부분 일수
+
+VOLUME_DETECTORS = ['zscore', 'mad', 'ewma', 'holt_winters', 'quantile']
+QUALITY_DETECTORS = ['growth', 'zscore', 'mad', 'quantile']
+
+
+def load_series():
+    """{('volume', task): (값, 요일)} + {('null_pct', 컬럼): (값, 요일)}"""
+    with get_sqlite() as conn:
+        volume = pd.read_sql("SELECT task_name, run_date, rows_processed FROM task_history ORDER BY run_date", conn)
+        quality = pd.read_sql("SELECT column_name, run_date, null_pct FROM quality_history ORDER BY run_date", conn)
+    series = {}
+    for (metric, key_col, value_col), df in ((('volume', 'task_name', 'rows_processed'), volume),
+                                             (('null_pct', 'column_name', 'null_pct'), quality)):
+        for key, g in df.groupby(key_col):
+            dow = pd.to_datetime(g['run_date']).dt.weekday.values
+            series[(metric, key)] = (g[value_col].values.astype(float), dow)
+    return series
+
+
+def inject(values, metric, rng, rate=INCIDENT_RATE, warmup=WARMUP):
+    """이상 구간을 심은 사본. (값, 라벨 bool 배열, [(시작, 끝)]) 반환
+
+    volume  : 급감(×0.2~0.6) / 급증(×1.5~2.5) 하루, 또는 3~7일 수준 이동(×0.6 또는 ×1.5)
+    null_pct: 하루 +2~10%p, 또는 3~7일 ×3 (최소 +1%p)
+    """
+    values = values.copy()
+    labels = np.zeros(len(values), dtype=bool)
+    incidents = []
+    t = warmup
+    while t < len(values):
+        if rng.random() >= rate:
+            t += 1
+            continue
+        length = 1 if rng.random() < 0.6 else int(rng.integers(3, 8))
+        end = min(t + length, len(values))
+        if metric == 'volume':
+            if length == 1:
+                factor = rng.uniform(0.2, 0.6) if rng.random() < 0.5 else rng.uniform(1.5, 2.5)
+            else:
+                factor = 0.6 if rng.random() < 0.5 else 1.5
+            values[t:end] *= factor
+        elif length == 1:
+            values[t:end] += rng.uniform(2, 10)
+        else:
+            values[t:end] = np.maximum(values[t:end] * 3, values[t:end] + 1)
+        labels[t:end] = True
+        incidents.append((t, end))
+        t = end + 1                                 # 구간 사이 최소 하루 정상
+    return values, labels, incidents
+
+
+def score_run(severity, labels, incidents, warmup=WARMUP):
+    alerts = severity != 'normal'
+    alerts[:warmup] = False
+    tp = int((alerts & labels).sum())
+    fp = int((alerts & ~labels).sum())
+    latencies = []
+    for start, end in incidents:
+        hits = np.flatnonzero(alerts[start:end])
+        if len(hits):
+            latencies.append(int(hits[0]))
+    normal_days = int((~labels[warmup:]).sum())
+    return {'tp': tp, 'fp': fp, 'incidents': len(incidents), 'detected': len(latencies),
+            'latency_sum': sum(latencies), 'normal_days': normal_days}
+
+
+def backtest(series=None, detectors=None, trials=TRIALS, seed=0):
+    """지표별 탐지기 성능 DataFrame (metric, detector 인덱스)"""
+    series = series if series is not None else load_series()
+    rng = np.random.default_rng(seed)
+    totals = {}
+    for (metric, key), (values, dow) in series.items():
+        names = detectors or (VOLUME_DETECTORS if metric == 'volume' else QUALITY_DETECTORS)
+        instances = {name: DETECTORS[name]() for name in names}
+        for _ in range(trials):
+            injected, labels, incidents = inject(values, metric, rng)
+            for name, det in instances.items():
+                started = time.perf_counter()
+                severity = det.evaluate(injected, dow)['severity']
+                elapsed = time.perf_counter() - started
+                run = score_run(severity, labels, incidents)
+                total = totals.setdefault((metric, name), {k: 0 for k in run} | {'sec': 0.0})
+                for k, v in run.items():
+                    total[k] += v
+                total['sec'] += elapsed
+
+    rows = []
+    for (metric, name), t in totals.items():
+        alerts = t['tp'] + t['fp']
+        rows.append({
+            'metric': metric, 'detector': name,
+            'precision': round(t['tp'] / alerts, 3) if alerts else None,
+            'recall': round(t['detected'] / t['incidents'], 3) if t['incidents'] else None,
+            'latency_days': round(t['latency_sum'] / t['detected'], 2) if t['detected'] else None,
+            'false_per_100d': round(t['fp'] / t['normal_days'] * 100, 2) if t['normal_days'] else None,
+            'ms': round(t['sec'] * 1000, 1),
+        })
+    return pd.DataFrame(rows).set_index(['metric', 'detector'])
+
+
+if __name__ == '__main__':
+    import sys
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else TRIALS
+    series = load_series()
+    print(f"🧪 백테스트: 시계열 {len(series)}개 × {trials}회 주입")
+    print(backtest(series, trials=trials).to_string())
@@ -0,0 +1,58 @@
+# utils/baseline.py - 품질 기준선 (컬럼별 최근 N회 NULL 비율)
+
+import os
+import threading
+from datetime import date
+from utils.db import get_sqlite
+
+BASELINE_WINDOW = int(os.getenv('GUARDIAN_BASELINE_WINDOW', 7))
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def get_null_history(run_date=None, window=None):
+    """run_date 이전 컬럼별 최근 window회 NULL 비율 {column_name: ([null_pct...], [요일...])} (날짜순)
+
+    window=None이면 이전 이력 전체. 전체 컬럼을 윈도 함수 쿼리 1회로 읽으며
+    idx_quality_history_col_date 커버링 인덱스를 탑니다. 결과는 (run_date, window) 단위로 캐시됩니다.
+    """
+    run_date = str(run_date or date.today())
+    key = (run_date, window)
+    with _lock:
+        if key in _cache:
+            return {col: (list(v), list(d)) for col, (v, d) in _cache[key].items()}
+
+    with get_sqlite() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT column_name, run_date, null_pct FROM (
+                SELECT column_name, run_date, null_pct,
+                       ROW_NUMBER() OVER (PARTITION BY column_name ORDER BY run_date DESC) AS rn
+                FROM quality_history
+                WHERE run_date < ?
+            )
+            WHERE ? IS NULL OR rn <= ?
+            ORDER BY column_name, run_date
+        """, (run_date, window, window))
+        history = {}
+        for col, day, pct in cur.fetchall():
+            values, dows = history.setdefault(col, ([], []))
+            values.append(pct)
+            dows.append(date.fromisoformat(day).weekday())
+
+    with _lock:
+        _cache[key] = history
+    return {col: (list(v), list(d)) for col, (v, d) in history.items()}
+
+
+def get_null_baselines(run_date=None, window=None):
+    """run_date 이전 최근 window회의 컬럼별 NULL 비율 평균 {column_name: avg}"""
+    history = get_null_history(run_date, window or BASELINE_WINDOW)
+    return {col: sum(values) / len(values) for col, (values, _) in history.items()}
+
+
+def invalidate_baselines():
+    """quality_history가 바뀌었을 때 캐시 비우기"""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,147 @@
+# utils/coldiff.py - Oracle ORDERS ↔ MySQL orders_analytics 컬럼 단위 비교 (정렬 병합 조인)
+#
+# 양쪽을 order_id 순으로 서버 측 커서 + fetchmany로 흘려 읽으면서 키 단위로 병합 비교합니다.
+# 메모리에는 현재 행 한 쌍과 컬럼별 카운터/샘플 키만 남으므로 건수와 무관하게 일정합니다.
+#
+# 컬럼별로 어떤 종류의 불일치인지 나눠 셉니다.
+#   null_in_target : 소스에는 값이 있는데 타깃이 NULL   → ETL 변환/매핑 오류 의심
+#   null_in_source : 소스가 NULL인데 타깃에 값이 있음
+#   value_changed  : 양쪽 다 값이 있는데 다름
+#   null_in_extra  : 소스에 없는 타깃 행(extra)에서 NULL → 외부 INSERT 의심
+#
+# 값은 reconcile.py와 같은 방식으로 DB 안에서 정규화한 문자열로 비교합니다.
+#
+#   cd src/demo && python -m utils.coldiff [YYYY-MM-DD]
+
+import os
+import time
+from datetime import date
+from utils.reconcile import DIALECTS, NULL_TOKEN, ORDER_COLUMNS, mysql_side, oracle_side
+
+FETCH_BATCH = int(os.getenv('DIFF_FETCH_BATCH', 2000))     # fetchmany 배치 크기
+SAMPLE_KEYS = int(os.getenv('DIFF_SAMPLE_KEYS', 10))       # 항목별 샘플 키 수
+
+
+def _select(side, columns, scope):
+    canon = DIALECTS[side.dialect]['canon']
+    exprs = [side.key] + [canon(col, kind) for col, kind in columns]
+    where, params = side._where(scope)
+    sql = f"SELECT {', '.join(exprs)} FROM {side.table} WHERE {where} ORDER BY {side.key}"
+    return sql, params
+
+
+def _bump(stats, col, kind, key):
+    entry = stats.setdefault(col, {'mismatches': 0, 'null_in_target': 0, 'null_in_source': 0,
+                                   'value_changed': 0, 'null_in_extra': 0, 'sample_keys': []})
+    entry[kind] += 1
+    if kind != 'null_in_extra':
+        entry['mismatches'] += 1
+        if len(entry['sample_keys']) < SAMPLE_KEYS:
+            entry['sample_keys'].append(key)
+
+
+def _count(bucket, key):
+    bucket['count'] += 1
+    if len(bucket['sample']) < SAMPLE_KEYS:
+        bucket['sample'].append(key)
+
+
+def column_diff(source, target, scope=None, columns=None, batch=None):
+    """source(기준) ↔ target 컬럼 단위 비교 요약.
+
+    scope  : {'day': 'YYYY-MM-DD', 'lo': 키, 'hi': 키} 중 필요한 것 (reconcile 결과 파티션 그대로 가능)
+    columns: 비교할 컬럼 이름 목록 (기본은 키를 뺀 공통 컬럼 전체)
+
+    반환: {'scope', 'source_rows', 'target_rows', 'matched_rows', 'identical_rows',
+           'missing': {count, sample}, 'extra': {count, sample},
+           'columns': {컬럼: {mismatches, null_in_target, null_in_source, value_changed, null_in_extra, sample_keys}},
+           'elapsed_sec'}  — columns에는 불일치가 있는 컬럼만 들어갑니다.
+    """
+    scope = scope or {}
+    batch = batch or FETCH_BATCH
+    kinds = dict(ORDER_COLUMNS)
+    names = [c for c in (columns or kinds) if c != source.key]
+    compared = [(c, kinds[c]) for c in names]
+
+    started = time.monotonic()
+    src = source.stream(*_select(source, compared, scope), batch=batch)
+    tgt = target.stream(*_select(target, compared, scope), batch=batch)
+    summary = {'scope': {k: v for k, v in scope.items() if k in ('day', 'lo', 'hi') and v is not None},
+               'source_rows': 0, 'target_rows': 0, 'matched_rows': 0, 'identical_rows': 0,
+               'missing': {'count': 0, 'sample': []}, 'extra': {'count': 0, 'sample': []}}
+    stats = {}
+
+    s_row, t_row = next(src, None), next(tgt, None)
+    while s_row is not None or t_row is not None:
+        s_key = int(s_row[0]) if s_row is not None else None
+        t_key = int(t_row[0]) if t_row is not None else None
+
+        if t_row is None or (s_row is not None and s_key < t_key):
+            summary['source_rows'] += 1
+            _count(summary['missing'], s_key)
+            s_row = next(src, None)
+            continue
+        if s_row is None or t_key < s_key:
+            summary['target_rows'] += 1
+            _count(summary['extra'], t_key)
+            for (col, _), value in zip(compared, t_row[1:]):
+                if value == NULL_TOKEN:
+                    _bump(stats, col, 'null_in_extra', t_key)
+            t_row = next(tgt, None)
+            continue
+
+        summary['source_rows'] += 1
+        summary['target_rows'] += 1
+        summary['matched_rows'] += 1
+        identical = True
+        for (col, _), s_val, t_val in zip(compared, s_row[1:], t_row[1:]):
+            if s_val == t_val:
+                continue
+            identical = False
+            if t_val == NULL_TOKEN:
+                _bump(stats, col, 'null_in_target', s_key)
+            elif s_val == NULL_TOKEN:
+                _bump(stats, col, 'null_in_source', s_key)
+            else:
+                _bump(stats, col, 'value_changed', s_key)
+        summary['identical_rows'] += identical
+        s_row, t_row = next(src, None), next(tgt, None)
+
+    summary['columns'] = {col: stats[col] for col in names if col in stats}
+    summary['elapsed_sec'] = round(time.monotonic() - started, 2)
+    return summary
+
+
+def orders_diff(day=None, columns=None):
+    """Oracle ORDERS(소스) ↔ MySQL orders_analytics(타깃) 하루치 비교 (기본 오늘)"""
+    return column_diff(oracle_side(), mysql_side(), {'day': str(day or date.today())}, columns)
+
+
+def describe(summary) -> list:
+    """요약을 사람이 읽는 문장 목록으로 (Slack/페이지/Agent 공용)"""
+    lines = []
+    if summary['missing']['count']:
+        lines.append(f"타깃 누락 {summary['missing']['count']:,}건 (예: {summary['missing']['sample'][:3]})")
+    if summary['extra']['count']:
+        lines.append(f"소스에 없는 타깃 행 {summary['extra']['count']:,}건 (예: {summary['extra']['sample'][:3]})")
+    for col, info in summary['columns'].items():
+        parts = []
+        if info['null_in_target']:
+            parts.append(f"소스 값→타깃 NULL {info['null_in_target']:,}건")
+        if info['null_in_source']:
+            parts.append(f"소스 NULL→타깃 값 {info['null_in_source']:,}건")
+        if info['value_changed']:
+            parts.append(f"값 변경 {info['value_changed']:,}건")
+        if info['null_in_extra']:
+            parts.append(f"추가 행 NULL {info['null_in_extra']:,}건")
+        example = f" (예: {info['sample_keys'][:3]})" if info['sample_keys'] else ''
+        lines.append(f"{col}: {', '.join(parts)}{example}")
+    return lines
+
+
+if __name__ == '__main__':
+    import sys, json
+    summary = orders_diff(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    for line in describe(summary):
+        print(f"  • {line}")
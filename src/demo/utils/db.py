@@ -1,27 +1,208 @@
-# utils/db.py - DB 연결 담당
+# utils/db.py - DB 연결 담당 (커넥션 풀)
 
+import os
+import time
 import sqlite3
+import threading
+import oracledb
 import mysql.connector
-import os
+from mysql.connector import pooling, errors
 from dotenv import load_dotenv
+from utils.migrations import migrate
 
 load_dotenv()
 
 # guardian.db 경로 (프로젝트 루트 기준)
 GUARDIAN_DB = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'guardian.db')
 
+# 풀 설정
+MYSQL_POOL_SIZE = int(os.getenv('MYSQL_POOL_SIZE', 8))          # mysql.connector 최대 32
+ORACLE_POOL_MIN = int(os.getenv('ORACLE_POOL_MIN', 1))
+ORACLE_POOL_MAX = int(os.getenv('ORACLE_POOL_MAX', 8))
+POOL_IDLE_TIMEOUT = int(os.getenv('DB_POOL_IDLE_TIMEOUT', 300))  # 초, 이 시간 이상 놀던 연결은 교체
+POOL_WAIT_TIMEOUT = float(os.getenv('DB_POOL_WAIT_TIMEOUT', 10))  # 초, 풀이 가득 찼을 때 대기 한도
+ORACLE_PING_INTERVAL = int(os.getenv('ORACLE_PING_INTERVAL', 60))
+
+_lock = threading.Lock()
+_mysql_pool = None
+_oracle_pool = None
+_local = threading.local()
+_migrated = False
+
+
+# ============================================================
+# SQLite - 스레드별 연결 재사용
+# ============================================================
+class _SQLiteHandle(sqlite3.Connection):
+    """스레드 로컬 SQLite 연결. close()는 실제로 닫지 않고 반납만 합니다.
+
+    with get_sqlite() as conn: 으로 쓰면 예외가 나도 반납되고, 예외 시 커밋하지 않은 변경은 버립니다.
+    (정상 종료 시 자동 커밋은 하지 않으므로 쓰기는 블록 안에서 commit()) 반납이 빠진 채 쓰기 트랜잭션이
+    남으면 RESERVED 잠금이 풀리지 않아 다른 writer가 모두 막힙니다.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.rollback()
+        self.close()
+        return False
+
+    def close(self):
+        self._depth = max(getattr(self, '_depth', 1) - 1, 0)
+        if self._depth == 0:
+            # 커밋하지 않은 변경은 실제 close와 동일하게 버림
+            self.rollback()
+        self._last_used = time.monotonic()
+
+    def dispose(self):
+        super().close()
+
+
+def _sqlite_alive(conn):
+    try:
+        conn.execute("SELECT 1")
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def _ensure_schema(conn):
+    """프로세스당 1회 guardian.db 마이그레이션 적용"""
+    global _migrated
+    if not _migrated:
+        with _lock:
+            if not _migrated:
+                migrate(conn)
+                _migrated = True
+
 
 def get_sqlite():
-    """SQLite 연결"""
-    return sqlite3.connect(GUARDIAN_DB)
+    """SQLite 연결 (스레드별 핸들 재사용)"""
+    conn = getattr(_local, 'sqlite', None)
+    if conn is not None and conn._depth == 0:
+        idle = time.monotonic() - conn._last_used
+        if idle > POOL_IDLE_TIMEOUT or not _sqlite_alive(conn):
+            conn.dispose()
+            conn = None
+    if conn is None:
+        conn = sqlite3.connect(GUARDIAN_DB, factory=_SQLiteHandle, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _ensure_schema(conn)
+        conn._depth = 0
+        conn._last_used = time.monotonic()
+        _local.sqlite = conn
+    conn._depth += 1
+    return conn
+
+
+# ============================================================
+# MySQL - mysql.connector 풀
+# ============================================================
+class _MySQLPool(pooling.MySQLConnectionPool):
+    """대기/유휴 만료를 지원하는 mysql.connector 풀
+
+    get_connection()은 기본적으로 is_connected() 헬스체크 후 끊긴 연결을 재연결합니다.
+    """
+
+    def add_connection(self, cnx=None):
+        if cnx is not None:
+            cnx._guardian_idle_since = time.monotonic()
+        super().add_connection(cnx)
+
+    def get_connection(self):
+        deadline = time.monotonic() + POOL_WAIT_TIMEOUT
+        while True:
+            try:
+                conn = super().get_connection()
+                break
+            except errors.PoolError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+
+        cnx = conn._cnx
+        idle_since = getattr(cnx, '_guardian_idle_since', None)
+        if idle_since is not None and time.monotonic() - idle_since > POOL_IDLE_TIMEOUT:
+            cnx.reconnect()
+        return conn
+
+
+def _get_mysql_pool():
+    global _mysql_pool
+    if _mysql_pool is None:
+        with _lock:
+            if _mysql_pool is None:
+                _mysql_pool = _MySQLPool(
+                    pool_name='guardian',
+                    pool_size=MYSQL_POOL_SIZE,
+                    pool_reset_session=True,
+                    host=os.getenv('MYSQL_HOST', 'localhost'),
+                    port=int(os.getenv('MYSQL_PORT', 3306)),
+                    database=os.getenv('MYSQL_DB', 'analytics'),
+                    user=os.getenv('MYSQL_USER'),
+                    password=os.getenv('MYSQL_PASSWORD')
+                )
+    return _mysql_pool
 
 
 def get_mysql():
-    """MySQL 연결"""
+    """MySQL 연결 (풀에서 대여, close()하면 반납)"""
+    return _get_mysql_pool().get_connection()
+
+
+def connect_mysql(database):
+    """풀을 거치지 않는 단독 MySQL 연결 (풀 기본 DB가 아닌 곳을 다루는 데모 스크립트용, close()하면 닫힘)"""
     return mysql.connector.connect(
         host=os.getenv('MYSQL_HOST', 'localhost'),
         port=int(os.getenv('MYSQL_PORT', 3306)),
-        database=os.getenv('MYSQL_DB', 'analytics'),
+        database=database,
         user=os.getenv('MYSQL_USER'),
         password=os.getenv('MYSQL_PASSWORD')
-    )
\ No newline at end of file
+    )
+
+
+# ============================================================
+# Oracle - oracledb 세션 풀
+# ============================================================
+def _get_oracle_pool():
+    global _oracle_pool
+    if _oracle_pool is None:
+        with _lock:
+            if _oracle_pool is None:
+                _oracle_pool = oracledb.create_pool(
+                    user=os.getenv("ORACLE_USER"),
+                    password=os.getenv("ORACLE_PASSWORD"),
+                    dsn=os.getenv("ORACLE_DSN"),
+                    min=ORACLE_POOL_MIN,
+                    max=ORACLE_POOL_MAX,
+                    increment=1,
+                    timeout=POOL_IDLE_TIMEOUT,
+                    ping_interval=ORACLE_PING_INTERVAL,
+                    getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                    wait_timeout=int(POOL_WAIT_TIMEOUT * 1000)
+                )
+    return _oracle_pool
+
+
+def get_oracle():
+    """Oracle 연결 (세션 풀에서 대여, close()하면 반납)"""
+    return _get_oracle_pool().acquire()
+
+
+def close_pools():
+    """프로세스 종료 시 풀 정리"""
+    global _mysql_pool, _oracle_pool
+    with _lock:
+        if _mysql_pool is not None:
+            _mysql_pool._remove_connections()
+            _mysql_pool = None
+        if _oracle_pool is not None:
+            _oracle_pool.close(force=True)
+            _oracle_pool = None
+    conn = getattr(_local, 'sqlite', None)
+    if conn is not None:
+        conn.dispose()
+        _local.sqlite = None
@@ -1,14 +1,24 @@
 # utils/detector.py - 볼륨/품질 검사 로직
 
+import os
 import numpy as np
 import pandas as pd
 import json
 import decimal
 from datetime import date
 from utils.db import get_sqlite, get_mysql
+from utils.detectors import detector_for, score_latest
+from utils.volume_stats import daily_states
+from utils.profiler import profile_table, incremental_profile, summarize_profile
+from utils.coldiff import orders_diff
+from utils.baseline import get_null_history
 from datetime import date, timedelta
 
 TASK_NAME = 'm_ORDERS_SYNC'
+PROFILE_MODE = os.getenv('GUARDIAN_PROFILE_MODE', 'full')
+# NULL 이상이 나오면 오늘 행을 Oracle과 컬럼 단위로 비교해 원인(ETL 변환 / 외부 INSERT / 소스)을 붙임
+# 하루치 양쪽 전체를 읽으므로 기본은 끄고, 품질검사 페이지 버튼 / Agent diff 도구에서 요청 시 실행
+DIFF_ON_ANOMALY = os.getenv('GUARDIAN_DIFF_ON_ANOMALY', '0') == '1'
 
 
 class DecimalEncoder(json.JSONEncoder):
@@ -18,14 +28,13 @@ class DecimalEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
-def load_volume_history():
-    """볼륨 이력 로드"""
-    conn = get_sqlite()
-    df = pd.read_sql("""
-        SELECT run_date, day_of_week, rows_processed 
-        FROM task_history WHERE task_name = ? ORDER BY run_date
-    """, conn, params=(TASK_NAME,))
-    conn.close()
+def load_volume_history(task_name=TASK_NAME, before=None):
+    """볼륨 이력 로드 (before 이전만, 기본은 오늘 제외 — 스냅샷이 쌓은 당일 행이 기준선에 섞이지 않게)"""
+    with get_sqlite() as conn:
+        df = pd.read_sql("""
+            SELECT run_date, day_of_week, rows_processed 
+            FROM task_history WHERE task_name = ? AND run_date < ? ORDER BY run_date
+        """, conn, params=(task_name, str(before or date.today())))
     return df
 
 
@@ -39,103 +48,154 @@ def get_today_rows():
     return total if total > 0 else None
 
 
-def check_volume(today_rows, df):
-    """볼륨 이상 판단"""
+def check_volume(today_rows, df=None, task_name=TASK_NAME, run_date=None):
+    """볼륨 이상 판단 (태스크에 지정된 탐지기, 기본 같은 요일 Z-Score)
+
+    df(이력)를 넘기지 않으면 zscore/ewma처럼 누적 통계로 판정 가능한 탐지기는
+    volume_stats 몇 행만 읽고(이력 전체 로드 없음), 그 외 탐지기는 이력을 읽어 판정합니다.
+    """
     if today_rows is None:
         return {'severity': 'no_data', 'is_anomaly': False, 'today_rows': 0,
                 'mean': 0, 'std': 0, 'z_score': 0, 'change_pct': 0,
                 'compare': '', 'day_name': '', 'no_data': True}
-    if df.empty:
-        return {'severity': 'normal', 'is_anomaly': False, 'today_rows': today_rows,
-                'mean': 0, 'std': 0, 'z_score': 0, 'change_pct': 0,
-                'compare': '', 'day_name': ''}
+    no_history = {'severity': 'normal', 'is_anomaly': False, 'today_rows': today_rows,
+                  'mean': 0, 'std': 0, 'z_score': 0, 'change_pct': 0,
+                  'compare': '', 'day_name': ''}
 
-    dow = date.today().weekday()
+    run_date = run_date or date.today()
+    dow = run_date.weekday()
     dow_name = ['월','화','수','목','금','토','일'][dow]
-    same_dow = df[df['day_of_week'] == dow]['rows_processed'].values
-    history = same_dow if len(same_dow) >= 3 else df['rows_processed'].values
-    compare = f'{dow_name}요일' if len(same_dow) >= 3 else '전체'
-
-    mean = float(np.mean(history))
-    std = float(np.std(history))
-    if std < 1: std = max(mean * 0.1, 1)
-    z = (today_rows - mean) / std
-    pct = (today_rows - mean) / mean * 100
-    severity = 'critical' if abs(z) >= 3 else 'warning' if abs(z) >= 2 else 'normal'
+    detector = detector_for(task_name, 'volume')
+    if df is None and detector.stateful:
+        r = detector.score_state(*daily_states(task_name, run_date), today_rows)
+        if r is None:
+            return no_history
+    else:
+        if df is None:
+            df = load_volume_history(task_name, run_date)
+        if df.empty:
+            return no_history
+        r = score_latest(detector, df['rows_processed'].values, df['day_of_week'].values, today_rows, dow)
+    compare = f'{dow_name}요일' if r['seasonal'] else '전체'
+
+    mean, std, z = r['expected'], r['scale'], r['score']
+    pct = (today_rows - mean) / mean * 100 if mean else 0.0
 
     return {
         'today_rows': today_rows, 'compare': compare, 'day_name': dow_name,
         'mean': round(mean, 1), 'std': round(std, 1), 'z_score': round(z, 2),
-        'change_pct': round(pct, 1), 'severity': severity, 'is_anomaly': abs(z) >= 2,
+        'change_pct': round(pct, 1), 'severity': r['severity'], 'is_anomaly': r['severity'] != 'normal',
+        'detector': detector.name,
     }
 
 
-def load_quality_history():
-    """품질 이력 로드"""
-    conn = get_sqlite()
-    df = pd.read_sql("""
-        SELECT run_date, column_name, null_pct 
-        FROM quality_history ORDER BY run_date
-    """, conn)
-    conn.close()
+def load_quality_history(before=None):
+    """품질 이력 로드 (before 이전만, 기본은 오늘 제외)"""
+    with get_sqlite() as conn:
+        df = pd.read_sql("""
+            SELECT run_date, column_name, null_pct 
+            FROM quality_history WHERE run_date < ? ORDER BY run_date
+        """, conn, params=(str(before or date.today()),))
     return df
 
 
-def check_quality():
-    """컬럼 품질 검사 + 이력 비교"""
-    conn = get_mysql()
-    cur = conn.cursor(dictionary=True)
-
-    cur.execute("SELECT COUNT(*) as cnt FROM orders_analytics")
-    total = cur.fetchone()['cnt']
-
-    null_checks = {}
-    for col in ['phone_number', 'email', 'customer_name', 'total_amount', 'product_code', 'category']:
-        cur.execute(f"SELECT SUM(CASE WHEN {col} IS NULL OR {col} = '' THEN 1 ELSE 0 END) as n FROM orders_analytics")
-        n = int(cur.fetchone()['n'] or 0)
-        null_checks[col] = {'null_count': n, 'null_pct': round(n / total * 100, 1) if total > 0 else 0}
-
-    cur.execute("""
-        SELECT SUM(CASE WHEN total_amount=0 THEN 1 ELSE 0 END) as z,
-               AVG(total_amount) as a, MIN(total_amount) as mi, MAX(total_amount) as ma
-        FROM orders_analytics
-    """)
-    amt = cur.fetchone()
-
-    cur.execute("SELECT category, COUNT(*) as cnt FROM orders_analytics GROUP BY category ORDER BY cnt DESC")
-    cats = {str(r['category']): int(r['cnt']) for r in cur.fetchall()}
-    conn.close()
-
-    zero_pct = round(float(amt['z'] or 0) / total * 100, 1) if total > 0 else 0
-
-    # 과거 7일 평균과 비교
-    conn_sq = get_sqlite()
-    cur_sq = conn_sq.cursor()
+def check_quality(columns=None, incremental=None):
+    """컬럼 품질 검사 + 이력 비교
+
+    incremental=True면 sync_timestamp 워터마크 이후 신규 행만 스캔합니다.
+    (기본값은 환경변수 GUARDIAN_PROFILE_MODE=incremental)
+    """
+    if incremental is None:
+        incremental = PROFILE_MODE == 'incremental'
+    if incremental:
+        profile = incremental_profile(columns)
+    else:
+        conn = get_mysql()
+        profile = profile_table(conn, columns)
+        conn.close()
+
+    total, null_checks, amount_stats, cats = summarize_profile(profile)
+    zero_pct = amount_stats['zero_pct']
+
+    # 컬럼별 NULL 비율 이력과 비교 (기본 growth: 과거 7회 평균 대비 증가 규칙)
+    # 이력은 기준선 캐시에서 탐지기가 쓰는 만큼만 (growth는 최근 window회, 그 외는 전체)
+    today = date.today()
+    detector = detector_for(TASK_NAME, 'null_pct')
+    history = get_null_history(today, detector.history_window())
     changes = {}
     anomalies = []
     for col, info in null_checks.items():
-        cur_sq.execute("SELECT AVG(null_pct) FROM quality_history WHERE column_name=? ORDER BY run_date DESC LIMIT 7", (col,))
-        row = cur_sq.fetchone()
-        prev = round(row[0], 2) if row and row[0] else 0.0
+        values, dows = history.get(col, ([], []))
+        r = score_latest(detector, values, dows, info['null_pct'], today.weekday())
+        prev = round(r['expected'], 2) if r['expected'] == r['expected'] else 0.0
         diff = round(info['null_pct'] - prev, 1)
         growth_rate = (info['null_pct'] - prev) / prev if prev > 0 else info['null_pct']
         changes[col] = {'current_pct': info['null_pct'], 'prev_7d_avg': prev, 'diff': diff}
 
-        if (prev == 0 and info['null_pct'] > 0.1) or (prev > 0 and growth_rate >= 1.0) or (diff >= 5.0):
+        if r['severity'] != 'normal':
+            if detector.name == 'growth':
+                message = f"🚨 {col} 이상 감지: 이전 대비 {growth_rate*100:.0f}% 급증! ({prev}% → {info['null_pct']}%)"
+            else:
+                message = f"🚨 {col} 이상 감지 ({detector.name} 점수 {r['score']:.1f}): {prev}% → {info['null_pct']}%"
             anomalies.append({
                 'column': col, 'current_pct': info['null_pct'],
-                'prev_avg': prev, 'diff': diff,
-                'message': f"🚨 {col} 이상 감지: 이전 대비 {growth_rate*100:.0f}% 급증! ({prev}% → {info['null_pct']}%)"
+                'prev_avg': prev, 'diff': diff, 'severity': r['severity'],
+                'message': message
             })
-    conn_sq.close()
 
     if zero_pct > 5:
         anomalies.append({'column': 'total_amount', 'zero_pct': zero_pct,
                           'message': f"total_amount 0원 비율 {zero_pct}%"})
 
+    diff = None
+    null_anomalies = [a for a in anomalies if 'current_pct' in a]
+    if DIFF_ON_ANOMALY and null_anomalies:
+        diff = diff_null_anomalies(null_anomalies)
+
     return {
         'total_rows': total, 'null_checks': null_checks, 'changes': changes,
-        'amount_stats': {'avg': float(amt['a'] or 0), 'min': float(amt['mi'] or 0),
-                         'max': float(amt['ma'] or 0), 'zero_pct': zero_pct},
+        'amount_stats': amount_stats,
         'categories': cats, 'anomalies': anomalies, 'is_anomaly': len(anomalies) > 0,
-    }
\ No newline at end of file
+        'transfer_diff': diff,
+        'recounted_partitions': profile.get('recounted', []),
+    }
+
+
+def diff_null_anomalies(anomalies, day=None):
+    """NULL 이상 컬럼만 Oracle과 하루치 대조 후 원인 추정을 붙임. 대조 요약(실패 시 {'error'}) 반환"""
+    try:
+        diff = orders_diff(day, columns=[a['column'] for a in anomalies])
+        explain_null_anomalies(anomalies, diff)
+    except Exception as e:
+        diff = {'error': str(e)}
+    return diff
+
+
+def explain_null_anomalies(anomalies, diff):
+    """컬럼 비교 결과로 NULL 이상마다 원인(cause) 추정
+
+    소스 값이 타깃에서 NULL → etl_transform, 소스에 없는 행의 NULL → external_insert,
+    키가 맞는 행보다 누락/추가 행이 많으면 → row_mismatch (행 자체가 어긋나 원인 판단 불가),
+    키가 맞는 행에서 양쪽 모두 NULL → source
+    건수는 a['transfer_counts']에 붙입니다 (a['diff']는 NULL 비율 증감 %p 그대로).
+    """
+    unmatched = diff['missing']['count'] + diff['extra']['count']
+    for a in anomalies:
+        info = diff['columns'].get(a['column'], {})
+        a['transfer_counts'] = {k: info.get(k, 0) for k in ('null_in_target', 'null_in_extra')}
+        causes = []
+        if info.get('null_in_target'):
+            causes.append(f"ETL 변환 오류 의심: 소스 값 → 타깃 NULL {info['null_in_target']:,}건 (예: {info['sample_keys'][:3]})")
+        if info.get('null_in_extra'):
+            causes.append(f"외부 INSERT 의심: 소스에 없는 행 {diff['extra']['count']:,}건 중 NULL {info['null_in_extra']:,}건")
+        if causes:
+            a['cause'] = 'etl_transform' if info.get('null_in_target') else 'external_insert'
+            a['cause_detail'] = ' / '.join(causes)
+        elif unmatched and unmatched >= diff['matched_rows']:
+            a['cause'] = 'row_mismatch'
+            a['cause_detail'] = (f"원인 불명: 키가 맞는 행 {diff['matched_rows']:,}건보다 "
+                                 f"누락 {diff['missing']['count']:,}건 / 추가 {diff['extra']['count']:,}건이 많음 — 대사 범위 확인 필요")
+        else:
+            a['cause'] = 'source'
+            a['cause_detail'] = '소스(Oracle)에도 NULL — 소스 데이터 문제'
+    return anomalies
\ No newline at end of file
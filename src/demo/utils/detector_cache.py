@@ -0,0 +1,136 @@
+# utils/detector_cache.py - 페이지용 detector 캐시 (세션 공유 + TTL + 데이터 버전 무효화)
+#
+# 페이지는 utils.detector 대신 여기서 같은 이름의 함수를 가져다 씁니다.
+# Streamlit 서버 한 프로세스 안의 모든 세션이 같은 캐시를 공유하므로
+# 운영자 여러 명이 새로고침해도 MySQL 집계 쿼리는 TTL마다 한 번만 나갑니다.
+#
+# 캐시 키에는 실행 날짜(오늘)가 들어가고, guardian.db의 데이터 버전(수집 로그/이력/스냅샷 최신값)이
+# 바뀌면 전부 무효화됩니다. collector가 다른 프로세스에서 돌아도 버전으로 감지됩니다.
+#
+# 오늘 스냅샷(snapshot.py)이 있으면 volume_result()/quality_result()는 MySQL 대신 스냅샷 1행을 읽습니다.
+
+import os
+import copy
+import json
+import time
+import threading
+from datetime import date
+from utils.db import get_sqlite
+from utils import detector
+from utils.detector import check_volume, TASK_NAME
+
+TTL_TODAY_ROWS = float(os.getenv('DETECTOR_CACHE_TTL_TODAY', 60))       # 오늘 건수 (MySQL COUNT)
+TTL_QUALITY = float(os.getenv('DETECTOR_CACHE_TTL_QUALITY', 300))       # 품질 검사 (MySQL 프로파일)
+TTL_HISTORY = float(os.getenv('DETECTOR_CACHE_TTL_HISTORY', 3600))      # guardian.db 이력
+VERSION_CHECK_INTERVAL = float(os.getenv('DETECTOR_CACHE_VERSION_CHECK', 5))
+
+_lock = threading.Lock()
+_cache = {}            # key -> (만료 시각, 값)
+_key_locks = {}        # key -> Lock (같은 키 동시 요청은 한 번만 계산)
+_version = {'value': None, 'checked': 0.0}
+
+
+def data_version() -> tuple:
+    """guardian.db 데이터 버전 (모두 인덱스/rowid MAX 조회라 가벼움)"""
+    with get_sqlite() as conn:
+        cur = conn.cursor()
+        parts = []
+        for sql in ("SELECT MAX(start_time) FROM idmc_logs",
+                    "SELECT MAX(id) FROM task_history",
+                    "SELECT MAX(id) FROM quality_history",
+                    "SELECT MAX(last_sync) FROM profile_watermark",
+                    "SELECT MAX(created_at) FROM daily_snapshot"):
+            cur.execute(sql)
+            parts.append(cur.fetchone()[0])
+    return tuple(parts)
+
+
+def invalidate():
+    """캐시 전체 비우기 (collector 등 같은 프로세스에서 데이터를 쓴 직후 호출)"""
+    with _lock:
+        _cache.clear()
+        _version.update(value=None, checked=0.0)
+
+
+def _check_version():
+    now = time.monotonic()
+    with _lock:
+        if now - _version['checked'] < VERSION_CHECK_INTERVAL:
+            return
+        _version['checked'] = now
+    version = data_version()
+    with _lock:
+        if _version['value'] is not None and version != _version['value']:
+            _cache.clear()
+        _version['value'] = version
+
+
+def _cached(name, ttl, fn, *args):
+    _check_version()
+    key = (name, str(date.today()), args)
+    with _lock:
+        hit = _cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            return copy.deepcopy(hit[1])
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        # 기다리는 동안 다른 세션이 채웠으면 그대로 사용
+        with _lock:
+            hit = _cache.get(key)
+            if hit and hit[0] > time.monotonic():
+                return copy.deepcopy(hit[1])
+        value = fn(*args)
+        with _lock:
+            _cache[key] = (time.monotonic() + ttl, value)
+            _key_locks.pop(key, None)
+        return copy.deepcopy(value)
+
+
+def load_volume_history(task_name=TASK_NAME):
+    return _cached('volume_history', TTL_HISTORY, detector.load_volume_history, task_name)
+
+
+def load_quality_history():
+    return _cached('quality_history', TTL_HISTORY, detector.load_quality_history)
+
+
+def get_today_rows():
+    return _cached('today_rows', TTL_TODAY_ROWS, detector.get_today_rows)
+
+
+def check_quality():
+    return _cached('check_quality', TTL_QUALITY, detector.check_quality)
+
+
+def _load_snapshot(task_name, run_date):
+    with get_sqlite() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT volume, quality, created_at FROM daily_snapshot WHERE task_name = ? AND run_date = ?
+        """, (task_name, run_date))
+        row = cur.fetchone()
+    if row is None:
+        return None
+    return {'vol': json.loads(row[0]), 'qual': json.loads(row[1]), 'created_at': row[2]}
+
+
+def get_snapshot(task_name=TASK_NAME):
+    """오늘 스냅샷 {'vol', 'qual', 'created_at'} (없으면 None)"""
+    return _cached('snapshot', TTL_HISTORY, _load_snapshot, task_name, str(date.today()))
+
+
+def volume_result(task_name=TASK_NAME):
+    """오늘 볼륨 판정 (스냅샷 우선, 없으면 즉시 계산)"""
+    snap = get_snapshot(task_name)
+    if snap:
+        return snap['vol']
+    return check_volume(get_today_rows(), task_name=task_name)
+
+
+def quality_result(task_name=TASK_NAME):
+    """오늘 품질 판정 (스냅샷 우선, 없으면 즉시 계산)"""
+    snap = get_snapshot(task_name)
+    if snap and snap['qual'] is not None:
+        return snap['qual']
+    return check_quality()
@@ -0,0 +1,351 @@
+# utils/detectors.py - 이상 탐지기 플러그인 (태스크/지표별 등록 + NumPy 벡터 연산)
+#
+# 탐지기는 evaluate(values, dow)로 이력 전체를 한 번에 평가합니다.
+# 각 시점 t의 기대값/척도/점수는 t 이전 값만으로 계산(워크포워드)하므로
+#   - 실시간 판정: 이력 + 오늘 값을 붙여 마지막 점만 사용 (score_latest)
+#   - 백테스트  : 같은 호출 한 번으로 모든 날짜를 재현 (utils/backtest.py)
+# 가 같은 코드를 탑니다.
+#
+# 지표별 탐지기 지정 (기본: volume=zscore, null_pct=growth — 기존 판정과 동일, run_rows=zscore)
+#   GUARDIAN_DETECTORS="volume=mad;m_ORDERS_SYNC:volume=holt_winters"
+
+import os
+import warnings
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+SEVERITIES = np.array(['normal', 'warning', 'critical'])
+
+DETECTORS = {}          # 이름 -> 탐지기 클래스
+
+
+def register(cls):
+    """탐지기 클래스 등록 데코레이터"""
+    DETECTORS[cls.name] = cls
+    return cls
+
+
+# ============================================================
+# 벡터 연산 도우미
+# ============================================================
+def _floor_scale(scale, expected):
+    """척도가 너무 작으면 기대값의 10% (최소 1) — 기존 check_volume 규칙"""
+    scale = np.asarray(scale, dtype=float)
+    return np.where(~(scale >= 1), np.maximum(np.nan_to_num(expected) * 0.1, 1), scale)
+
+
+def _prefix_stats(values, groups):
+    """t 이전 같은 그룹 값들의 (건수, 평균, 표준편차 ddof=0)"""
+    s = pd.Series(values, dtype=float)
+    by = s.groupby(groups)
+    count = by.cumcount().values.astype(float)
+    total = by.cumsum().values - s.values
+    sq = (s ** 2).groupby(groups).cumsum().values - s.values ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / count
+        std = np.sqrt(np.maximum(sq / count - mean ** 2, 0))
+    return count, mean, std
+
+
+def _windows(values, groups, window):
+    """(n, window) 배열. 행 t = t 이전 같은 그룹 최근 window개 (부족하면 NaN)"""
+    values = np.asarray(values, dtype=float)
+    out = np.full((len(values), window), np.nan)
+    for g in np.unique(groups):
+        idx = np.flatnonzero(groups == g)
+        padded = np.concatenate([np.full(window, np.nan), values[idx]])
+        out[idx] = sliding_window_view(padded, window)[:len(idx)]
+    return out
+
+
+def _row_quantile(w, q):
+    """행별 분위수 (NaN 제외, 선형 보간). np.nanquantile보다 훨씬 빠른 정렬 1회 방식"""
+    ordered = np.sort(w, axis=1)                            # NaN은 뒤로
+    count = np.sum(~np.isnan(w), axis=1)
+    pos = q * np.maximum(count - 1, 0)
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, np.maximum(count - 1, 0))
+    lo_val = np.take_along_axis(ordered, lo[:, None], axis=1)[:, 0]
+    hi_val = np.take_along_axis(ordered, hi[:, None], axis=1)[:, 0]
+    return np.where(count > 0, lo_val + (hi_val - lo_val) * (pos - lo), np.nan)
+
+
+def _nan_reduce(fn, arr, *args):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)     # 이력이 없는 행(All-NaN)
+        return fn(arr, *args, axis=1)
+
+
+# ============================================================
+# 탐지기
+# ============================================================
+class Detector:
+    """탐지기 기본 클래스. 하위 클래스는 _evaluate()만 구현합니다.
+
+    seasonal: 같은 요일 이력을 우선 사용 (부족하면 전체 이력)
+    warning/critical: |점수| 임계값
+    """
+    name = None
+    seasonal = True
+    stateful = False            # volume_stats 누적 통계만으로 판정 가능 (score_state)
+    min_periods = 3
+    warning = 2.0
+    critical = 3.0
+
+    def __init__(self, **params):
+        for key, value in params.items():
+            if not hasattr(self, key):
+                raise ValueError(f"{self.name}: 알 수 없는 파라미터 {key}")
+            setattr(self, key, value)
+
+    def evaluate(self, values, dow):
+        """{'expected', 'scale', 'score', 'seasonal', 'severity'} 배열 (길이 n)"""
+        values = np.asarray(values, dtype=float)
+        dow = np.asarray(dow, dtype=int)
+        result = self._evaluate(values, dow if self.seasonal else np.zeros(len(values), dtype=int))
+        result['severity'] = self.severity(values, result)
+        return result
+
+    def _evaluate(self, values, dow):
+        raise NotImplementedError
+
+    def severity(self, values, result):
+        score = np.abs(np.nan_to_num(result['score']))
+        return SEVERITIES[(score >= self.warning).astype(int) + (score >= self.critical)]
+
+    def history_window(self):
+        """판정에 필요한 직전 이력 개수 (None이면 전체 이력)"""
+        return None
+
+    def score_state(self, segment, overall, value):
+        """누적 통계(같은 요일 / 전체 상태)로 값 1개 판정 — stateful 탐지기만. 통계가 없으면 None"""
+        raise NotImplementedError(f"{self.name}: 누적 통계 판정을 지원하지 않습니다")
+
+    def _score_one(self, value, expected, scale, seasonal):
+        scale = _floor_scale(scale if scale is not None else np.nan, expected).item()
+        result = {'expected': expected, 'scale': scale, 'score': (value - expected) / scale, 'seasonal': seasonal}
+        result['severity'] = self.severity(np.array([float(value)]),
+                                           {k: np.array([v]) for k, v in result.items()})[0].item()
+        return result
+
+    def _combine(self, values, seasonal_ok, seasonal, overall):
+        """같은 요일 결과(seasonal)와 전체 결과(overall) 중 선택 후 점수 계산"""
+        expected = np.where(seasonal_ok, seasonal[0], overall[0])
+        scale = _floor_scale(np.where(seasonal_ok, seasonal[1], overall[1]), expected)
+        with np.errstate(invalid='ignore'):
+            score = np.where(np.isnan(expected), 0.0, (values - expected) / scale)
+        return {'expected': expected, 'scale': scale, 'score': score, 'seasonal': seasonal_ok}
+
+
+@register
+class ZScore(Detector):
+    """같은 요일(3회 이상) 또는 전체 이력 평균/표준편차 Z-Score"""
+    name = 'zscore'
+    stateful = True
+
+    def _evaluate(self, values, dow):
+        n_dow, m_dow, s_dow = _prefix_stats(values, dow)
+        _, m_all, s_all = _prefix_stats(values, np.zeros(len(values), dtype=int))
+        return self._combine(values, n_dow >= self.min_periods, (m_dow, s_dow), (m_all, s_all))
+
+    def score_state(self, segment, overall, value):
+        use_dow = segment['n'] >= self.min_periods
+        state = segment if use_dow else overall
+        if not state['n']:
+            return None
+        return self._score_one(value, state['mean'], np.sqrt(max(state['m2'], 0.0) / state['n']), use_dow)
+
+
+@register
+class MedianMAD(Detector):
+    """최근 window개 중앙값 / MAD(×1.4826) — 과거 이상치에 끌려가지 않는 Z-Score"""
+    name = 'mad'
+    window = 8
+    overall_window = 14
+
+    def _evaluate(self, values, dow):
+        def stats(w):
+            med = _row_quantile(w, 0.5)
+            mad = _row_quantile(np.abs(w - med[:, None]), 0.5) * 1.4826
+            return med, mad, np.sum(~np.isnan(w), axis=1)
+
+        m_dow, s_dow, n_dow = stats(_windows(values, dow, self.window))
+        m_all, s_all, _ = stats(_windows(values, np.zeros(len(values), dtype=int), self.overall_window))
+        return self._combine(values, n_dow >= self.min_periods, (m_dow, s_dow), (m_all, s_all))
+
+
+@register
+class EWMA(Detector):
+    """지수가중 평균/표준편차 (최근 값에 가중치, 추세 변화에 빨리 적응)
+
+    점화식(adjust=False) 형태라 volume_stats의 EWMA 상태와 같은 값이 나옵니다.
+    """
+    name = 'ewma'
+    stateful = True
+    alpha = float(os.getenv('GUARDIAN_EWMA_ALPHA', 0.3))
+
+    def _evaluate(self, values, dow):
+        s = pd.Series(values)
+
+        def stats(groups):
+            by = s.groupby(groups)
+            mean = by.transform(lambda v: v.ewm(alpha=self.alpha, adjust=False).mean().shift()).values
+            std = by.transform(lambda v: v.ewm(alpha=self.alpha, adjust=False).std(bias=True).shift()).values
+            return mean, std, by.cumcount().values
+
+        m_dow, s_dow, n_dow = stats(dow)
+        m_all, s_all, _ = stats(np.zeros(len(values), dtype=int))
+        return self._combine(values, n_dow >= self.min_periods, (m_dow, s_dow), (m_all, s_all))
+
+    def score_state(self, segment, overall, value):
+        use_dow = segment['n'] >= self.min_periods
+        state = segment if use_dow else overall
+        if not state['n']:
+            return None
+        return self._score_one(value, state['ewma_mean'], np.sqrt(max(state['ewma_var'], 0.0)), use_dow)
+
+
+@register
+class HoltWinters(Detector):
+    """가법 Holt-Winters (수준 + 추세 + 요일 계절성) 한 걸음 예측 오차
+
+    점화식이라 시간축은 스칼라 루프입니다. 이상치는 잔차를 clip 폭으로 잘라 갱신해
+    한 번의 급변이 이후 예측을 끌고 가지 않게 합니다.
+    """
+    name = 'holt_winters'
+    seasonal = False            # 계절성은 모형 안에서 요일로 직접 처리
+    alpha = 0.3
+    beta = 0.05
+    gamma = 0.2
+    warmup = 14
+    clip = 3.0
+
+    def evaluate(self, values, dow):
+        values = np.asarray(values, dtype=float)
+        result = self._holt_winters(values, np.asarray(dow, dtype=int))
+        result['severity'] = self.severity(values, result)
+        return result
+
+    def _holt_winters(self, values, dow):
+        n = len(values)
+        expected = np.full(n, np.nan)
+        scale = np.full(n, np.nan)
+        season = np.zeros(7)
+        level = trend = None
+        err = None                                 # 지수가중 평균 절대 잔차
+        for t in range(n):
+            x, d = values[t], dow[t]
+            if level is None:
+                level, trend = x, 0.0
+                continue
+            forecast = level + trend + season[d]
+            expected[t] = forecast
+            resid = x - forecast
+            if err is not None:
+                scale[t] = err * 1.25              # 평균 절대 오차 → 표준편차 근사
+                bound = self.clip * max(scale[t], 1)
+                resid = min(max(resid, -bound), bound)
+            err = abs(resid) if err is None else 0.2 * abs(resid) + 0.8 * err
+            x = forecast + resid
+            prev_level = level
+            level = self.alpha * (x - season[d]) + (1 - self.alpha) * (level + trend)
+            trend = self.beta * (level - prev_level) + (1 - self.beta) * trend
+            season[d] = self.gamma * (x - level) + (1 - self.gamma) * season[d]
+
+        ready = np.arange(n) >= self.warmup
+        scale = _floor_scale(scale, expected)
+        with np.errstate(invalid='ignore'):
+            score = np.where(ready & ~np.isnan(expected), (values - expected) / scale, 0.0)
+        return {'expected': expected, 'scale': scale, 'score': score, 'seasonal': ready}
+
+
+@register
+class Quantile(Detector):
+    """최근 window개 분위수 밴드 (q_low~q_high). 점수 = 중앙값과의 거리 / 밴드 반폭"""
+    name = 'quantile'
+    window = 8
+    overall_window = 14
+    q_low = 0.1
+    q_high = 0.9
+
+    def _evaluate(self, values, dow):
+        def stats(w):
+            lo, mid, hi = (_row_quantile(w, q) for q in (self.q_low, 0.5, self.q_high))
+            return mid, (hi - lo) / 2, np.sum(~np.isnan(w), axis=1)
+
+        m_dow, s_dow, n_dow = stats(_windows(values, dow, self.window))
+        m_all, s_all, _ = stats(_windows(values, np.zeros(len(values), dtype=int), self.overall_window))
+        return self._combine(values, n_dow >= self.min_periods, (m_dow, s_dow), (m_all, s_all))
+
+
+@register
+class Growth(Detector):
+    """NULL 비율 증가 규칙 (기존 check_quality): 직전 window회 평균 대비
+
+    평균 0에서 0.1% 초과 / 평균 대비 100% 이상 증가 / 5%p 이상 증가 → warning
+    점수는 증가율(평균 0이면 현재 비율)입니다.
+    """
+    name = 'growth'
+    seasonal = False
+    window = int(os.getenv('GUARDIAN_BASELINE_WINDOW', 7))
+    zero_threshold = 0.1
+    growth_threshold = 1.0
+    diff_threshold = 5.0
+
+    def _evaluate(self, values, dow):
+        w = _windows(values, dow, self.window)
+        prev = np.round(np.nan_to_num(_nan_reduce(np.nanmean, w)), 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = np.where(prev > 0, (values - prev) / prev, values)
+        return {'expected': prev, 'scale': np.zeros(len(values)), 'score': score,
+                'seasonal': np.zeros(len(values), dtype=bool)}
+
+    def history_window(self):
+        return self.window
+
+    def severity(self, values, result):
+        prev = result['expected']
+        hit = (((prev == 0) & (values > self.zero_threshold))
+               | ((prev > 0) & (result['score'] >= self.growth_threshold))
+               | (np.round(values - prev, 1) >= self.diff_threshold))
+        return SEVERITIES[hit.astype(int)]
+
+
+# ============================================================
+# 태스크/지표별 지정
+# ============================================================
+_assignments = {('*', 'volume'): ('zscore', {}), ('*', 'null_pct'): ('growth', {}), ('*', 'run_rows'): ('zscore', {})}
+
+
+def assign(metric, name, task='*', **params):
+    """지표(volume, null_pct ...)에 탐지기 지정. task='*'는 전체 태스크 기본값"""
+    if name not in DETECTORS:
+        raise ValueError(f"알 수 없는 탐지기: {name} (사용 가능: {', '.join(DETECTORS)})")
+    DETECTORS[name](**params)               # 파라미터 검증
+    _assignments[(task, metric)] = (name, params)
+
+
+def _load_env():
+    for item in os.getenv('GUARDIAN_DETECTORS', '').split(';'):
+        if '=' not in item:
+            continue
+        target, name = (part.strip() for part in item.split('=', 1))
+        task, _, metric = target.rpartition(':')
+        assign(metric, name, task or '*')
+
+
+def detector_for(task, metric):
+    name, params = _assignments.get((task, metric)) or _assignments[('*', metric)]
+    return DETECTORS[name](**params)
+
+
+def score_latest(detector, history, history_dow, value, dow):
+    """이력 뒤에 value를 붙여 마지막 점만 판정 → {'expected', 'scale', 'score', 'seasonal', 'severity'}"""
+    values = np.append(np.asarray(history, dtype=float), float(value))
+    days = np.append(np.asarray(history_dow, dtype=int), int(dow))
+    result = detector.evaluate(values, days)
+    return {key: arr[-1].item() if hasattr(arr[-1], 'item') else arr[-1] for key, arr in result.items()}
+
+
+_load_env()
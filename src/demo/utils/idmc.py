@@ -0,0 +1,91 @@
+# utils/idmc.py - IDMC REST 클라이언트 (세션 토큰 캐시 + keep-alive + 재시도)
+
+import os
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# IDMC 세션은 기본 30분 유휴 시 만료 → 조금 일찍 갱신
+SESSION_TTL = int(os.getenv('IDMC_SESSION_TTL', 25 * 60))
+REQUEST_TIMEOUT = float(os.getenv('IDMC_TIMEOUT', 30))
+RETRY_TOTAL = int(os.getenv('IDMC_RETRY_TOTAL', 3))
+RETRY_BACKOFF = float(os.getenv('IDMC_RETRY_BACKOFF', 0.5))
+
+_lock = threading.Lock()
+_http = None
+_session = {'id': None, 'server_url': None, 'expires': 0.0}
+
+
+def _get_http():
+    """keep-alive + 재시도/백오프가 설정된 공용 requests.Session"""
+    global _http
+    if _http is None:
+        with _lock:
+            if _http is None:
+                retry = Retry(
+                    total=RETRY_TOTAL,
+                    backoff_factor=RETRY_BACKOFF,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(['GET', 'POST']),
+                    raise_on_status=False,
+                )
+                http = requests.Session()
+                adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=16)
+                http.mount('https://', adapter)
+                http.mount('http://', adapter)
+                _http = http
+    return _http
+
+
+def login(force=False):
+    """캐시된 (icSessionId, serverUrl) 반환. 만료되었거나 force=True면 다시 로그인."""
+    with _lock:
+        if not force and _session['id'] and time.monotonic() < _session['expires']:
+            return _session['id'], _session['server_url']
+
+    login_url = f"{os.getenv('IDMC_LOGIN_URL')}/ma/api/v2/user/login"
+    payload = {"@type": "login", "username": os.getenv('IDMC_USERNAME'), "password": os.getenv('IDMC_PASSWORD')}
+    resp = _get_http().post(login_url, json=payload, timeout=REQUEST_TIMEOUT)
+    resp.raise_for_status()
+    data = resp.json()
+
+    with _lock:
+        _session.update(id=data['icSessionId'], server_url=data['serverUrl'],
+                        expires=time.monotonic() + SESSION_TTL)
+        return _session['id'], _session['server_url']
+
+
+def invalidate_session():
+    with _lock:
+        _session.update(id=None, server_url=None, expires=0.0)
+
+
+def idmc_get(path, params=None):
+    """serverUrl 기준 GET. 401이면 한 번 재로그인 후 재시도."""
+    for attempt in range(2):
+        sid, server_url = login(force=attempt > 0)
+        resp = _get_http().get(f"{server_url}{path}", headers={"icSessionId": sid},
+                               params=params, timeout=REQUEST_TIMEOUT)
+        if resp.status_code == 401 and attempt == 0:
+            invalidate_session()
+            continue
+        resp.raise_for_status()
+        with _lock:
+            # 사용할 때마다 유휴 만료 시각 연장
+            _session['expires'] = time.monotonic() + SESSION_TTL
+        return resp.json()
+
+
+def get_activity_log(row_limit=None, offset=None):
+    """activityLog 조회 (rowLimit/offset 페이지네이션)"""
+    params = {}
+    if row_limit is not None:
+        params['rowLimit'] = row_limit
+    if offset is not None:
+        params['offset'] = offset
+    return idmc_get('/api/v2/activity/activityLog', params or None)
@@ -0,0 +1,125 @@
+# utils/idmc_stub.py - 로컬 IDMC API 스텁 서버 (테스트/오프라인 데모용)
+#
+# 로그인(/ma/api/v2/user/login)과 activityLog(rowLimit/offset 페이지네이션)만 흉내냅니다.
+#   with IDMCStub(logs) as stub:
+#       os.environ['IDMC_LOGIN_URL'] = stub.url
+#       fetch_and_save_logs()
+
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+STUB_SESSION_ID = 'stub-session'
+
+
+def make_logs(count, object_name='m_ORDERS_SYNC', start=None, every_minutes=15, rows=5000):
+    """activityLog 형태의 가짜 실행 로그 count건 (최신순)"""
+    start = start or datetime(2026, 1, 1, tzinfo=timezone.utc)
+    logs = []
+    for i in range(count):
+        begin = start + timedelta(minutes=every_minutes * i)
+        logs.append({
+            'runId': str(i + 1), 'objectName': object_name, 'state': 1,
+            'successSourceRows': rows, 'successTargetRows': rows,
+            'startTime': begin.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'endTime': (begin + timedelta(seconds=30)).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+        })
+    return sorted(logs, key=lambda l: l['startTime'], reverse=True)
+
+
+class IDMCStub:
+    """백그라운드 스레드에서 도는 IDMC API 스텁"""
+
+    def __init__(self, logs=None, host='127.0.0.1', port=0):
+        self.logs = sorted(logs or [], key=lambda l: l['startTime'], reverse=True)
+        self.requests = []          # (method, path, params) 호출 기록
+        self.logins = 0
+        self.fail_next = []         # 다음 요청에 돌려줄 HTTP 상태코드 (401/503 등 재시도 검증용)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_logs(self, logs):
+        self.logs = sorted(self.logs + list(logs), key=lambda l: l['startTime'], reverse=True)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _maybe_fail(self):
+                if stub.fail_next:
+                    self._send(stub.fail_next.pop(0), {'error': 'stub failure'})
+                    return True
+                return False
+
+            def do_POST(self):
+                parsed = urlparse(self.path)
+                stub.requests.append(('POST', parsed.path, {}))
+                length = int(self.headers.get('Content-Length') or 0)
+                self.rfile.read(length)
+                if self._maybe_fail():
+                    return
+                if parsed.path == '/ma/api/v2/user/login':
+                    stub.logins += 1
+                    self._send(200, {'icSessionId': STUB_SESSION_ID, 'serverUrl': stub.url})
+                else:
+                    self._send(404, {'error': 'not found'})
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                stub.requests.append(('GET', parsed.path, params))
+                if self._maybe_fail():
+                    return
+                if self.headers.get('icSessionId') != STUB_SESSION_ID:
+                    self._send(401, {'error': 'invalid session'})
+                    return
+                if parsed.path == '/api/v2/activity/activityLog':
+                    offset = int(params.get('offset', 0))
+                    limit = int(params.get('rowLimit', len(stub.logs) or 1))
+                    self._send(200, stub.logs[offset:offset + limit])
+                else:
+                    self._send(404, {'error': 'not found'})
+
+        return Handler
+
+
+if __name__ == '__main__':
+    stub = IDMCStub(make_logs(500)).start()
+    print(f"🧪 IDMC 스텁 실행 중: IDMC_LOGIN_URL={stub.url}  (Ctrl+C로 종료)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,275 @@
+# utils/migrations.py - guardian.db 스키마 버전 관리 (PRAGMA user_version)
+
+# 각 항목이 하나의 버전. 이미 적용된 버전은 다시 실행하지 않습니다.
+# 새 스키마 변경은 항상 맨 뒤에 추가하세요 (기존 항목 수정 금지).
+MIGRATIONS = [
+    # 1: 기본 이력 테이블
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS task_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_name TEXT NOT NULL,
+            run_date TEXT NOT NULL,
+            day_of_week INTEGER NOT NULL,
+            rows_processed INTEGER NOT NULL,
+            created_at TEXT DEFAULT (datetime('now','localtime'))
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS quality_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_date TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            total_rows INTEGER,
+            null_count INTEGER,
+            null_pct REAL,
+            created_at TEXT DEFAULT (datetime('now','localtime'))
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS idmc_logs (
+            run_id TEXT,
+            object_name TEXT,
+            status TEXT,
+            source_rows INTEGER,
+            target_rows INTEGER,
+            start_time TEXT,
+            end_time TEXT,
+            PRIMARY KEY (run_id, start_time)
+        )
+        ''',
+    ],
+    # 2: 조회 패턴별 커버링 인덱스
+    [
+        # load_volume_history: WHERE task_name = ? ORDER BY run_date
+        '''CREATE INDEX IF NOT EXISTS idx_task_history_task_date
+           ON task_history (task_name, run_date, day_of_week, rows_processed)''',
+        # check_quality 기준선: WHERE column_name = ? ORDER BY run_date DESC
+        '''CREATE INDEX IF NOT EXISTS idx_quality_history_col_date
+           ON quality_history (column_name, run_date, null_pct)''',
+        # load_quality_history / fetch_quality_history: ORDER BY run_date
+        '''CREATE INDEX IF NOT EXISTS idx_quality_history_date
+           ON quality_history (run_date)''',
+        # fetch_idmc_logs: ORDER BY start_time DESC LIMIT 10
+        '''CREATE INDEX IF NOT EXISTS idx_idmc_logs_start
+           ON idmc_logs (start_time)''',
+    ],
+    # 3: 증분 프로파일 상태 (utils/profiler.py)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS profile_partitions (
+            table_name TEXT NOT NULL,
+            partition_key TEXT NOT NULL,
+            profile TEXT NOT NULL,
+            updated_at TEXT DEFAULT (datetime('now','localtime')),
+            PRIMARY KEY (table_name, partition_key)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS profile_watermark (
+            table_name TEXT PRIMARY KEY,
+            columns TEXT NOT NULL,
+            last_sync TEXT,
+            updated_at TEXT DEFAULT (datetime('now','localtime'))
+        )
+        ''',
+    ],
+    # 4: Agent 답변 캐시 (utils/agent_cache.py)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS agent_cache (
+            cache_key TEXT PRIMARY KEY,
+            question_norm TEXT NOT NULL,
+            watermark TEXT NOT NULL,
+            plan TEXT,
+            tool_results TEXT,
+            result TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_hit REAL NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''CREATE INDEX IF NOT EXISTS idx_agent_cache_question
+           ON agent_cache (question_norm, watermark)''',
+        '''CREATE INDEX IF NOT EXISTS idx_agent_cache_last_hit
+           ON agent_cache (last_hit)''',
+    ],
+    # 5: 일일 스냅샷 (snapshot.py가 쓰고 페이지가 읽음)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS daily_snapshot (
+            task_name TEXT NOT NULL,
+            run_date TEXT NOT NULL,
+            today_rows INTEGER,
+            severity TEXT,
+            quality_anomalies INTEGER,
+            volume TEXT NOT NULL,
+            quality TEXT NOT NULL,
+            created_at TEXT DEFAULT (datetime('now','localtime')),
+            PRIMARY KEY (task_name, run_date)
+        )
+        ''',
+    ],
+    # 6: 파이프라인 작업 실행 이력 (utils/pipeline.py - 재시도/누락 실행 보충 기준)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS job_runs (
+            task_name TEXT NOT NULL,
+            run_date TEXT NOT NULL,
+            job TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            started_at TEXT,
+            finished_at TEXT,
+            PRIMARY KEY (task_name, run_date, job)
+        )
+        ''',
+    ],
+    # 7: 볼륨 누적 통계 (utils/volume_stats.py - Welford 평균/M2 + EWMA, 실행마다 1회 갱신)
+    #    segment: daily는 요일(0~6)과 전체(-1), run은 시간대 슬롯
+    #    prev_*: last_key 반영 직전 상태 (같은 날 재실행 시 덮어쓰기 / 당일 판정 기준)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS volume_stats (
+            task_name TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            segment INTEGER NOT NULL,
+            n INTEGER NOT NULL DEFAULT 0,
+            mean REAL,
+            m2 REAL,
+            ewma_mean REAL,
+            ewma_var REAL,
+            last_key TEXT,
+            prev_n INTEGER NOT NULL DEFAULT 0,
+            prev_mean REAL,
+            prev_m2 REAL,
+            prev_ewma_mean REAL,
+            prev_ewma_var REAL,
+            updated_at TEXT DEFAULT (datetime('now','localtime')),
+            PRIMARY KEY (task_name, metric, segment)
+        )
+        ''',
+    ],
+    # 8: 실행(run) 단위 모니터링 (utils/run_monitor.py)
+    [
+        # 완료 시각 워터마크 이후 실행만 읽음: WHERE end_time > ? ORDER BY end_time
+        '''CREATE INDEX IF NOT EXISTS idx_idmc_logs_end
+           ON idmc_logs (end_time)''',
+        '''
+        CREATE TABLE IF NOT EXISTS run_watermark (
+            monitor TEXT PRIMARY KEY,
+            end_time TEXT NOT NULL,
+            updated_at TEXT DEFAULT (datetime('now','localtime'))
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS run_alerts (
+            run_id TEXT NOT NULL,
+            start_time TEXT NOT NULL,
+            task_name TEXT NOT NULL,
+            end_time TEXT,
+            slot INTEGER,
+            source_rows INTEGER,
+            target_rows INTEGER,
+            expected REAL,
+            scale REAL,
+            score REAL,
+            severity TEXT,
+            reason TEXT,
+            created_at TEXT DEFAULT (datetime('now','localtime')),
+            PRIMARY KEY (run_id, start_time)
+        )
+        ''',
+        '''CREATE INDEX IF NOT EXISTS idx_run_alerts_end
+           ON run_alerts (end_time)''',
+    ],
+    # 9: Oracle 일별 적재 완료 표시 (daily_data_loader.py — 중간 커밋 후 중단된 날짜 이어서 적재)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS load_runs (
+            run_date TEXT PRIMARY KEY,
+            planned INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            rows_loaded INTEGER,
+            updated_at TEXT DEFAULT (datetime('now','localtime'))
+        )
+        ''',
+    ],
+    # 10: 증분 프로파일 워터마크 키 (sync_timestamp가 같은 행은 order_id로 이어서 읽음, utils/profiler.py)
+    #     타입 없이 추가해 MySQL 키 값(정수)을 그대로 보관
+    [
+        "ALTER TABLE profile_watermark ADD COLUMN last_key",
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# MySQL 분석 DB 인덱스 (테이블은 IDMC가 관리하므로 guardian.db처럼 자동 적용하지 않고
+# `python utils/migrations.py --mysql`로 명시적으로 적용). (테이블, 인덱스, 컬럼)
+MYSQL_INDEXES = [
+    # agent_cache.data_watermark MAX(sync_timestamp) / profiler 증분 프로파일 (sync_timestamp, order_id) 워터마크
+    ('orders_analytics', 'idx_orders_analytics_sync', 'sync_timestamp, order_id'),
+]
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """미적용 마이그레이션을 순서대로 적용하고 WAL 모드를 켭니다. 적용 후 버전을 반환."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    version = current_version(conn)
+    for v, statements in enumerate(MIGRATIONS, start=1):
+        if v <= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 다른 프로세스가 먼저 적용했으면 건너뜀
+            if current_version(conn) >= v:
+                conn.rollback()
+                continue
+            for sql in statements:
+                conn.execute(sql)
+            conn.execute(f"PRAGMA user_version = {v}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return current_version(conn)
+
+
+def migrate_mysql(conn, indexes=MYSQL_INDEXES):
+    """없는 MySQL 인덱스만 생성 (information_schema로 확인). 만든 인덱스 이름 목록 반환"""
+    cur = conn.cursor()
+    created = []
+    try:
+        for table, name, columns in indexes:
+            cur.execute("""
+                SELECT COUNT(*) FROM information_schema.statistics
+                WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+            """, (table, name))
+            if cur.fetchone()[0]:
+                continue
+            cur.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+            created.append(name)
+    finally:
+        cur.close()
+    return created
+
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from utils.db import get_sqlite, get_mysql
+    with get_sqlite() as conn:
+        print(f"✅ guardian.db 스키마 버전: {current_version(conn)} / {SCHEMA_VERSION}")
+    if '--mysql' in sys.argv[1:]:
+        conn = get_mysql()
+        try:
+            created = migrate_mysql(conn)
+        finally:
+            conn.close()
+        print(f"✅ MySQL 인덱스: {', '.join(created) if created else '추가할 인덱스 없음'}")
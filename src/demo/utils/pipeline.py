@@ -0,0 +1,192 @@
+# utils/pipeline.py - 의존 관계가 있는 작업(DAG) 실행기 (asyncio + job_runs 이력)
+#
+#   jobs = [Job('load', load), Job('wait_idmc', wait, deps=['load']), ...]
+#   asyncio.run(run_chains({'m_ORDERS_SYNC': jobs}, date.today()))
+#
+# - 선행 작업이 모두 성공하면 바로 시작하므로 서로 독립인 작업은 동시에 돕니다.
+# - 작업마다 타임아웃/재시도, 결과는 job_runs에 저장됩니다.
+# - 같은 (태스크, 날짜)를 다시 돌리면 이미 성공한 작업은 저장된 결과를 재사용하고 건너뜁니다
+#   (중단/누락된 실행을 실패 지점부터 이어서 보충).
+
+import os
+import json
+import asyncio
+import inspect
+import traceback
+from datetime import datetime, timezone
+from utils.db import get_sqlite
+from utils.detector import DecimalEncoder
+
+JOB_TIMEOUT = float(os.getenv('PIPELINE_JOB_TIMEOUT', 600))
+JOB_RETRIES = int(os.getenv('PIPELINE_JOB_RETRIES', 2))
+RETRY_DELAY = float(os.getenv('PIPELINE_RETRY_DELAY', 30))
+
+
+class Job:
+    """파이프라인 작업 1개. fn(ctx)는 일반 함수(스레드에서 실행) 또는 코루틴 함수.
+
+    ctx는 {'task_name', 'run_date', <선행 작업 이름>: 결과, ...} 이며 반환값은 JSON 직렬화 가능해야 합니다.
+    """
+
+    def __init__(self, name, fn, deps=(), timeout=None, retries=None, retry_delay=None):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.timeout = JOB_TIMEOUT if timeout is None else timeout
+        self.retries = JOB_RETRIES if retries is None else retries
+        self.retry_delay = RETRY_DELAY if retry_delay is None else retry_delay
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def load_job_runs(task_name, run_date):
+    """{job: {'status', 'attempts', 'result', 'error', 'started_at', 'finished_at'}}"""
+    with get_sqlite() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT job, status, attempts, result, error, started_at, finished_at
+            FROM job_runs WHERE task_name = ? AND run_date = ?
+        """, (task_name, str(run_date)))
+        runs = {
+            job: {'status': status, 'attempts': attempts, 'result': json.loads(result) if result else None,
+                  'error': error, 'started_at': started, 'finished_at': finished}
+            for job, status, attempts, result, error, started, finished in cur.fetchall()
+        }
+    return runs
+
+
+def record_job(task_name, run_date, job, status, attempts, result=None, error=None, started_at=None):
+    with get_sqlite() as conn:
+        conn.execute("""
+            INSERT INTO job_runs (task_name, run_date, job, status, attempts, result, error, started_at, finished_at)
+            VALUES (?,?,?,?,?,?,?,?,?)
+            ON CONFLICT(task_name, run_date, job) DO UPDATE SET
+                status = excluded.status, attempts = excluded.attempts, result = excluded.result,
+                error = excluded.error, started_at = COALESCE(excluded.started_at, job_runs.started_at),
+                finished_at = excluded.finished_at
+        """, (task_name, str(run_date), job, status, attempts,
+              None if result is None else json.dumps(result, ensure_ascii=False, cls=DecimalEncoder, default=str),
+              error, started_at, None if status == 'running' else _now()))
+        conn.commit()
+
+
+# 타임아웃으로 포기했지만 스레드는 아직 도는 동기 작업 {(태스크, 날짜, 작업): future}
+# 스레드는 중간에 멈출 수 없으므로 끝날 때까지 같은 작업을 다시 시작하지 않음 (재시도가 겹쳐 중복 적재 방지)
+_alive = {}
+
+
+def _release(key):
+    def done(fut):
+        if _alive.get(key) is fut:
+            del _alive[key]
+        if not fut.cancelled():
+            fut.exception()          # 버려진 시도의 예외는 이미 실패로 처리됨 (미회수 경고 방지)
+    return done
+
+
+async def _call(job, ctx):
+    if inspect.iscoroutinefunction(job.fn):
+        return await asyncio.wait_for(job.fn(ctx), timeout=job.timeout)
+    # 동기 함수는 스레드에서. 타임아웃이 나도 스레드는 끝까지 돌므로 _alive에 남겨 재시도를 막음
+    key = (ctx['task_name'], str(ctx['run_date']), job.name)
+    fut = asyncio.get_running_loop().run_in_executor(None, job.fn, ctx)
+    _alive[key] = fut
+    fut.add_done_callback(_release(key))
+    return await asyncio.wait_for(asyncio.shield(fut), timeout=job.timeout)
+
+
+async def _run_job(job, ctx, previous):
+    task_name, run_date = ctx['task_name'], ctx['run_date']
+    key = (task_name, str(run_date), job.name)
+    attempts = (previous or {}).get('attempts', 0)
+    started = _now()
+    last_error = None
+    for attempt in range(job.retries + 1):
+        busy = _alive.get(key)
+        if busy is not None and not busy.done():
+            last_error = (last_error or '') + "\n이전 시도가 아직 실행 중이라 다시 시작하지 않음"
+            print(f"  ⏳ [{task_name}] {job.name}: 이전 시도가 아직 실행 중 — 재시도 생략")
+            break
+        attempts += 1
+        record_job(task_name, run_date, job.name, 'running', attempts, started_at=started)
+        try:
+            result = await _call(job, ctx)
+            record_job(task_name, run_date, job.name, 'success', attempts, result=result)
+            print(f"  ✅ [{task_name}] {job.name} 완료")
+            return 'success', result
+        except asyncio.TimeoutError:
+            last_error = f"TIMEOUT ({job.timeout:g}초 초과)"
+        except Exception as e:
+            last_error = f"{e}\n{traceback.format_exc(limit=3)}"
+        print(f"  ⚠️ [{task_name}] {job.name} 실패 ({attempt + 1}/{job.retries + 1}): {last_error.splitlines()[0]}")
+        if attempt < job.retries:
+            await asyncio.sleep(job.retry_delay)
+
+    record_job(task_name, run_date, job.name, 'failed', attempts, error=last_error.strip())
+    return 'failed', None
+
+
+async def run_chain(task_name, run_date, jobs):
+    """태스크 1개의 작업 DAG 실행. {job: 'success'|'failed'|'skipped'} 반환"""
+    names = {job.name for job in jobs}
+    for job in jobs:
+        missing = [d for d in job.deps if d not in names]
+        if missing:
+            raise ValueError(f"{task_name}.{job.name}: 알 수 없는 선행 작업 {missing}")
+
+    previous = load_job_runs(task_name, run_date)
+    ctx = {'task_name': task_name, 'run_date': run_date}
+    futures = {}
+    statuses = {}
+
+    async def run_one(job):
+        # 선행 작업 완료 대기 (하나라도 실패/건너뜀이면 이 작업도 건너뜀)
+        upstream = [await futures[d] for d in job.deps]
+        if any(status != 'success' for status in upstream):
+            record_job(task_name, run_date, job.name, 'skipped', (previous.get(job.name) or {}).get('attempts', 0),
+                       error='선행 작업 실패')
+            statuses[job.name] = 'skipped'
+            return 'skipped'
+        done = previous.get(job.name)
+        if done and done['status'] == 'success':
+            ctx[job.name] = done['result']
+            statuses[job.name] = 'success'
+            return 'success'
+        status, result = await _run_job(job, ctx, done)
+        ctx[job.name] = result
+        statuses[job.name] = status
+        return status
+
+    # 의존 순서대로 만들되 실행은 모두 동시에 (각자 선행 작업만 기다림)
+    pending = list(jobs)
+    while pending:
+        ready = [job for job in pending if all(d in futures for d in job.deps)]
+        if not ready:
+            raise ValueError(f"{task_name}: 작업 의존 관계에 순환이 있습니다")
+        for job in ready:
+            futures[job.name] = asyncio.ensure_future(run_one(job))
+            pending.remove(job)
+
+    await asyncio.gather(*futures.values())
+    return {job.name: statuses[job.name] for job in jobs}
+
+
+async def run_chains(chains, run_date):
+    """여러 태스크의 DAG를 병렬 실행. chains: {task_name: [Job, ...]} → {task_name: {job: status}}"""
+    results = await asyncio.gather(*(run_chain(task, run_date, jobs) for task, jobs in chains.items()),
+                                   return_exceptions=True)
+    out = {}
+    for task, result in zip(chains, results):
+        if isinstance(result, Exception):
+            print(f"🚨 [{task}] 파이프라인 오류: {result}")
+            out[task] = {'error': str(result)}
+        else:
+            out[task] = result
+    return out
+
+
+def is_complete(task_name, run_date, jobs):
+    runs = load_job_runs(task_name, run_date)
+    return all((runs.get(job.name) or {}).get('status') == 'success' for job in jobs)
@@ -0,0 +1,308 @@
+# utils/profiler.py - 단일 스캔 컬럼 프로파일러
+
+import os
+import re
+import json
+from utils.db import get_sqlite, get_mysql
+
+# 검사 대상 테이블/컬럼 (환경변수로 변경 가능)
+PROFILE_TABLE = os.getenv('GUARDIAN_PROFILE_TABLE', 'orders_analytics')
+QUALITY_COLUMNS = [c.strip() for c in os.getenv(
+    'GUARDIAN_QUALITY_COLUMNS',
+    'phone_number,email,customer_name,total_amount,product_code,category'
+).split(',') if c.strip()]
+AMOUNT_COLUMN = os.getenv('GUARDIAN_AMOUNT_COLUMN', 'total_amount')
+CATEGORY_COLUMN = os.getenv('GUARDIAN_CATEGORY_COLUMN', 'category')
+
+_IDENT = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _ident(name):
+    """SQL에 직접 들어가는 식별자 검증"""
+    if not _IDENT.match(name or ''):
+        raise ValueError(f"허용되지 않는 컬럼/테이블명: {name!r}")
+    return name
+
+
+def build_profile_sql(columns=None, table=None, amount_col=None, category_col=None,
+                      group_cols=(), where=None):
+    """NULL/공백, 0원, 금액 통계, 카테고리 분포를 한 번에 집계하는 SQL 생성
+
+    카테고리 단위로 부분 집계를 만들고, 합치는 것은 merge_profiles가 담당합니다.
+    """
+    columns = columns or QUALITY_COLUMNS
+    table = _ident(table or PROFILE_TABLE)
+    amount_col = _ident(amount_col or AMOUNT_COLUMN)
+    category_col = _ident(category_col or CATEGORY_COLUMN)
+    groups = [_ident(g) for g in group_cols]
+
+    select = [f"{g} AS g_{g}" for g in groups]
+    select.append(f"{category_col} AS grp")
+    select.append("COUNT(*) AS total_rows")
+    for i, col in enumerate(columns):
+        col = _ident(col)
+        select.append(f"SUM(CASE WHEN {col} IS NULL OR {col} = '' THEN 1 ELSE 0 END) AS n_{i}")
+    select += [
+        f"SUM(CASE WHEN {amount_col} = 0 THEN 1 ELSE 0 END) AS amt_zero",
+        f"COUNT({amount_col}) AS amt_count",
+        f"SUM({amount_col}) AS amt_sum",
+        f"MIN({amount_col}) AS amt_min",
+        f"MAX({amount_col}) AS amt_max",
+    ]
+    sql = f"SELECT {', '.join(select)} FROM {table}"
+    if where:
+        sql += f" WHERE {where}"
+    sql += f" GROUP BY {', '.join(groups + [category_col])}"
+    return sql
+
+
+def empty_profile(columns=None):
+    """빈 부분 집계"""
+    return {
+        'total_rows': 0,
+        'nulls': {col: 0 for col in (columns or QUALITY_COLUMNS)},
+        'amount': {'count': 0, 'sum': 0.0, 'min': None, 'max': None, 'zero': 0},
+        'categories': {},
+    }
+
+
+def _row_profile(row, columns):
+    """집계 결과 한 행 → 부분 집계"""
+    return {
+        'total_rows': int(row['total_rows'] or 0),
+        'nulls': {col: int(row[f'n_{i}'] or 0) for i, col in enumerate(columns)},
+        'amount': {
+            'count': int(row['amt_count'] or 0),
+            'sum': float(row['amt_sum'] or 0),
+            'min': float(row['amt_min']) if row['amt_min'] is not None else None,
+            'max': float(row['amt_max']) if row['amt_max'] is not None else None,
+            'zero': int(row['amt_zero'] or 0),
+        },
+        'categories': {str(row['grp']): int(row['total_rows'] or 0)},
+    }
+
+
+def merge_profiles(a, b):
+    """부분 집계 두 개를 합침 (건수/합계는 더하고, 최소/최대는 비교)"""
+    def pick(x, y, fn):
+        if x is None: return y
+        if y is None: return x
+        return fn(x, y)
+
+    cats = dict(a['categories'])
+    for k, v in b['categories'].items():
+        cats[k] = cats.get(k, 0) + v
+    nulls = dict(a['nulls'])
+    for k, v in b['nulls'].items():
+        nulls[k] = nulls.get(k, 0) + v
+    aa, ba = a['amount'], b['amount']
+    return {
+        'total_rows': a['total_rows'] + b['total_rows'],
+        'nulls': nulls,
+        'amount': {
+            'count': aa['count'] + ba['count'],
+            'sum': aa['sum'] + ba['sum'],
+            'min': pick(aa['min'], ba['min'], min),
+            'max': pick(aa['max'], ba['max'], max),
+            'zero': aa['zero'] + ba['zero'],
+        },
+        'categories': cats,
+    }
+
+
+def profile_table(conn, columns=None, where=None, params=()):
+    """orders_analytics 전체를 1회 스캔하여 부분 집계 반환"""
+    columns = columns or QUALITY_COLUMNS
+    cur = conn.cursor(dictionary=True)
+    cur.execute(build_profile_sql(columns, where=where), params)
+    profile = empty_profile(columns)
+    for row in cur.fetchall():
+        profile = merge_profiles(profile, _row_profile(row, columns))
+    cur.close()
+    return profile
+
+
+def summarize_profile(profile):
+    """부분 집계 → check_quality 결과 형태 (null_checks / amount_stats / categories)"""
+    total = profile['total_rows']
+    null_checks = {
+        col: {'null_count': n, 'null_pct': round(n / total * 100, 1) if total > 0 else 0}
+        for col, n in profile['nulls'].items()
+    }
+    amt = profile['amount']
+    zero_pct = round(amt['zero'] / total * 100, 1) if total > 0 else 0
+    amount_stats = {
+        'avg': amt['sum'] / amt['count'] if amt['count'] else 0.0,
+        'min': amt['min'] or 0.0,
+        'max': amt['max'] or 0.0,
+        'zero_pct': zero_pct,
+    }
+    cats = dict(sorted(profile['categories'].items(), key=lambda kv: kv[1], reverse=True))
+    return total, null_checks, amount_stats, cats
+
+
+# ============================================================
+# 증분 프로파일링 (sync_timestamp + 키 워터마크)
+# ============================================================
+# 워터마크는 (sync_timestamp, order_id) 쌍입니다. sync_timestamp만 쓰면 직전 실행 뒤에 같은 시각으로
+# 커밋된 행을 `>`로 건너뛰므로, 같은 시각은 키로 이어서 읽습니다 (키는 적재 순서대로 증가한다고 가정).
+# 재동기화로 sync_timestamp가 바뀐 행(UPDATE)은 새 구간에 다시 잡혀 두 번 세어지므로, 이번에 들어온
+# 파티션은 실제 건수와 맞춰 보고 다르면 그 파티션만 다시 계산합니다.
+# sync_timestamp를 바꾸지 않는 UPDATE / DELETE는 감지하지 못하므로 reset_profile_state()로 초기화하세요.
+SYNC_COLUMN = os.getenv('GUARDIAN_SYNC_COLUMN', 'sync_timestamp')
+KEY_COLUMN = os.getenv('GUARDIAN_KEY_COLUMN', 'order_id')
+PARTITION_COLUMN = os.getenv('GUARDIAN_PARTITION_COLUMN', 'order_date')
+
+
+def reset_profile_state(table=None):
+    """증분 상태 초기화 (DELETE 등으로 과거 행이 바뀐 경우 다음 실행에서 전체 재계산)"""
+    table = table or PROFILE_TABLE
+    with get_sqlite() as conn_sq:
+        conn_sq.execute("DELETE FROM profile_partitions WHERE table_name = ?", (table,))
+        conn_sq.execute("DELETE FROM profile_watermark WHERE table_name = ?", (table,))
+        conn_sq.commit()
+
+
+def _scan_partitions(conn, columns, part_col, where, params):
+    """조건에 맞는 행의 파티션별 부분 집계 {파티션 키: 부분 집계}"""
+    cur = conn.cursor(dictionary=True)
+    cur.execute(build_profile_sql(columns, group_cols=(part_col,), where=where), params)
+    parts = {}
+    for row in cur.fetchall():
+        key = str(row[f'g_{part_col}'])
+        parts[key] = merge_profiles(parts.get(key, empty_profile(columns)), _row_profile(row, columns))
+    cur.close()
+    return parts
+
+
+def _load_partition(cur_sq, table, key):
+    cur_sq.execute("SELECT profile FROM profile_partitions WHERE table_name = ? AND partition_key = ?",
+                   (table, key))
+    row = cur_sq.fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def _save_partition(cur_sq, table, key, part):
+    cur_sq.execute('''
+        INSERT INTO profile_partitions (table_name, partition_key, profile) VALUES (?,?,?)
+        ON CONFLICT(table_name, partition_key)
+        DO UPDATE SET profile = excluded.profile, updated_at = datetime('now','localtime')
+    ''', (table, key, json.dumps(part, ensure_ascii=False)))
+
+
+def _watermark_range(sync_col, key_col, last, high):
+    """(sync_timestamp, order_id) 워터마크 구간 조건. 행 생성자 비교 대신 OR로 풀어 인덱스 범위 스캔이 되도록
+
+    last가 None이면 high 이하 전체(sync_timestamp 없는 행 포함), 아니면 last 초과 ~ high 이하입니다.
+    """
+    upper = f"{sync_col} <= %s AND ({sync_col} < %s OR {key_col} <= %s)"
+    upper_params = (high[0], high[0], high[1]) if high else ()
+    if last is None:
+        if high is None:
+            return f"{sync_col} IS NULL", ()
+        return f"({sync_col} IS NULL OR ({upper}))", upper_params
+    lower = f"{sync_col} >= %s AND ({sync_col} > %s OR {key_col} > %s)"
+    return f"{lower} AND {upper}", (last[0], last[0], last[1]) + upper_params
+
+
+def _recount_partitions(conn, columns, part_col, parts, settled, params):
+    """파티션 건수가 실제와 다르면 그 파티션만 처음부터 다시 집계 (parts를 고쳐 씀). 재계산한 파티션 목록 반환
+
+    다시 집계했는데 행이 없는 파티션은 parts에서 None이 됩니다.
+    """
+    keys = sorted(parts)
+    marks = ', '.join(['%s'] * len(keys))
+    cur = conn.cursor()
+    cur.execute(f"SELECT {part_col}, COUNT(*) FROM {_ident(PROFILE_TABLE)} "
+                f"WHERE {part_col} IN ({marks}) AND {settled} GROUP BY {part_col}", tuple(keys) + params)
+    actual = {str(k): n for k, n in cur.fetchall()}
+    cur.close()
+    stale = [k for k in keys if parts[k]['total_rows'] != actual.get(k, 0)]
+    if not stale:
+        return stale
+
+    marks = ', '.join(['%s'] * len(stale))
+    fresh = _scan_partitions(conn, columns, part_col, f"{part_col} IN ({marks}) AND {settled}",
+                             tuple(stale) + params)
+    for key in stale:
+        parts[key] = fresh.get(key)
+    return stale
+
+
+def incremental_profile(columns=None, rebuild=False):
+    """워터마크 이후 신규 행만 스캔하여 파티션(order_date)별 부분 집계에 합침
+
+    부분 집계는 guardian.db에 보관되며, 반환값은 전체 파티션을 합친 결과입니다.
+    MySQL 스캔이 끝난 뒤 짧은 트랜잭션으로 저장하고, 그 사이 다른 실행이 워터마크를 옮겼으면 저장하지 않습니다.
+    반환값의 'recounted'는 재동기화로 건수가 달라져 다시 계산한 파티션 목록입니다.
+    """
+    columns = columns or QUALITY_COLUMNS
+    table = PROFILE_TABLE
+    sync_col = _ident(SYNC_COLUMN)
+    key_col = _ident(KEY_COLUMN)
+    part_col = _ident(PARTITION_COLUMN)
+    signature = ','.join(columns)
+
+    with get_sqlite() as conn_sq:
+        cur_sq = conn_sq.cursor()
+        cur_sq.execute("SELECT columns, last_sync, last_key FROM profile_watermark WHERE table_name = ?", (table,))
+        state = cur_sq.fetchone()
+    # 키 없이 시각만 남은 이전 상태는 경계 행이 겹칠 수 있으므로 한 번 전체 재계산
+    full = rebuild or state is None or state[0] != signature or (state[1] is not None and state[2] is None)
+    last = None if full or state[1] is None else (state[1], state[2])
+
+    conn = get_mysql()
+    try:
+        cur = conn.cursor()
+        # (sync_timestamp, order_id) 인덱스 역순 1건 (utils/migrations.py MYSQL_INDEXES)
+        cur.execute(f"SELECT {sync_col}, {key_col} FROM {_ident(table)} WHERE {sync_col} IS NOT NULL "
+                    f"ORDER BY {sync_col} DESC, {key_col} DESC LIMIT 1")
+        row = cur.fetchone()
+        cur.close()
+        high = (str(row[0]), row[1]) if row else None
+
+        parts, stale = {}, []
+        if full or (high is not None and high != last):
+            where, params = _watermark_range(sync_col, key_col, last, high)
+            parts = _scan_partitions(conn, columns, part_col, where, params)
+            if not full and parts:
+                with get_sqlite() as conn_sq:
+                    cur_sq = conn_sq.cursor()
+                    for key, part in parts.items():
+                        saved = _load_partition(cur_sq, table, key)
+                        parts[key] = merge_profiles(saved, part) if saved else part
+                # 재동기화(UPDATE)로 다시 들어온 행이 있으면 파티션 건수가 실제보다 많아짐
+                settled, params = _watermark_range(sync_col, key_col, None, high)
+                stale = _recount_partitions(conn, columns, part_col, parts, settled, params)
+            last = high
+    finally:
+        conn.close()
+
+    with get_sqlite() as conn_sq:
+        cur_sq = conn_sq.cursor()
+        if not conn_sq.in_transaction:
+            cur_sq.execute("BEGIN IMMEDIATE")
+        cur_sq.execute("SELECT columns, last_sync, last_key FROM profile_watermark WHERE table_name = ?", (table,))
+        if cur_sq.fetchone() == state:
+            if full:
+                cur_sq.execute("DELETE FROM profile_partitions WHERE table_name = ?", (table,))
+            for key, part in parts.items():
+                if part is None:
+                    cur_sq.execute("DELETE FROM profile_partitions WHERE table_name = ? AND partition_key = ?",
+                                   (table, key))
+                else:
+                    _save_partition(cur_sq, table, key, part)
+            cur_sq.execute('''
+                INSERT INTO profile_watermark (table_name, columns, last_sync, last_key) VALUES (?,?,?,?)
+                ON CONFLICT(table_name)
+                DO UPDATE SET columns = excluded.columns, last_sync = excluded.last_sync, last_key = excluded.last_key,
+                              updated_at = datetime('now','localtime')
+            ''', (table, signature, *(last or (None, None))))
+        conn_sq.commit()
+
+        profile = empty_profile(columns)
+        cur_sq.execute("SELECT profile FROM profile_partitions WHERE table_name = ?", (table,))
+        for (raw,) in cur_sq.fetchall():
+            profile = merge_profiles(profile, json.loads(raw))
+    profile['recounted'] = stale
+    return profile
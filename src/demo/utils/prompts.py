@@ -0,0 +1,312 @@
+# utils/prompts.py - Agent 프롬프트 조립 (프롬프트 캐싱 + 토큰 예산 + 사용량 집계)
+#
+# 매 요청 바뀌지 않는 실제 테이블 정의(schema_ddl)와 도구 명세(TOOL_SPECS), 단계별 규칙을 한 블록으로
+# 합쳐 그 끝에만 cache_control을 둡니다 (브레이크포인트 1개). 캐시 최소 길이(MIN_CACHE_TOKENS)보다
+# 짧은 블록은 어차피 캐시되지 않으므로 cache_control 없이 보냅니다 (길이를 맞추려고 내용을 채우지 않음).
+# 오늘 날짜처럼 바뀌는 값은 고정 블록 뒤에 따로 붙입니다.
+
+import os
+import json
+import threading
+
+HISTORY_TURNS = int(os.getenv('AGENT_HISTORY_TURNS', 6))              # 계획 단계에 넘기는 이전 대화 수
+HISTORY_MSG_TOKENS = int(os.getenv('AGENT_HISTORY_MSG_TOKENS', 400))   # 이전 대화 1건 상한
+TOOL_RESULT_BUDGET = int(os.getenv('AGENT_TOOL_TOKEN_BUDGET', 6000))   # 분석 단계 도구 결과 전체 예산
+
+CACHE = {'type': 'ephemeral'}
+MIN_CACHE_TOKENS = 1024        # Sonnet/Opus 캐시 최소 프리픽스 길이 (이보다 짧으면 cache_control이 무시됨)
+
+# 프롬프트에 정의를 싣는 테이블 (DB, 테이블명)
+SCHEMA_TABLES = [('mysql', 'orders_analytics'), ('oracle', 'ORDERS')]
+
+# DB에 연결하지 못했을 때 쓰는 컬럼 목록 (기존 프롬프트와 같은 내용)
+FALLBACK_SCHEMA = """## MySQL 테이블: orders_analytics
+컬럼: order_id(INT), customer_id(INT), customer_name, phone_number, email, order_date(DATE), total_amount(DECIMAL), product_code, product_name, category, order_status, payment_method, sync_timestamp
+
+## Oracle 테이블: ORDERS
+컬럼: ORDER_ID(NUMBER), CUSTOMER_ID(NUMBER), CUSTOMER_NAME, PHONE_NUMBER, EMAIL, ORDER_DATE(DATE), TOTAL_AMOUNT(NUMBER), PRODUCT_CODE, PRODUCT_NAME, CATEGORY, ORDER_STATUS, PAYMENT_METHOD"""
+
+SQL_RULES = """## SQL 방언
+주의: Oracle은 컬럼명 대문자. 날짜 비교는 TRUNC(ORDER_DATE) = DATE 'YYYY-MM-DD' 형식 (아래 '오늘' 날짜 사용).
+주의: Oracle에서 CURDATE() 사용 금지. SYSDATE 또는 DATE 리터럴 사용. LIMIT 대신 FETCH FIRST n ROWS ONLY.
+주의: Oracle에서 빈 문자열('')은 NULL과 같음. 공백만 있는 값은 TRIM(col) IS NULL로 찾음.
+- MySQL 날짜 조건은 order_date = 'YYYY-MM-DD' 또는 order_date BETWEEN ... 형식, 오늘은 CURDATE()
+- 두 테이블의 order_id(ORDER_ID)는 같은 키"""
+
+TOOL_SPECS = """# 도구 명세
+- mysql: MySQL 분석 DB 조회 (orders_analytics 테이블). 입력: mysql_sqls
+- oracle: Oracle 소스 DB 조회 (ORDERS 테이블). 입력: oracle_sqls
+- idmc: IDMC ETL 로그 조회
+- quality_history: 품질 이력 조회 (최근 7일 NULL 비율)
+- diff: Oracle ORDERS ↔ MySQL orders_analytics 하루치 컬럼 단위 대조 (order_id로 맞춰 컬럼별 불일치 건수와 샘플 키).
+  NULL이 어디서 생겼는지(ETL 변환 / 외부 INSERT / 소스) 따질 때 SQL 대신 사용. "diff_date": "YYYY-MM-DD"(기본 오늘), "diff_columns": ["phone_number"](생략 시 전체)
+- slack: 알림 발송
+
+## 도구 결과 형식
+- idmc: [{"runId", "objectName", "status", "sourceRows", "targetRows", "startTime", "endTime"}] 최신 시작순.
+  status 1=성공, 2=실패(재시도 전). sourceRows는 Oracle에서 읽은 건수, targetRows는 MySQL에 쓴 건수
+- quality_history: [{"date", "column", "null_pct"}] 최근 7일 컬럼별 NULL 비율(%)
+- diff: {"scope", "source_rows", "target_rows", "matched_rows", "identical_rows",
+  "missing": {"count", "sample"}(소스에만 있는 키), "extra": {"count", "sample"}(타깃에만 있는 키),
+  "columns": {컬럼: {"mismatches", "null_in_target", "null_in_source", "value_changed", "null_in_extra", "sample_keys"}}}
+  columns에 없는 컬럼은 키가 맞는 모든 행에서 양쪽 값이 같음
+- SQL 결과: 행이 적으면 {"row_count", "rows"}, 많으면 {"row_count", "truncated", "columns", "sample"} 요약.
+  columns는 컬럼별 non_null / nulls / min / max / sum / avg / distinct / top_values
+- *_ERROR 로 시작하면 조회 실패 (COST_GUARD는 예상 검사 행 수가 한도를 넘어 실행하지 않은 것)"""
+
+PLAN_RULES = """# 계획 단계
+사용자의 질문을 분석하고 위 도구 중 어떤 것을 사용할지 계획하세요.
+
+## SQL 작성 원칙
+- 반드시 완결된 SQL을 작성할 것. "추가 분석 필요" 같은 미완성 답변 금지.
+- 비교가 필요하면 서브쿼리, JOIN, NOT IN 등 활용하여 하나의 SQL로 해결할 것
+
+## 대화 맥락
+- 이전 대화 내용을 반드시 참고할 것
+- "그거", "아까", "위에서 말한" 같은 표현은 이전 대화를 참조하는 것
+- 이전 답변에서 나온 수치나 결과를 기반으로 더 깊이 파고드는 SQL을 작성할 것
+
+
+## 중요: 비교 규칙
+- MySQL과 Oracle 건수를 비교할 때는 반드시 같은 조건으로 조회할 것
+- MySQL에서 WHERE 없이 전체 조회하면 Oracle도 WHERE 없이 전체 조회
+- MySQL에서 오늘만 조회하면 Oracle도 오늘만 조회
+- 날짜 조건이 다르면 건수 비교가 무의미함
+
+반드시 아래 JSON 형식으로만 응답:
+{"plan": "계획 설명", "tools": ["사용할 도구들"], "mysql_sqls": ["SQL1", "SQL2"], "oracle_sqls": ["SQL1", "SQL2"]}
+
+- mysql_sqls, oracle_sqls는 배열로 여러 개 가능
+- 복합 분석이 필요하면 SQL을 여러 개 나눠서 작성
+- 단순 질문이면 SQL 1개만 넣어도 됨
+- diff 도구를 쓰면 diff_date, diff_columns를 함께 넣을 수 있음"""
+
+
+ANALYZE_RULES = """# 분석 단계
+수집된 데이터를 바탕으로 종합 분석하세요.
+
+## 원인 추론 규칙
+- IDMC 로그에서 최종 실행이 성공(status:1)이고 sourceRows == targetRows면 → ETL 전송 자체는 정상
+- Oracle에도 NULL이 있고 MySQL에도 NULL이 있으면 → 소스 데이터 문제 (ETL은 정상적으로 전달한 것)
+- Oracle에는 NULL이 없는데 MySQL에만 NULL이 있으면 → 두 가지 가능성 모두 언급:
+  1) ETL 변환 과정에서 매핑/변환 오류로 NULL 발생
+  2) ETL 외부에서 직접 INSERT된 데이터 (MySQL 건수가 Oracle보다 많으면 이 가능성이 높음)
+- MySQL 건수 > Oracle 건수면 → 차이만큼 외부 주입 가능성 높음
+- MySQL 건수 == Oracle 건수인데 NULL 차이가 있으면 → ETL 변환 오류 가능성 높음
+- status:2(실패)는 최종 성공 전의 재시도이므로, 마지막 실행이 성공이면 ETL 전송은 정상으로 판단
+- 결과가 "...(생략)"으로 잘린 경우 보이는 범위 안에서만 판단할 것
+- 컬럼 대조 결과(diff)가 있으면 건수 비교보다 우선: columns.X.null_in_target > 0이면 ETL 변환 오류(샘플 키 제시),
+  null_in_extra > 0이면 소스에 없는 행(extra)의 NULL이므로 외부 INSERT, X가 없으면 양쪽 값이 같음(소스 문제)
+  단 missing.count + extra.count가 matched_rows 이상이면 행 자체가 어긋난 것이므로 소스 문제로 단정하지 말 것
+- SQL 결과가 {"row_count", "columns", "sample"} 형태면 전체 행이 아닌 요약임 (columns는 컬럼별 NULL 수/최소/최대/합계/상위 값, truncated=true면 상한에서 조회를 멈춘 것이므로 row_count를 전체 건수로 쓰지 말 것)
+
+반드시 아래 JSON으로 응답:
+{"answer": "사용자에게 보여줄 답변 (한국어, 간결하게)", "severity": "normal/warning/critical", "need_slack": true/false, "slack_message": "Slack에 보낼 메시지 (need_slack이 true일 때만)"}"""
+
+
+# ============================================================
+# 토큰 추정 / 자르기
+# ============================================================
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (영문/숫자/기호 약 4자당 1토큰, 한글 등은 글자당 1토큰)"""
+    text = text or ''
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def trim_to_tokens(text: str, budget: int) -> str:
+    """예산을 넘으면 앞부분만 남기고 잘린 사실을 표시. JSON 배열이면 항목 단위로 자름."""
+    text = text or ''
+    if estimate_tokens(text) <= budget:
+        return text
+    try:
+        rows = json.loads(text)
+    except (ValueError, TypeError):
+        rows = None
+    if isinstance(rows, list):
+        kept = []
+        for row in rows:
+            candidate = json.dumps(kept + [row], ensure_ascii=False, default=str)
+            if estimate_tokens(candidate) > budget - 20:
+                break
+            kept.append(row)
+        return json.dumps(kept, ensure_ascii=False, default=str) + f" ...(생략: 총 {len(rows)}건 중 {len(kept)}건)"
+
+    lo, hi = 0, len(text)
+    while lo < hi:                      # 예산 안에 들어가는 가장 긴 앞부분
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= budget - 20:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + f" ...(생략: {estimate_tokens(text) - estimate_tokens(text[:lo])}토큰)"
+
+
+def fit_results(results: dict, budget: int = TOOL_RESULT_BUDGET) -> dict:
+    """도구 결과들을 전체 예산 안으로. 작은 결과는 그대로 두고 남은 예산을 큰 결과끼리 나눔."""
+    sizes = {name: estimate_tokens(text) for name, text in results.items()}
+    fitted = {}
+    remaining, pending = budget, sorted(results, key=lambda n: sizes[n])
+    while pending:
+        share = remaining // len(pending)
+        name = pending.pop(0)
+        fitted[name] = results[name] if sizes[name] <= share else trim_to_tokens(results[name], share)
+        remaining -= min(sizes[name], share)
+    return {name: fitted[name] for name in results}
+
+
+# ============================================================
+# 테이블 정의 (실제 DB에서 프로세스당 1회 조회)
+# ============================================================
+_schema = {}
+_schema_lock = threading.Lock()
+
+
+def _oracle_type(data_type, length, precision, scale):
+    if data_type == 'NUMBER' and precision is not None:
+        return f"NUMBER({precision},{scale or 0})"
+    if data_type in ('VARCHAR2', 'NVARCHAR2', 'CHAR', 'NCHAR'):
+        return f"{data_type}({length})"
+    return data_type
+
+
+def table_ddl(dialect, table) -> str:
+    """information_schema / USER_TAB_COLUMNS로 CREATE TABLE + 인덱스 문 구성 (AUTO_INCREMENT 값 등 바뀌는 값 제외)"""
+    from utils.db import get_mysql, get_oracle
+    conn = get_mysql() if dialect == 'mysql' else get_oracle()
+    try:
+        cur = conn.cursor()
+        if dialect == 'mysql':
+            cur.execute("""
+                SELECT column_name, column_type, is_nullable FROM information_schema.columns
+                WHERE table_schema = DATABASE() AND table_name = %s ORDER BY ordinal_position
+            """, (table,))
+            columns = [f"{name} {ctype}{'' if nullable == 'YES' else ' NOT NULL'}"
+                       for name, ctype, nullable in cur.fetchall()]
+            cur.execute("""
+                SELECT index_name, GROUP_CONCAT(column_name ORDER BY seq_in_index) FROM information_schema.statistics
+                WHERE table_schema = DATABASE() AND table_name = %s GROUP BY index_name ORDER BY index_name
+            """, (table,))
+        else:
+            cur.execute("""
+                SELECT column_name, data_type, data_length, data_precision, data_scale, nullable
+                FROM user_tab_columns WHERE table_name = :1 ORDER BY column_id
+            """, (table,))
+            columns = [f"{name} {_oracle_type(dtype, length, precision, scale)}{'' if nullable == 'Y' else ' NOT NULL'}"
+                       for name, dtype, length, precision, scale, nullable in cur.fetchall()]
+            cur.execute("""
+                SELECT index_name, LISTAGG(column_name, ',') WITHIN GROUP (ORDER BY column_position)
+                FROM user_ind_columns WHERE table_name = :1 GROUP BY index_name ORDER BY index_name
+            """, (table,))
+        indexes = cur.fetchall()
+        cur.close()
+    finally:
+        conn.close()
+    if not columns:
+        raise LookupError(f"{dialect} 테이블 없음: {table}")
+    lines = [f"CREATE TABLE {table} (\n  " + ',\n  '.join(columns) + "\n);"]
+    lines += [f"CREATE INDEX {name} ON {table} ({cols});" for name, cols in indexes]
+    return '\n'.join(lines)
+
+
+def schema_ddl() -> str:
+    """SCHEMA_TABLES 정의 (첫 호출 때 조회 후 재사용 — 캐시 프리픽스가 요청마다 같도록). 조회 실패 시 FALLBACK_SCHEMA"""
+    with _schema_lock:
+        if 'ddl' not in _schema:
+            try:
+                parts = [f"-- {'MySQL 분석 DB (타깃)' if dialect == 'mysql' else 'Oracle 소스 DB'}\n{table_ddl(dialect, table)}"
+                         for dialect, table in SCHEMA_TABLES]
+                _schema['ddl'] = "# 테이블 정의\n" + '\n\n'.join(parts)
+            except Exception as e:
+                print(f"⚠️ 테이블 정의 조회 실패, 기본 컬럼 목록 사용: {e}")
+                _schema['ddl'] = FALLBACK_SCHEMA
+        return _schema['ddl']
+
+
+# ============================================================
+# 프롬프트 조립
+# ============================================================
+def cached_block(*parts) -> dict:
+    """고정 텍스트를 한 블록으로 합치고, 캐시 최소 길이를 넘으면 끝에 캐시 브레이크포인트"""
+    text = '\n\n'.join(parts)
+    if estimate_tokens(text) < MIN_CACHE_TOKENS:
+        return {'type': 'text', 'text': text}
+    return {'type': 'text', 'text': text, 'cache_control': CACHE}
+
+
+def plan_system(today) -> list:
+    return [
+        cached_block(schema_ddl(), SQL_RULES, TOOL_SPECS, PLAN_RULES),
+        {'type': 'text', 'text': f"오늘: {today}"},
+    ]
+
+
+def plan_messages(chat_history: list, user_message: str) -> list:
+    """이전 대화(건당 상한) + 현재 질문. 캐시는 시스템 블록에만 (대화는 매번 달라 캐시 적중이 드묾)"""
+    prior = list(chat_history or [])
+    if prior and prior[-1]['role'] == 'user' and prior[-1]['content'] == user_message:
+        prior.pop()                     # 페이지가 이미 넣어둔 현재 질문
+    prior = prior[-HISTORY_TURNS:]
+    while prior and prior[0]['role'] != 'user':
+        prior.pop(0)
+    messages = [{'role': msg['role'], 'content': trim_to_tokens(msg['content'], HISTORY_MSG_TOKENS)}
+                for msg in prior]
+    messages.append({'role': 'user', 'content': user_message})
+    return messages
+
+
+def analyze_system(today) -> list:
+    return [
+        cached_block(schema_ddl(), SQL_RULES, TOOL_SPECS, ANALYZE_RULES),
+        {'type': 'text', 'text': f"오늘: {today}"},
+    ]
+
+
+def analyze_context(state: dict, budget: int = TOOL_RESULT_BUDGET) -> str:
+    results = fit_results({
+        'mysql': state.get('mysql_result') or '조회 안 함',
+        'idmc': state.get('idmc_result') or '조회 안 함',
+        'oracle': state.get('oracle_result') or '조회 안 함',
+        'quality': state.get('quality_history_result') or '조회 안 함',
+        'diff': state.get('diff_result') or '조회 안 함',
+    }, budget)
+    return f"""사용자 질문: {state['user_message']}
+계획: {state['plan']}
+MySQL 결과: {results['mysql']}
+IDMC 로그: {results['idmc']}
+Oracle 결과: {results['oracle']}
+품질 이력: {results['quality']}
+컬럼 대조: {results['diff']}"""
+
+
+# ============================================================
+# 사용량 집계
+# ============================================================
+USAGE_FIELDS = ('input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens')
+
+
+def empty_usage() -> dict:
+    return {field: 0 for field in USAGE_FIELDS}
+
+
+def check_cache(usage, system) -> bool:
+    """캐시 블록을 보낸 호출이 캐시를 쓰거나 만들었는지 (캐시 블록을 보내지 않았으면 True)"""
+    if not any('cache_control' in block for block in system):
+        return True
+    get = (lambda f: usage.get(f)) if isinstance(usage, dict) else (lambda f: getattr(usage, f, None))
+    return bool((get('cache_read_input_tokens') or 0) or (get('cache_creation_input_tokens') or 0))
+
+
+def note_cache(total: dict, usage, system, stage: str) -> dict:
+    """캐시가 적용되지 않은 단계를 total['cache_miss']에 기록 (데이터질의 페이지 토큰 표시에 함께 나옴)"""
+    if not check_cache(usage, system):
+        total.setdefault('cache_miss', []).append(stage)
+    return total
+
+
+def add_usage(total: dict, usage) -> dict:
+    """resp.usage(객체) 또는 사용량 dict를 total에 누적"""
+    for field in USAGE_FIELDS:
+        value = usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)
+        total[field] = total.get(field, 0) + (value or 0)
+    return total
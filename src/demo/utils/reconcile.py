@@ -0,0 +1,397 @@
+# utils/reconcile.py - Oracle ORDERS ↔ MySQL orders_analytics 정합성 대사 (파티션 해시 + 드릴다운)
+#
+# 행 데이터를 DB 사이로 옮기지 않고 각 DB 안에서 집계만 계산합니다.
+#   1) order_id 범위(또는 order_date 일자)로 파티션을 나눠 양쪽에서 동시에
+#      파티션별 COUNT(*) + SUM(행 해시)를 GROUP BY 한 번으로 구함
+#      행 해시 = MD5(정규화한 행 문자열) 앞 8자리(32bit) → 합계는 행 순서와 무관
+#   2) 건수나 해시 합이 다른 파티션만 더 잘게 나눠 다시 비교 (단계별 BFS, 같은 파티션은 더 보지 않음)
+#   3) 충분히 작아진 파티션은 (order_id, 행 해시)만 가져와 병합 비교 → 누락/추가/변경 키
+#
+# MySQL  : CAST(CONV(SUBSTRING(MD5(s), 1, 8), 16, 10) AS UNSIGNED)
+# Oracle : TO_NUMBER(SUBSTR(RAWTOHEX(STANDARD_HASH(s, 'MD5')), 1, 8), 'XXXXXXXX')
+# SQLite : 연결마다 등록하는 md5_prefix(s) 함수 (테스트/오프라인용 대역, standin_side())
+#
+# 양쪽 문자 인코딩이 UTF-8(AL32UTF8 / utf8mb4)이어야 같은 행이 같은 해시가 됩니다.
+
+import os
+import uuid
+import hashlib
+import sqlite3
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+PARTITIONS = int(os.getenv('RECON_PARTITIONS', 64))        # 1단계 order_id 범위 수
+FANOUT = int(os.getenv('RECON_FANOUT', 16))                # 드릴다운 시 하위 범위 수
+LEAF_ROWS = int(os.getenv('RECON_LEAF_ROWS', 2000))        # 이 건수 이하면 키 단위 비교
+WORKERS = int(os.getenv('RECON_WORKERS', 8))               # 동시 쿼리 수 (양쪽 합계)
+SAMPLE_KEYS = int(os.getenv('RECON_SAMPLE_KEYS', 50))      # 결과에 남길 키 샘플 수
+
+NULL_TOKEN = '<null>'   # MySQL 문자열 안의 '\\N'은 'N'이 되므로 백슬래시 없는 표식
+
+# 두 테이블에 공통인 컬럼과 정규화 방식 (sync_timestamp 등 타깃 전용 컬럼 제외)
+ORDER_COLUMNS = [
+    ('order_id', 'int'), ('customer_id', 'int'), ('customer_name', 'text'), ('phone_number', 'text'),
+    ('email', 'text'), ('order_date', 'date'), ('total_amount', 'money'), ('product_code', 'text'),
+    ('product_name', 'text'), ('category', 'text'), ('order_status', 'text'), ('payment_method', 'text'),
+]
+
+
+# ============================================================
+# 방언별 SQL 조각
+# ============================================================
+def _canon_mysql(col, kind):
+    if kind == 'int':
+        expr = f"CAST({col} AS CHAR)"
+    elif kind == 'money':
+        expr = f"CAST(CAST(ROUND({col} * 100) AS SIGNED) AS CHAR)"
+    elif kind == 'date':
+        expr = f"DATE_FORMAT({col}, '%Y-%m-%d')"
+    else:
+        expr = f"NULLIF({col}, '')"                 # Oracle은 ''를 NULL로 저장하므로 맞춤
+    return f"COALESCE({expr}, '{NULL_TOKEN}')"
+
+
+def _canon_oracle(col, kind):
+    if kind == 'int':
+        expr = f"TO_CHAR({col})"
+    elif kind == 'money':
+        expr = f"TO_CHAR(ROUND({col} * 100))"
+    elif kind == 'date':
+        expr = f"TO_CHAR({col}, 'YYYY-MM-DD')"
+    else:
+        expr = col
+    return f"NVL({expr}, '{NULL_TOKEN}')"
+
+
+def _canon_sqlite(col, kind):
+    if kind == 'int':
+        expr = f"CAST({col} AS TEXT)"
+    elif kind == 'money':
+        expr = f"CAST(CAST(ROUND({col} * 100) AS INTEGER) AS TEXT)"
+    elif kind == 'date':
+        expr = f"substr({col}, 1, 10)"
+    else:
+        expr = f"NULLIF({col}, '')"
+    return f"COALESCE({expr}, '{NULL_TOKEN}')"
+
+
+DIALECTS = {
+    'mysql': {
+        'canon': _canon_mysql,
+        'concat': lambda parts: f"CONCAT_WS('|', {', '.join(parts)})",
+        'hash': lambda s: f"CAST(CONV(SUBSTRING(MD5({s}), 1, 8), 16, 10) AS UNSIGNED)",
+        'bucket': lambda key: f"FLOOR(({key} - ?) / ?)",
+        'date': lambda col: f"DATE_FORMAT({col}, '%Y-%m-%d')",
+        'day': '?',
+    },
+    'oracle': {
+        'canon': _canon_oracle,
+        'concat': lambda parts: " || '|' || ".join(parts),
+        'hash': lambda s: f"TO_NUMBER(SUBSTR(RAWTOHEX(STANDARD_HASH({s}, 'MD5')), 1, 8), 'XXXXXXXX')",
+        'bucket': lambda key: f"FLOOR(({key} - ?) / ?)",
+        'date': lambda col: f"TO_CHAR({col}, 'YYYY-MM-DD')",
+        'day': "TO_DATE(?, 'YYYY-MM-DD')",
+    },
+    'sqlite': {
+        'canon': _canon_sqlite,
+        'concat': lambda parts: " || '|' || ".join(parts),
+        'hash': lambda s: f"md5_prefix({s})",
+        'bucket': lambda key: f"(({key} - ?) / ?)",
+        'date': lambda col: f"substr({col}, 1, 10)",
+        'day': '?',
+    },
+}
+
+
+def _placeholders(dialect, sql):
+    """'?' 자리표시자를 드라이버 형식으로 (MySQL %s, Oracle :1..)
+
+    mysql-connector는 %s만 치환하고 %%를 되돌리지 않으므로 DATE_FORMAT의 '%Y' 등은 그대로 둡니다.
+    """
+    if dialect == 'mysql':
+        return sql.replace('?', '%s')
+    if dialect == 'oracle':
+        out, n = [], 0
+        for ch in sql:
+            if ch == '?':
+                n += 1
+                out.append(f":{n}")
+            else:
+                out.append(ch)
+        return ''.join(out)
+    return sql
+
+
+def md5_prefix(text):
+    if text is None:
+        return None
+    return int(hashlib.md5(text.encode('utf-8')).hexdigest()[:8], 16)
+
+
+# ============================================================
+# 대사 대상 (한쪽 DB)
+# ============================================================
+class Side:
+    """대사 한쪽. connect()는 호출마다 (풀) 커넥션을 돌려주는 함수."""
+
+    def __init__(self, name, dialect, connect, table, columns=None, key='order_id', date_column='order_date'):
+        self.name = name
+        self.dialect = dialect
+        self.connect = connect
+        self.table = table
+        self.columns = columns or ORDER_COLUMNS
+        self.key = key
+        self.date_column = date_column
+        d = DIALECTS[dialect]
+        self.row_hash = d['hash'](d['concat']([d['canon'](col, kind) for col, kind in self.columns]))
+        self.date_expr = d['date'](date_column)
+
+    def query(self, sql, params=()):
+        conn = self.connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(_placeholders(self.dialect, sql), tuple(params))
+            rows = cur.fetchall()
+            cur.close()
+            return rows
+        finally:
+            conn.close()
+
+    def stream(self, sql, params=(), batch=1000):
+        """서버 측 커서로 fetchmany 배치 단위 조회 (결과 전체를 메모리에 올리지 않음)"""
+        conn = self.connect()
+        try:
+            if self.dialect == 'mysql':
+                cur = conn.cursor(buffered=False)
+            else:
+                cur = conn.cursor()
+                if self.dialect == 'oracle':
+                    cur.arraysize = batch
+                    cur.prefetchrows = batch + 1
+            cur.execute(_placeholders(self.dialect, sql), tuple(params))
+            while True:
+                rows = cur.fetchmany(batch)
+                if not rows:
+                    break
+                yield from rows
+            cur.close()
+        finally:
+            conn.close()
+
+    def _where(self, part):
+        """part: {'lo', 'hi', 'day'} (없는 항목은 조건 생략)"""
+        clauses, params = [], []
+        if part.get('lo') is not None:
+            clauses.append(f"{self.key} BETWEEN ? AND ?")
+            params += [part['lo'], part['hi']]
+        if part.get('day'):
+            # 컬럼을 감싸지 않는 반열린 구간 [일자, 다음 날) → order_date 인덱스 범위 스캔
+            day = DIALECTS[self.dialect]['day']
+            clauses.append(f"{self.date_column} >= {day} AND {self.date_column} < {day}")
+            start = date.fromisoformat(str(part['day'])[:10])
+            params += [start.isoformat(), (start + timedelta(days=1)).isoformat()]
+        return ' AND '.join(clauses) or '1 = 1', params
+
+    def bounds(self):
+        rows = self.query(f"SELECT MIN({self.key}), MAX({self.key}), COUNT(*) FROM {self.table}")
+        lo, hi, count = rows[0]
+        return (None if lo is None else int(lo)), (None if hi is None else int(hi)), int(count)
+
+    def day_stats(self):
+        """{일자: (건수, 해시 합, 최소 키, 최대 키)}"""
+        rows = self.query(f"""
+            SELECT {self.date_expr}, COUNT(*), SUM({self.row_hash}), MIN({self.key}), MAX({self.key})
+            FROM {self.table} GROUP BY {self.date_expr}
+        """)
+        return {str(day): (int(n), int(h or 0), int(lo), int(hi)) for day, n, h, lo, hi in rows}
+
+    def bucket_stats(self, part, width):
+        """part 범위를 width 크기 구간으로 나눈 {구간 번호: (건수, 해시 합)}"""
+        where, params = self._where(part)
+        bucket = DIALECTS[self.dialect]['bucket'](self.key)
+        # Oracle은 바인드 변수가 다른 GROUP BY 식을 같은 식으로 보지 않으므로 인라인 뷰에서 계산
+        rows = self.query(f"""
+            SELECT b, COUNT(*), SUM(h) FROM (
+                SELECT {bucket} AS b, {self.row_hash} AS h FROM {self.table} WHERE {where}
+            ) x GROUP BY b
+        """, [part['lo'], width] + params)
+        return {int(b): (int(n), int(h or 0)) for b, n, h in rows}
+
+    def row_hashes(self, part):
+        """작은 파티션의 (키, 행 해시) 목록 (키 순)"""
+        where, params = self._where(part)
+        rows = self.query(f"""
+            SELECT {self.key}, {self.row_hash} FROM {self.table} WHERE {where} ORDER BY {self.key}
+        """, params)
+        return [(int(k), int(h)) for k, h in rows]
+
+
+def mysql_side(table='orders_analytics'):
+    from utils.db import get_mysql
+    return Side('mysql', 'mysql', get_mysql, table)
+
+
+def oracle_side(table='ORDERS'):
+    from utils.db import get_oracle
+    return Side('oracle', 'oracle', get_oracle, table)
+
+
+def standin_side(name, rows, table='orders', columns=None):
+    """SQLite 메모리 DB 대역 (스레드마다 별도 커넥션이 같은 DB를 보도록 shared cache)
+
+    rows: ORDER_COLUMNS 순서의 튜플 목록. 반환된 Side의 keeper가 살아 있는 동안 DB가 유지됩니다.
+    """
+    columns = columns or ORDER_COLUMNS
+    uri = f"file:recon-{name}-{uuid.uuid4().hex}?mode=memory&cache=shared"
+
+    def connect():
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.create_function('md5_prefix', 1, md5_prefix, deterministic=True)
+        return conn
+
+    keeper = connect()
+    keeper.execute(f"CREATE TABLE {table} ({', '.join(col for col, _ in columns)})")
+    keeper.execute(f"CREATE INDEX idx_{table}_key ON {table} ({columns[0][0]})")
+    keeper.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' for _ in columns)})", rows)
+    keeper.commit()
+    side = Side(name, 'sqlite', connect, table, columns)
+    side.keeper = keeper
+    return side
+
+
+# ============================================================
+# 대사 엔진
+# ============================================================
+def _split(part, parts):
+    """part를 최대 parts개의 같은 폭 구간으로. (폭, [하위 파티션]) 반환"""
+    span = part['hi'] - part['lo'] + 1
+    width = max(1, -(-span // parts))
+    children = {}
+    for b in range(-(-span // width)):
+        lo = part['lo'] + b * width
+        children[b] = dict(part, lo=lo, hi=min(lo + width - 1, part['hi']))
+    return width, children
+
+
+def _compare_rows(src_rows, tgt_rows, result):
+    """키 순 (키, 해시) 두 목록 병합 비교"""
+    i = j = 0
+    while i < len(src_rows) or j < len(tgt_rows):
+        if j >= len(tgt_rows) or (i < len(src_rows) and src_rows[i][0] < tgt_rows[j][0]):
+            _add(result, 'missing', src_rows[i][0])
+            i += 1
+        elif i >= len(src_rows) or tgt_rows[j][0] < src_rows[i][0]:
+            _add(result, 'extra', tgt_rows[j][0])
+            j += 1
+        else:
+            if src_rows[i][1] != tgt_rows[j][1]:
+                _add(result, 'changed', src_rows[i][0])
+            i += 1
+            j += 1
+
+
+def _add(result, kind, key):
+    result['counts'][kind] += 1
+    if len(result[kind]) < SAMPLE_KEYS:
+        result[kind].append(key)
+
+
+def reconcile(source, target, by='order_id', partitions=None, fanout=None, leaf_rows=None, workers=None):
+    """source(기준) ↔ target 대사.
+
+    by='order_id'  : 전체 키 범위를 partitions개로 나눠 시작
+    by='order_date': 일자별 집계로 시작해 다른 일자만 키 범위로 드릴다운
+
+    반환: {'source_rows', 'target_rows', 'match', 'counts': {missing, extra, changed},
+           'missing'/'extra'/'changed': 키 샘플, 'differing_partitions', 'queries', 'levels'}
+      missing = 소스에만 있는 키, extra = 타깃에만 있는 키, changed = 양쪽에 있지만 값이 다른 키
+    """
+    partitions = partitions or PARTITIONS
+    fanout = fanout or FANOUT
+    leaf_rows = leaf_rows or LEAF_ROWS
+    result = {'counts': {'missing': 0, 'extra': 0, 'changed': 0},
+              'missing': [], 'extra': [], 'changed': [], 'differing_partitions': [], 'queries': 0, 'levels': 0}
+    pool = ThreadPoolExecutor(max_workers=workers or WORKERS, thread_name_prefix='recon')
+
+    def both(fn_name, *args):
+        futures = [pool.submit(getattr(side, fn_name), *args) for side in (source, target)]
+        result['queries'] += 2
+        return futures
+
+    try:
+        (s_lo, s_hi, s_n), (t_lo, t_hi, t_n) = [f.result() for f in both('bounds')]
+        result['source_rows'], result['target_rows'] = s_n, t_n
+        if s_lo is None and t_lo is None:
+            result['match'] = True
+            return result
+
+        # 1단계 파티션 (건수/해시 합 비교 대상)
+        if by == 'order_date':
+            s_days, t_days = [f.result() for f in both('day_stats')]
+            frontier = []
+            for day in sorted(set(s_days) | set(t_days)):
+                s, t = s_days.get(day), t_days.get(day)
+                if s and t and s[:2] == t[:2]:
+                    continue
+                bounds = [v for v in (s, t) if v]
+                part = {'day': day, 'lo': min(v[2] for v in bounds), 'hi': max(v[3] for v in bounds)}
+                result['differing_partitions'].append(dict(part, source=s[:2] if s else (0, 0),
+                                                           target=t[:2] if t else (0, 0)))
+                frontier.append((part, max(s[0] if s else 0, t[0] if t else 0)))
+        else:
+            root = {'day': None, 'lo': min(v for v in (s_lo, t_lo) if v is not None),
+                    'hi': max(v for v in (s_hi, t_hi) if v is not None)}
+            frontier = [(root, max(s_n, t_n))]
+        first = by == 'order_id'
+
+        # 드릴다운: 단계마다 다른 파티션만 더 잘게 (모든 파티션의 쿼리를 동시에)
+        leaves = []
+        while frontier:
+            result['levels'] += 1
+            split_now = []
+            for part, size in frontier:
+                if size <= leaf_rows:
+                    leaves.append(part)
+                else:
+                    split_now.append(part)
+            jobs = []
+            for part in split_now:
+                n = partitions if first else fanout
+                width, children = _split(part, n)
+                jobs.append((children, both('bucket_stats', part, width)))
+
+            frontier = []
+            for children, (fs, ft) in jobs:
+                s_stats, t_stats = fs.result(), ft.result()
+                for b in sorted(set(s_stats) | set(t_stats)):
+                    s, t = s_stats.get(b, (0, 0)), t_stats.get(b, (0, 0))
+                    if s != t:
+                        if first:
+                            result['differing_partitions'].append(dict(children[b], source=s, target=t))
+                        frontier.append((children[b], max(s[0], t[0])))
+            first = False
+
+        # 키 단위 비교 (작은 파티션만, 키와 해시만 이동)
+        fetched = [(part, both('row_hashes', part)) for part in leaves]
+        for part, (fs, ft) in fetched:
+            _compare_rows(fs.result(), ft.result(), result)
+    finally:
+        pool.shutdown(wait=True)
+
+    for kind in ('missing', 'extra', 'changed'):
+        result[kind].sort()
+    result['match'] = not any(result['counts'].values())
+    return result
+
+
+def reconcile_orders(by='order_id', **kwargs):
+    """Oracle ORDERS(소스) ↔ MySQL orders_analytics(타깃)"""
+    return reconcile(oracle_side(), mysql_side(), by=by, **kwargs)
+
+
+if __name__ == '__main__':
+    import sys, json
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    by = sys.argv[1] if len(sys.argv) > 1 else 'order_id'
+    summary = reconcile_orders(by=by)
+    print(json.dumps({k: v for k, v in summary.items() if k != 'differing_partitions'}, ensure_ascii=False, indent=2))
@@ -0,0 +1,190 @@
+# utils/resultset.py - Agent SQL 결과 제한 조회 + 스트리밍 요약
+#
+# 계획 단계가 만든 SELECT가 수백만 건을 돌려줘도 메모리에 다 올리지 않도록
+#   1) SQL에 행 수 상한(LIMIT / FETCH FIRST)을 주입하고
+#   2) fetchmany로 배치 단위로 읽으면서
+#   3) 행 수 / 컬럼별 통계 / 상위 값 / 샘플 몇 건만 남깁니다.
+
+import os
+import re
+import json
+from collections import Counter
+from datetime import date, datetime
+from decimal import Decimal
+
+MAX_ROWS = int(os.getenv('AGENT_MAX_ROWS', 10000))        # 쿼리당 최대 조회 행 수
+FETCH_BATCH = int(os.getenv('AGENT_FETCH_BATCH', 500))     # fetchmany 배치 크기
+SMALL_RESULT = int(os.getenv('AGENT_SMALL_RESULT', 20))    # 이 이하면 요약 대신 행 그대로
+SAMPLE_ROWS = 5
+TOP_K = 5
+MAX_DISTINCT = 1000                                        # 상위 값 집계용 컬럼별 고유값 추적 상한
+
+_MYSQL_LIMIT = re.compile(r'\bLIMIT\s+(\d+)(?:\s*(,|\bOFFSET\b)\s*(\d+))?\s*$', re.IGNORECASE)
+_ORACLE_FETCH = re.compile(r'\bFETCH\s+(?:FIRST|NEXT)\s+(\d+)\s+ROWS?\s+ONLY\s*$', re.IGNORECASE)
+_BOUNDABLE = re.compile(r'^[\s(]*(SELECT|WITH)\b', re.IGNORECASE)             # 상한을 붙일 수 있는 문장
+
+
+def strip_comments(sql: str, dialect: str = 'oracle') -> str:
+    """문자열 밖의 -- / /* */ (MySQL은 #도) 주석 제거, 끝의 ; 와 공백 제거. Oracle 힌트 /*+ */는 유지.
+
+    끝에 '-- 설명'이 남아 있으면 뒤에 붙인 LIMIT까지 주석이 되어 버립니다.
+    """
+    mysql = dialect == 'mysql'
+    out, i, n = [], 0, len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch in ("'", '"', '`'):                   # 문자열/식별자: 닫는 따옴표까지 그대로 ('' 이스케이프 포함)
+            j = i + 1
+            while j < n:
+                if sql[j] == ch:
+                    if j + 1 < n and sql[j + 1] == ch:
+                        j += 2
+                        continue
+                    break
+                if mysql and sql[j] == '\\' and ch != '`':   # MySQL 문자열만 \ 이스케이프
+                    j += 1
+                j += 1
+            out.append(sql[i:j + 1])
+            i = j + 1
+        elif (sql.startswith('--', i) and (not mysql or i + 2 >= n or sql[i + 2].isspace())) or \
+                (mysql and ch == '#'):              # MySQL '--'는 뒤에 공백이 있어야 주석 (5--1은 뺄셈)
+            j = sql.find('\n', i)
+            i = n if j < 0 else j
+        elif sql.startswith('/*', i) and not sql.startswith('/*+', i):
+            j = sql.find('*/', i + 2)
+            i = n if j < 0 else j + 2
+            out.append(' ')
+        else:
+            out.append(ch)
+            i += 1
+    text = ''.join(out).strip()
+    while text.endswith(';'):
+        text = text[:-1].rstrip()
+    return text
+
+
+def bound_sql(sql: str, dialect: str, max_rows: int = MAX_ROWS) -> str:
+    """최상위에 행 수 상한을 붙인 SQL. 잘림 여부를 알 수 있게 max_rows + 1건까지 허용.
+
+    SELECT / WITH 문만 고칩니다 (SHOW, DESCRIBE, EXPLAIN 등은 그대로 두고 summarize_cursor의 fetchmany 상한으로 막음).
+    이미 더 작은 LIMIT / FETCH FIRST가 있으면 그대로 두고, 더 크면 줄입니다.
+    """
+    sql = strip_comments(sql, dialect)
+    if not _BOUNDABLE.match(sql):
+        return sql
+    cap = max_rows + 1
+    if dialect == 'mysql':
+        m = _MYSQL_LIMIT.search(sql)
+        if not m:
+            return f"{sql} LIMIT {cap}"
+        if m.group(2) == ',':                       # LIMIT offset, count
+            offset, count = int(m.group(1)), int(m.group(3))
+            return sql[:m.start()] + f"LIMIT {offset}, {min(count, cap)}"
+        count = int(m.group(1))
+        tail = f" OFFSET {m.group(3)}" if m.group(3) else ''
+        return sql[:m.start()] + f"LIMIT {min(count, cap)}{tail}"
+    if dialect == 'oracle':
+        m = _ORACLE_FETCH.search(sql)
+        if not m:
+            return f"{sql} FETCH FIRST {cap} ROWS ONLY"
+        return sql[:m.start()] + f"FETCH FIRST {min(int(m.group(1)), cap)} ROWS ONLY"
+    raise ValueError(f"unknown dialect: {dialect}")
+
+
+def _new_column():
+    return {'nulls': 0, 'count': 0, 'min': None, 'max': None, 'sum': None,
+            'top': Counter(), 'distinct_capped': False}
+
+
+def _observe(col, value):
+    if value is None:
+        col['nulls'] += 1
+        return
+    col['count'] += 1
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        col['sum'] = value if col['sum'] is None else col['sum'] + value
+    if isinstance(value, (int, float, Decimal, date, datetime, str)) and not isinstance(value, bool):
+        try:
+            if col['min'] is None or value < col['min']:
+                col['min'] = value
+            if col['max'] is None or value > col['max']:
+                col['max'] = value
+        except TypeError:                           # 한 컬럼에 섞인 타입 (예: int와 str)
+            pass
+    key = value if isinstance(value, (int, str)) else str(value)
+    if key in col['top'] or len(col['top']) < MAX_DISTINCT:
+        col['top'][key] += 1
+    else:
+        col['distinct_capped'] = True
+
+
+def _finish_column(col):
+    out = {'non_null': col['count'], 'nulls': col['nulls']}
+    if col['count']:
+        out['min'], out['max'] = col['min'], col['max']
+        if col['sum'] is not None:
+            out['sum'] = col['sum']
+            out['avg'] = round(float(col['sum']) / col['count'], 4)
+        out['distinct'] = f"{len(col['top'])}+" if col['distinct_capped'] else len(col['top'])
+        # 모두 다른 값(키 컬럼 등)이면 상위 값은 의미 없음
+        if len(col['top']) < col['count']:
+            out['top_values'] = [[v, n] for v, n in col['top'].most_common(TOP_K)]
+    return out
+
+
+def summarize_cursor(cur, max_rows: int = MAX_ROWS, batch_size: int = FETCH_BATCH) -> dict:
+    """실행된 커서를 fetchmany로 읽으면서 요약. 메모리에는 샘플/통계만 남김.
+
+    결과가 SMALL_RESULT건 이하면 {'row_count', 'rows'}, 넘으면
+    {'row_count', 'truncated', 'columns': {컬럼: 통계}, 'sample': [...]}.
+    """
+    names = [c[0] for c in cur.description]
+    columns = {name: _new_column() for name in names}
+    head = []
+    row_count = 0
+    truncated = False
+
+    while True:
+        batch = cur.fetchmany(batch_size)
+        if not batch:
+            break
+        for row in batch:
+            if row_count >= max_rows:
+                truncated = True
+                break
+            row_count += 1
+            if isinstance(row, dict):
+                row = [row.get(name) for name in names]
+            if len(head) < SMALL_RESULT:
+                head.append(dict(zip(names, row)))
+            for name, value in zip(names, row):
+                _observe(columns[name], value)
+        if truncated:
+            break
+
+    if row_count <= SMALL_RESULT and not truncated:
+        return {'row_count': row_count, 'rows': head}
+    return {
+        'row_count': row_count,
+        'truncated': truncated,
+        'columns': {name: _finish_column(col) for name, col in columns.items()},
+        'sample': head[:SAMPLE_ROWS],
+    }
+
+
+def run_bounded(conn, sql: str, dialect: str, max_rows: int = MAX_ROWS, batch_size: int = FETCH_BATCH) -> str:
+    """행 수 상한을 주입해 실행하고 요약을 JSON 문자열로 반환"""
+    cur = conn.cursor()
+    try:
+        if dialect == 'oracle':
+            cur.arraysize = batch_size
+        cur.execute(bound_sql(sql, dialect, max_rows))
+        summary = summarize_cursor(cur, max_rows, batch_size)
+        if dialect == 'mysql':
+            while cur.fetchmany(batch_size):    # 남은 행 소진 (미소진 시 MySQL 커서 에러, SELECT는 상한 +1건만 남음)
+                pass
+    finally:
+        cur.close()
+    if summary.get('truncated'):
+        summary['note'] = f"{max_rows:,}건에서 조회를 멈췄습니다. 전체 건수는 COUNT(*)로 확인하세요."
+    return json.dumps(summary, ensure_ascii=False, default=str)
@@ -0,0 +1,159 @@
+# utils/run_monitor.py - IDMC 실행(run) 단위 볼륨 모니터링
+#
+# 하루 합계(get_today_rows)를 기다리지 않고 idmc_logs에 완료된 실행이 들어올 때마다
+# 그 실행의 target_rows를 같은 시간대 슬롯 기준선과 비교합니다.
+#   - 기준선: volume_stats (metric='run', segment=슬롯 / -1 전체) 누적 통계 — 실행당 PK 조회 1회
+#   - 읽는 범위: run_watermark 이후 완료(end_time)된 실행만 (idx_idmc_logs_end)
+#   - 이상 실행은 run_alerts에 기록하고 Slack으로 알림
+#
+# collector.fetch_and_save_logs()가 새 로그를 저장한 직후, 그리고 schedular.py의 주기 작업에서 호출됩니다.
+# 워터마크가 없는 첫 실행은 기존 로그로 기준선만 쌓고 알림은 만들지 않습니다.
+
+import os
+import requests
+from datetime import datetime, timedelta, timezone
+from utils.db import get_sqlite
+from utils.detectors import detector_for, DETECTORS
+from utils.volume_stats import ALL, observe
+
+SLOT_MINUTES = int(os.getenv('RUN_MONITOR_SLOT_MINUTES', 60))     # 시간대 슬롯 크기 (현지 시각 기준)
+FETCH_BATCH = int(os.getenv('RUN_MONITOR_BATCH', 1000))
+# 태스크당 하루 ~100회면 2σ(warning)만으로도 오경보가 많으므로 기본은 critical부터 기록 (적재 누락은 항상)
+MIN_SEVERITY = os.getenv('RUN_MONITOR_MIN_SEVERITY', 'critical')
+MONITOR = 'runs'
+
+SUCCESS = '1'
+
+
+def slot_of(start_time):
+    """IDMC startTime(UTC ISO) → 현지 시각 기준 하루 중 슬롯 번호"""
+    ts = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    local = ts.astimezone()
+    return (local.hour * 60 + local.minute) // SLOT_MINUTES
+
+
+_warned = set()          # 이미 경고한 (태스크, 탐지기) — 실행마다 같은 경고가 쌓이지 않게
+
+
+def _detector(task_name):
+    detector = detector_for(task_name, 'run_rows')
+    if not detector.stateful:
+        # 실행 단위는 이력 로드 없이 누적 통계로만 판정
+        if (task_name, detector.name) not in _warned:
+            _warned.add((task_name, detector.name))
+            print(f"⚠️ [{task_name}] run_rows 탐지기 {detector.name}는 누적 통계를 지원하지 않아 zscore 사용")
+        detector = DETECTORS['zscore']()
+    return detector
+
+
+def judge(task_name, run, before):
+    """실행 1건 판정 → 알림 dict 또는 None"""
+    source, target = run['source_rows'] or 0, run['target_rows'] or 0
+    r = _detector(task_name).score_state(before[run['slot']], before[ALL], target)
+    reasons, severity = [], 'normal'
+    levels = ('normal', 'warning', 'critical')
+    if r and r['severity'] != 'normal' and levels.index(r['severity']) >= levels.index(MIN_SEVERITY):
+        reasons.append('drop' if r['score'] < 0 else 'spike')
+        severity = r['severity']
+    if target < source:
+        reasons.append('transfer_gap')
+        severity = 'critical' if target == 0 or severity == 'critical' else 'warning'
+    if not reasons:
+        return None
+    return {**run, 'task_name': task_name, 'expected': r['expected'] if r else None,
+            'scale': r['scale'] if r else None, 'score': r['score'] if r else None,
+            'severity': severity, 'reason': ','.join(reasons)}
+
+
+def monitor_runs(notify=True):
+    """워터마크 이후 완료된 실행을 판정하고 기준선 갱신. 새 알림 목록 반환"""
+    with get_sqlite() as conn:
+        conn.execute("BEGIN IMMEDIATE")                  # 여러 프로세스가 동시에 돌아도 한 번씩만
+        cur = conn.cursor()
+        cur.execute("SELECT end_time FROM run_watermark WHERE monitor = ?", (MONITOR,))
+        row = cur.fetchone()
+        watermark = row[0] if row else None
+        bootstrap = watermark is None
+
+        reader = conn.cursor()
+        reader.execute("""
+            SELECT run_id, object_name, status, source_rows, target_rows, start_time, end_time
+            FROM idmc_logs WHERE end_time > ? ORDER BY end_time
+        """, (watermark or '',))
+        alerts, scanned = [], 0
+        while True:
+            batch = reader.fetchmany(FETCH_BATCH)
+            if not batch:
+                break
+            for run_id, task_name, status, source, target, start, end in batch:
+                scanned += 1
+                watermark = end
+                # 실패(재시도 전) 실행은 기준선에 넣지 않음
+                if str(status) != SUCCESS or not start:
+                    continue
+                run = {'run_id': run_id, 'start_time': start, 'end_time': end, 'slot': slot_of(start),
+                       'source_rows': source, 'target_rows': target}
+                before = observe(cur, task_name, 'run', (run['slot'], ALL), end, target or 0)
+                alert = None if bootstrap else judge(task_name, run, before)
+                if alert:
+                    cur.execute("""
+                        INSERT OR REPLACE INTO run_alerts (run_id, start_time, task_name, end_time, slot,
+                            source_rows, target_rows, expected, scale, score, severity, reason)
+                        VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
+                    """, tuple(alert[k] for k in ('run_id', 'start_time', 'task_name', 'end_time', 'slot',
+                                                  'source_rows', 'target_rows', 'expected', 'scale', 'score',
+                                                  'severity', 'reason')))
+                    alerts.append(alert)
+
+        if watermark is not None:
+            cur.execute("""
+                INSERT INTO run_watermark (monitor, end_time, updated_at) VALUES (?, ?, datetime('now','localtime'))
+                ON CONFLICT(monitor) DO UPDATE SET end_time = excluded.end_time, updated_at = excluded.updated_at
+            """, (MONITOR, watermark))
+        conn.commit()
+
+    if scanned:
+        print(f"⏱️ 실행 모니터링: {scanned:,}건 확인{' (기준선 초기화)' if bootstrap else ''}, 이상 {len(alerts)}건")
+    if alerts and notify:
+        send_alerts(alerts)
+    return alerts
+
+
+def describe(alert) -> str:
+    text = f"{alert['task_name']} {alert['start_time']} → {alert['target_rows']:,}건"
+    if alert['expected'] is not None:
+        text += f" (슬롯 {alert['slot']} 기대 {alert['expected']:,.0f}건, 점수 {alert['score']:.1f})"
+    if 'transfer_gap' in alert['reason']:
+        text += f" / 소스 {alert['source_rows']:,}건 중 {alert['source_rows'] - alert['target_rows']:,}건 미적재"
+    return text
+
+
+def send_alerts(alerts):
+    webhook = os.getenv('SLACK_WEBHOOK_URL')
+    if not webhook:
+        return
+    lines = [f"  • [{a['severity']}] {a['reason']}: {describe(a)}" for a in alerts[:20]]
+    if len(alerts) > 20:
+        lines.append(f"  … 외 {len(alerts) - 20}건")
+    try:
+        requests.post(webhook, json={"text": "⏱️ *[Guardian Run Monitor]*\n" + "\n".join(lines)}, timeout=10)
+    except Exception as e:
+        print(f"🚨 Slack 알림 실패: {e}")
+
+
+def recent_alerts(hours=24, limit=50):
+    """최근 hours시간 안에 완료된 실행의 알림 (최신순)"""
+    since = (datetime.now(timezone.utc) - timedelta(hours=hours)).strftime('%Y-%m-%dT%H:%M:%S')
+    with get_sqlite() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT task_name, run_id, start_time, end_time, slot, source_rows, target_rows,
+                   expected, score, severity, reason
+            FROM run_alerts WHERE end_time >= ? ORDER BY end_time DESC LIMIT ?
+        """, (since, limit))
+        keys = ('task_name', 'run_id', 'start_time', 'end_time', 'slot', 'source_rows', 'target_rows',
+                'expected', 'score', 'severity', 'reason')
+        rows = [dict(zip(keys, r)) for r in cur.fetchall()]
+    return rows
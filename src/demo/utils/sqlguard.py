@@ -0,0 +1,176 @@
+# utils/sqlguard.py - Agent SQL 실행 전 비용 검사 + 서버 측 실행 타임아웃
+#
+# 계획 단계가 만든 SQL을 바로 돌리지 않고 먼저 실행 계획을 봅니다.
+#   MySQL : EXPLAIN → 쿼리 블록별 rows 곱(중첩 루프 조인 추정 검사 행 수)의 합
+#   Oracle: EXPLAIN PLAN → 접근 연산별 읽는 행 수의 합 + 카티션 조인 여부
+#           (FULL 스캔은 CARDINALITY(출력 행 수)가 아니라 통계의 NUM_ROWS, 그 외는 CARDINALITY)
+# 인덱스만 읽는 단계(커버링 인덱스, COUNT(*) 전체 집계 등)는 테이블 행을 읽지 않으므로
+# 따로 합산해 더 큰 INDEX_ROW_BUDGET과 비교합니다.
+# 예상 검사 행 수가 예산을 넘으면 실행하지 않고 거절 사유를 돌려줍니다.
+# 거절 사유는 MYSQL_ERROR/ORACLE_ERROR 결과로 나가므로 기존 SQL 자동 수정 루프가 그대로 받습니다.
+
+import os
+import uuid
+from contextlib import contextmanager
+
+ROW_BUDGET = int(os.getenv('AGENT_SQL_ROW_BUDGET', 5_000_000))        # 쿼리당 예상 검사 행 수 상한 (테이블 행)
+INDEX_ROW_BUDGET = int(os.getenv('AGENT_SQL_INDEX_ROW_BUDGET', 100_000_000))  # 인덱스만 읽는 행 수 상한
+SERVER_TIMEOUT = float(os.getenv('AGENT_SQL_SERVER_TIMEOUT', 20))     # DB 서버 측 실행 제한(초)
+GUARD_ENABLED = os.getenv('AGENT_SQL_GUARD', 'on') != 'off'
+
+
+def _rows(cur):
+    names = [c[0].lower() for c in cur.description]
+    return [dict(zip(names, row)) if not isinstance(row, dict) else {k.lower(): v for k, v in row.items()}
+            for row in cur.fetchall()]
+
+
+def _mysql_index_only(step) -> bool:
+    """테이블 행을 읽지 않는 단계 (커버링 인덱스 / 집계 최적화로 테이블 접근 생략)"""
+    extra = str(step.get('extra') or '').lower()
+    if 'select tables optimized away' in extra or 'no matching min/max row' in extra:
+        return True
+    # 'Using index condition'(ICP)은 테이블 행도 읽음
+    return 'using index' in extra.replace('using index condition', '') and \
+        str(step.get('type') or '').upper() != 'ALL'
+
+
+def explain_mysql(conn, sql: str) -> dict:
+    """EXPLAIN 결과로 예상 검사 행 수 추정
+
+    {'rows': 테이블 행, 'index_rows': 인덱스만 읽는 행, 'full_scans': [테이블], 'plan': [...]}
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(f"EXPLAIN {sql}")
+        plan = _rows(cur)
+    finally:
+        cur.close()
+
+    blocks, index_only = {}, {}
+    full_scans = []
+    for step in plan:
+        block = step.get('id')
+        if 'select tables optimized away' in str(step.get('extra') or '').lower():
+            rows = 0                                    # MIN/MAX·COUNT(*)를 메타데이터로 바로 계산
+        else:
+            rows = max(int(step.get('rows') or 1), 1)
+        blocks[block] = blocks.get(block, 1) * rows
+        index_only[block] = index_only.get(block, True) and _mysql_index_only(step)
+        if str(step.get('type') or '').upper() == 'ALL' and step.get('table'):
+            full_scans.append(f"{step['table']}({rows:,}건)")
+    return {
+        'rows': sum(n for b, n in blocks.items() if not index_only[b]),
+        'index_rows': sum(n for b, n in blocks.items() if index_only[b]),
+        'full_scans': full_scans,
+        'cartesian': any('join buffer' in str(s.get('extra') or '').lower() and s.get('type') == 'ALL'
+                         for s in plan[1:]),
+        'plan': [{k: s.get(k) for k in ('id', 'table', 'type', 'key', 'rows', 'extra')} for s in plan],
+    }
+
+
+ORACLE_FULL_SCANS = {('TABLE ACCESS', 'FULL'), ('TABLE ACCESS', 'STORAGE FULL'),
+                     ('INDEX', 'FULL SCAN'), ('INDEX', 'FAST FULL SCAN'), ('INDEX', 'SKIP SCAN')}
+
+
+def _oracle_num_rows(cur, operation, owner, name):
+    """FULL 스캔 대상의 통계 행 수 (통계가 없으면 None)"""
+    view = 'all_indexes' if operation == 'INDEX' else 'all_tables'
+    key = 'index_name' if operation == 'INDEX' else 'table_name'
+    cur.execute(f"SELECT num_rows FROM {view} WHERE owner = :o AND {key} = :n", o=owner, n=name)
+    row = cur.fetchone()
+    return int(row[0]) if row and row[0] is not None else None
+
+
+def explain_oracle(conn, sql: str) -> dict:
+    """EXPLAIN PLAN + PLAN_TABLE 조회 (조회 후 자기 STATEMENT_ID 행은 삭제)
+
+    CARDINALITY는 그 단계가 내보내는 행 수라 조건이 걸린 FULL 스캔은 실제로 읽는 행보다 훨씬 작게 나옵니다.
+    FULL/FAST FULL/SKIP 스캔은 대상 테이블·인덱스의 NUM_ROWS를 읽는 행 수로 봅니다.
+    """
+    statement_id = f"guardian-{uuid.uuid4().hex[:16]}"
+    cur = conn.cursor()
+    try:
+        cur.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql}")
+        cur.execute("""
+            SELECT id, operation, options, object_owner, object_name, cardinality
+            FROM plan_table WHERE statement_id = :sid ORDER BY id
+        """, sid=statement_id)
+        plan = _rows(cur)
+        cur.execute("DELETE FROM plan_table WHERE statement_id = :sid", sid=statement_id)
+        conn.commit()
+
+        scanned = index_scanned = 0
+        full_scans = []
+        for step in plan:
+            operation, options = step.get('operation'), step.get('options')
+            if operation not in ('TABLE ACCESS', 'INDEX'):
+                continue
+            rows = int(step.get('cardinality') or 0)
+            if (operation, options) in ORACLE_FULL_SCANS:
+                num_rows = _oracle_num_rows(cur, operation, step.get('object_owner'), step.get('object_name'))
+                rows = max(rows, num_rows or 0)
+                full_scans.append(f"{step.get('object_name')}({rows:,}건)")
+            if operation == 'INDEX':
+                index_scanned += rows
+            else:
+                scanned += rows
+    finally:
+        cur.close()
+
+    return {
+        'rows': scanned,
+        'index_rows': index_scanned,
+        'full_scans': full_scans,
+        'cartesian': any(s.get('options') == 'CARTESIAN' for s in plan),
+        'plan': [{k: s.get(k) for k in ('id', 'operation', 'options', 'object_name', 'cardinality')} for s in plan],
+    }
+
+
+EXPLAINERS = {'mysql': explain_mysql, 'oracle': explain_oracle}
+
+
+def check_cost(conn, sql: str, dialect: str, budget: int = ROW_BUDGET, index_budget: int = INDEX_ROW_BUDGET):
+    """예산 초과면 거절 사유 문자열, 통과면 None. (EXPLAIN 자체가 실패하면 예외 그대로 → 문법 오류로 자동 수정)"""
+    if not GUARD_ENABLED:
+        return None
+    estimate = EXPLAINERS[dialect](conn, sql)
+    if estimate['rows'] <= budget and estimate['index_rows'] <= index_budget:
+        return None
+    if estimate['rows'] > budget:
+        reasons = [f"예상 검사 행 수 {estimate['rows']:,}건이 한도 {budget:,}건을 초과하여 실행하지 않았습니다"]
+    else:
+        reasons = [f"예상 인덱스 검사 행 수 {estimate['index_rows']:,}건이 한도 {index_budget:,}건을 초과하여 실행하지 않았습니다"]
+    if estimate['cartesian']:
+        reasons.append("조인 조건 없는 카티션 곱이 있습니다 (JOIN ... ON 조건 추가)")
+    if estimate['full_scans']:
+        reasons.append(f"전체 스캔: {', '.join(estimate['full_scans'])}")
+    reasons.append("WHERE 날짜 조건, 인덱스 컬럼 조건, GROUP BY 집계로 범위를 줄인 SQL로 수정하세요")
+    return f"COST_GUARD: {' / '.join(reasons)}"
+
+
+@contextmanager
+def server_timeout(conn, dialect: str, seconds: float = SERVER_TIMEOUT):
+    """DB 서버 측 실행 제한. 풀 커넥션이므로 끝나면 원래대로 되돌림.
+
+    MySQL : SESSION MAX_EXECUTION_TIME (SELECT에만 적용, 밀리초)
+    Oracle: connection.call_timeout (왕복 호출 단위, 밀리초)
+    """
+    ms = int(seconds * 1000)
+    if dialect == 'mysql':
+        cur = conn.cursor()
+        cur.execute(f"SET SESSION MAX_EXECUTION_TIME = {ms}")
+        cur.close()
+        try:
+            yield
+        finally:
+            cur = conn.cursor()
+            cur.execute("SET SESSION MAX_EXECUTION_TIME = DEFAULT")
+            cur.close()
+    else:
+        previous = conn.call_timeout
+        conn.call_timeout = ms
+        try:
+            yield
+        finally:
+            conn.call_timeout = previous
@@ -0,0 +1,59 @@
+# utils/streaming.py - 스트리밍 응답 보조 (JSON 응답 중 특정 문자열 필드만 실시간 추출)
+
+import re
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class JsonFieldStreamer:
+    """Claude가 JSON을 토큰 단위로 보낼 때 "answer" 같은 문자열 필드 값만 골라내는 파서
+
+        streamer = JsonFieldStreamer('answer')
+        for text in stream.text_stream:
+            piece = streamer.feed(text)   # 이번 조각에서 새로 확정된 필드 내용
+    """
+
+    def __init__(self, field):
+        self._start = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buf = ''
+        self._pos = None      # 필드 값 안에서 다음에 읽을 위치
+        self.done = False
+
+    def feed(self, text):
+        if self.done:
+            return ''
+        self._buf += text
+        if self._pos is None:
+            m = self._start.search(self._buf)
+            if not m:
+                return ''
+            self._pos = m.end()
+
+        out = []
+        buf, i = self._buf, self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self.done = True
+                i += 1
+                break
+            if ch == '\\':
+                if i + 1 >= len(buf):
+                    break                     # 이스케이프가 다음 조각에서 이어짐
+                esc = buf[i + 1]
+                if esc == 'u':
+                    if i + 6 > len(buf):
+                        break
+                    try:
+                        out.append(chr(int(buf[i + 2:i + 6], 16)))
+                    except ValueError:
+                        out.append(buf[i:i + 6])
+                    i += 6
+                    continue
+                out.append(_ESCAPES.get(esc, esc))
+                i += 2
+                continue
+            out.append(ch)
+            i += 1
+        self._pos = i
+        return ''.join(out)
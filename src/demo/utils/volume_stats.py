@@ -0,0 +1,157 @@
+# utils/volume_stats.py - 볼륨 누적 통계 저장소 (guardian.db volume_stats)
+#
+# 태스크 × 지표 × 구간(segment)마다 건수/평균/M2(Welford)와 EWMA 평균/분산을 1행으로 유지합니다.
+#   daily: 요일(0~6) + 전체(-1)  — 일별 처리 건수 (snapshot.write_history에서 실행당 1회 갱신)
+#   run  : 시간대 슬롯           — IDMC 실행 1건당 처리 건수
+# 판정은 PK 조회 몇 건으로 끝나므로 이력 길이·태스크 수와 무관하게 상수 시간입니다.
+#
+# last_key(날짜/실행 시각)보다 이전 키는 무시하고, 같은 키로 다시 들어오면 prev_* 상태에서
+# 다시 계산하므로 같은 날 재실행해도 두 번 누적되지 않습니다. 같은 키 판정은 prev_* 기준입니다.
+
+import math
+from datetime import date
+from utils.db import get_sqlite
+from utils.detectors import EWMA
+
+ALL = -1                            # 전체 구간 segment
+ALPHA = EWMA.alpha                  # 탐지기(ewma)와 같은 감쇠 계수
+FIELDS = ('n', 'mean', 'm2', 'ewma_mean', 'ewma_var')
+
+UPSERT_STATS = f'''
+    INSERT INTO volume_stats (task_name, metric, segment, {', '.join(FIELDS)}, last_key,
+                              {', '.join('prev_' + f for f in FIELDS)}, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now','localtime'))
+    ON CONFLICT(task_name, metric, segment) DO UPDATE SET
+        {', '.join(f'{f} = excluded.{f}' for f in FIELDS)}, last_key = excluded.last_key,
+        {', '.join(f'prev_{f} = excluded.prev_{f}' for f in FIELDS)}, updated_at = excluded.updated_at
+'''
+
+
+def empty_state():
+    return {'n': 0, 'mean': None, 'm2': None, 'ewma_mean': None, 'ewma_var': None}
+
+
+def push(state, x, alpha=ALPHA):
+    """상태에 값 1개 누적 (Welford + EWMA). 새 상태 반환"""
+    x = float(x)
+    if not state['n']:
+        return {'n': 1, 'mean': x, 'm2': 0.0, 'ewma_mean': x, 'ewma_var': 0.0}
+    n = state['n'] + 1
+    d = x - state['mean']
+    mean = state['mean'] + d / n
+    e = x - state['ewma_mean']
+    return {'n': n, 'mean': mean, 'm2': state['m2'] + d * (x - mean),
+            'ewma_mean': state['ewma_mean'] + alpha * e,
+            'ewma_var': (1 - alpha) * (state['ewma_var'] + alpha * e * e)}
+
+
+def std(state):
+    """모표준편차 (ddof=0, np.std와 같음)"""
+    return math.sqrt(max(state['m2'], 0.0) / state['n']) if state['n'] else None
+
+
+def fold(row, key, value):
+    """row(현재+prev+last_key)에 key의 값 반영. 이전 키면 None (무시)
+
+    value=None이면 그 키의 기여분만 되돌립니다 (데이터 없음으로 바뀐 재실행).
+    """
+    row = row or {'last_key': None, **empty_state(), **{'prev_' + f: v for f, v in empty_state().items()}}
+    last = row['last_key']
+    if last is not None and key < last:
+        return None
+    if key == last:
+        base = {f: row['prev_' + f] for f in FIELDS}
+    else:
+        base = {f: row[f] for f in FIELDS}
+    current = push(base, value) if value is not None else base
+    return {**current, 'last_key': key, **{'prev_' + f: base[f] for f in FIELDS}}
+
+
+def _rows(cur, task_name, metric, segments):
+    marks = ', '.join('?' for _ in segments)
+    cur.execute(f"""
+        SELECT segment, {', '.join(FIELDS)}, last_key, {', '.join('prev_' + f for f in FIELDS)}
+        FROM volume_stats WHERE task_name = ? AND metric = ? AND segment IN ({marks})
+    """, (task_name, metric, *segments))
+    names = ('segment',) + FIELDS + ('last_key',) + tuple('prev_' + f for f in FIELDS)
+    return {r[0]: dict(zip(names[1:], r[1:])) for r in cur.fetchall()}
+
+
+def _write(cur, task_name, metric, segment, row):
+    cur.execute(UPSERT_STATS, (task_name, metric, segment, *(row[f] for f in FIELDS), row['last_key'],
+                               *(row['prev_' + f] for f in FIELDS)))
+
+
+def observe(cur, task_name, metric, segments, key, value):
+    """여러 구간에 값 1개 반영하고 반영 직전 상태 {segment: 상태} 반환 (호출자 트랜잭션 안에서)
+
+    판정(반영 직전 상태)과 갱신을 PK 조회 1회로 처리합니다.
+    """
+    key = str(key)
+    rows = _rows(cur, task_name, metric, segments)
+    before = {segment: state_at(rows.get(segment), key) for segment in segments}
+    for segment in segments:
+        row = fold(rows.get(segment), key, value)
+        if row is not None:
+            _write(cur, task_name, metric, segment, row)
+    return before
+
+
+def apply(cur, task_name, metric, segments, key, value):
+    """여러 구간에 값 1개 반영 (호출자 트랜잭션 안에서)"""
+    observe(cur, task_name, metric, segments, key, value)
+
+
+def record_daily(cur, task_name, run_date, rows):
+    """일별 처리 건수 반영 (rows=None이면 그날 기여분 제거)"""
+    apply(cur, task_name, 'daily', (run_date.weekday(), ALL), str(run_date), rows)
+
+
+def state_at(row, key):
+    """key 시점 판정에 쓸 상태 (key가 이미 반영돼 있으면 반영 직전 상태)"""
+    if row is None:
+        return empty_state()
+    if row['last_key'] == str(key):
+        return {f: row['prev_' + f] for f in FIELDS}
+    return {f: row[f] for f in FIELDS}
+
+
+def load_states(task_name, metric, segments, key):
+    """{segment: 상태} (key 시점 기준)"""
+    with get_sqlite() as conn:
+        rows = _rows(conn.cursor(), task_name, metric, segments)
+    return {segment: state_at(rows.get(segment), key) for segment in segments}
+
+
+def daily_states(task_name, run_date=None):
+    """(같은 요일 상태, 전체 상태). 통계가 아직 없으면 task_history로 한 번 재구성"""
+    run_date = run_date or date.today()
+    states = load_states(task_name, 'daily', (run_date.weekday(), ALL), run_date)
+    if not states[ALL]['n'] and rebuild_daily(task_name):
+        states = load_states(task_name, 'daily', (run_date.weekday(), ALL), run_date)
+    return states[run_date.weekday()], states[ALL]
+
+
+def rebuild_daily(task_name=None):
+    """task_history로 daily 통계 재구성 (시드/백필처럼 이력을 직접 쓴 뒤). 반영한 행 수 반환"""
+    with get_sqlite() as conn:
+        cur = conn.cursor()
+        where, params = ("WHERE task_name = ?", (task_name,)) if task_name else ("", ())
+        cur.execute(f"""
+            SELECT task_name, run_date, rows_processed FROM task_history {where} ORDER BY task_name, run_date
+        """, params)
+        rows = {}
+        count = 0
+        for task, run_date, value in cur.fetchall():
+            day = date.fromisoformat(run_date)
+            for segment in (day.weekday(), ALL):
+                row = fold(rows.get((task, segment)), run_date, value)
+                if row is not None:
+                    rows[(task, segment)] = row
+            count += 1
+
+        cur.execute(f"DELETE FROM volume_stats WHERE metric = 'daily' {where.replace('WHERE', 'AND')}", params)
+        for (task, segment), row in rows.items():
+            _write(cur, task, 'daily', segment, row)
+        conn.commit()
+    return count